@@ -0,0 +1,259 @@
+"""Throughput benchmarks of the engine.
+
+Run from the repository root:
+
+    python benchmarks/run.py                    # compare against benchmarks/baseline.json
+    python benchmarks/run.py --update-baseline  # record a new baseline
+    python benchmarks/run.py deck_shuffle --update-baseline  # only update the baseline of deck_shuffle
+
+Every benchmark reports operations per second, the best of a few repeats. A benchmark regresses when its rate drops
+below the baseline by more than the threshold, in which case the script exits with status 1. Rates depend on the
+machine, so the baseline should be recorded on the machine the comparison runs on, and it should be updated along
+with any change that is meant to make a benchmark faster or slower.
+"""
+
+import argparse
+import json
+import platform
+import sys
+import time
+from collections.abc import Callable, Mapping, Sequence
+from pathlib import Path
+from typing import Any, Optional
+
+import numpy as np
+
+from balatro_gym.cards.decks import STANDARD_DECK
+from balatro_gym.cards.interfaces import Deck
+from balatro_gym.cards.joker import joker
+from balatro_gym.cards.joker.constants import ALL_JOKERS
+from balatro_gym.game.actions import SUBSET_MASKS, subset_cards
+from balatro_gym.game.engine import HAND_ACTIONS, BoardAction, GameAction, GameState, HandAction, Run
+from balatro_gym.game.scoring import get_poker_hand, score_hand
+from balatro_gym.game.shop import Shop
+from balatro_gym.interfaces import BlindState, BoardState
+
+DEFAULT_BASELINE = Path(__file__).with_name("baseline.json")
+DEFAULT_THRESHOLD = 0.2
+
+# A benchmark runs the given number of operations and returns the elapsed seconds, excluding its setup
+Benchmark = Callable[[int], float]
+Policy = Callable[[Run, np.random.Generator], GameAction]
+
+_SCORE_ROW = HAND_ACTIONS.index(HandAction.SCORE_HAND)
+# Gros Michel removes itself from the board, which would change the lineup between iterations. Every other joker
+# stays, so the lineup is kept for all iterations as it is between the hands of a blind
+_LINEUP_JOKERS = [j for j in ALL_JOKERS if j is not joker.GrosMichel]
+
+
+def random_policy(run: Run, rng: np.random.Generator) -> GameAction:
+    legal = np.flatnonzero(run.legal_hand_actions())
+    row, subset = divmod(int(rng.choice(legal)), len(SUBSET_MASKS))
+    return GameAction.from_subset(HAND_ACTIONS[row], subset)
+
+
+def greedy_policy(run: Run, rng: np.random.Generator) -> GameAction:
+    """Plays the subset whose poker hand has the highest base score, never discards."""
+    assert run.blind_state is not None
+    hand, board = run.blind_state.hand, run.board_state
+    best_subset, best_score = 0, -1.0
+    for subset in np.flatnonzero(run.legal_hand_actions()[_SCORE_ROW]).tolist():
+        _, hand_type = get_poker_hand(subset_cards(hand, subset), board)
+        score = board.get_poker_hand(hand_type).score
+        if score.chips * score.mult > best_score:
+            best_subset, best_score = subset, score.chips * score.mult
+    return GameAction.from_subset(HandAction.SCORE_HAND, best_subset)
+
+
+def _play(policy: Policy) -> Benchmark:
+    def benchmark(num_steps: int) -> float:
+        rng = np.random.default_rng(0)
+        run = Run(seed=0)
+        start = time.perf_counter()
+        for _ in range(num_steps):
+            if run.game_state is GameState.IN_BLIND_SELECT:
+                action = GameAction(BoardAction.START_ROUND)
+            elif run.game_state is GameState.IN_ANTE:
+                action = policy(run, rng)
+            elif run.game_state is GameState.GENERATE_SHOP:
+                action = GameAction(BoardAction.VIEW_SHOP)
+            else:
+                action = GameAction(BoardAction.NEXT_ROUND)
+            done = run.step(action).done
+            lost = done and run.game_state is GameState.IN_ANTE
+            finished = run.game_state is GameState.IN_BLIND_SELECT and run.board_state.round_num >= len(run.blinds) - 1
+            if lost or finished:
+                run.game_reset()
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def _score_hand(num_jokers: int) -> Benchmark:
+    def benchmark(num_hands: int) -> float:
+        rng = np.random.default_rng(num_jokers)
+        hands = [[STANDARD_DECK[i] for i in rng.choice(len(STANDARD_DECK), size=5, replace=False)] for _ in range(64)]
+        board = BoardState()
+        board.jokers = [_LINEUP_JOKERS[i]() for i in rng.choice(len(_LINEUP_JOKERS), size=num_jokers)]
+        start = time.perf_counter()
+        for i in range(num_hands):
+            blind = BlindState([], 300, 0, 4, 3, 3)
+            score_hand(hands[i % len(hands)], board, blind)
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def _shop(reroll: bool) -> Benchmark:
+    def benchmark(num_shops: int) -> float:
+        shop = Shop(rng=np.random.default_rng(0))
+        jokers = [joker.Joker()]
+        start = time.perf_counter()
+        for i in range(num_shops):
+            if reroll:
+                shop.reroll(jokers)
+            else:
+                shop.generate_shop_state(i % 24 + 1, jokers)
+        return time.perf_counter() - start
+
+    return benchmark
+
+
+def _deck_shuffle(num_shuffles: int) -> float:
+    deck = Deck(STANDARD_DECK, np.random.default_rng(0))
+    start = time.perf_counter()
+    for _ in range(num_shuffles):
+        deck.shuffle()
+    return time.perf_counter() - start
+
+
+def _deck_deal(num_deals: int) -> float:
+    # Deals a hand and then cards for a few plays from a fresh deck
+    elapsed = 0.0
+    for i in range(0, num_deals, 8):
+        deck = Deck(STANDARD_DECK)
+        start = time.perf_counter()
+        deck.deal(8)
+        for _ in range(min(num_deals - i, 8) - 1):
+            deck.deal(5)
+        elapsed += time.perf_counter() - start
+    return elapsed
+
+
+def _deck_destroy(num_cards: int) -> float:
+    rng = np.random.default_rng(0)
+    elapsed = 0.0
+    while num_cards > 0:
+        deck = Deck(STANDARD_DECK, rng)
+        dealt = deck.deal(min(num_cards, len(STANDARD_DECK)))
+        start = time.perf_counter()
+        for card in dealt:
+            deck.destroy([card])
+        elapsed += time.perf_counter() - start
+        num_cards -= len(dealt)
+    return elapsed
+
+
+def _game_reset(num_resets: int) -> float:
+    run = Run(seed=0)
+    start = time.perf_counter()
+    for _ in range(num_resets):
+        run.game_reset()
+    return time.perf_counter() - start
+
+
+BENCHMARKS: Mapping[str, tuple[Benchmark, int]] = {
+    "run_step_random_policy": (_play(random_policy), 2000),
+    "run_step_greedy_policy": (_play(greedy_policy), 200),
+    "score_hand_no_jokers": (_score_hand(0), 5000),
+    "score_hand_1_joker": (_score_hand(1), 5000),
+    "score_hand_5_jokers": (_score_hand(5), 5000),
+    "shop_generate_shop_state": (_shop(reroll=False), 2000),
+    "shop_reroll": (_shop(reroll=True), 2000),
+    "deck_shuffle": (_deck_shuffle, 500),
+    "deck_deal": (_deck_deal, 4000),
+    "deck_destroy": (_deck_destroy, 2000),
+    "run_game_reset": (_game_reset, 500),
+}
+"""Each benchmark along with the number of operations it runs per repeat."""
+
+
+def run_benchmarks(names: Sequence[str], repeats: int = 3, scale: float = 1.0) -> dict[str, float]:
+    """Returns the best rate in operations per second of each benchmark."""
+    results = {}
+    for name in names:
+        benchmark, num_ops = BENCHMARKS[name]
+        num_ops = max(1, int(num_ops * scale))
+        elapsed = min(benchmark(num_ops) for _ in range(repeats))
+        results[name] = num_ops / elapsed
+    return results
+
+
+def compare(
+    results: Mapping[str, float], baseline: Mapping[str, float], threshold: float = DEFAULT_THRESHOLD
+) -> list[str]:
+    """Returns the benchmarks whose rate dropped below the baseline by more than `threshold`."""
+    return [
+        name for name, rate in results.items() if name in baseline and rate < baseline[name] * (1 - threshold)
+    ]
+
+
+def _report(results: Mapping[str, float], baseline: Mapping[str, float]) -> None:
+    width = max(len(name) for name in results)
+    for name, rate in results.items():
+        line = f"{name:<{width}}  {rate:>12,.0f} ops/s"
+        if name in baseline:
+            line += f"  ({rate / baseline[name] - 1:+.1%} vs baseline)"
+        print(line)
+
+
+def _load(path: Path) -> dict[str, Any]:
+    with path.open() as f:
+        return json.load(f)
+
+
+def _dump(path: Path, results: Mapping[str, float]) -> None:
+    data = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {name: round(rate, 1) for name, rate in results.items()},
+    }
+    with path.open("w") as f:
+        json.dump(data, f, indent=2)
+        f.write("\n")
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("benchmarks", nargs="*", help=f"Benchmarks to run, default all of: {', '.join(BENCHMARKS)}.")
+    parser.add_argument("--output", type=Path, help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--update-baseline", action="store_true", help="Overwrite the baseline with the results.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Allowed relative slowdown.")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplies the number of operations per repeat.")
+    args = parser.parse_args(argv)
+    unknown = set(args.benchmarks) - set(BENCHMARKS)
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(sorted(unknown))}")
+
+    results = run_benchmarks(args.benchmarks or list(BENCHMARKS), args.repeats, args.scale)
+    baseline = _load(args.baseline)["results"] if args.baseline.exists() and not args.update_baseline else {}
+    _report(results, baseline)
+    if args.output is not None:
+        _dump(args.output, results)
+    if args.update_baseline:
+        # The baselines of the benchmarks that were not run are kept
+        previous = _load(args.baseline)["results"] if args.baseline.exists() else {}
+        _dump(args.baseline, {**previous, **results})
+        return 0
+
+    regressions = compare(results, baseline, args.threshold)
+    if regressions:
+        print(f"Slower than the baseline by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
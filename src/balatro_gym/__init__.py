@@ -0,0 +1,7 @@
+from gymnasium.envs.registration import register
+
+register(
+    id="balatro_gym/Balatro-v0",
+    entry_point="balatro_gym.env:BalatroEnv",
+    vector_entry_point="balatro_gym.vector:SharedMemoryVectorEnv",
+)
@@ -1,17 +1,18 @@
 import dataclasses
 import enum
-import random
-from typing import NamedTuple, Sequence
+from typing import NamedTuple, Optional, Sequence
+
+import numpy as np
 
 from balatro_gym.cards.decks import STANDARD_DECK
 from balatro_gym.cards.interfaces import HasCost
-from balatro_gym.cards.joker.effect_joker import Showman
 from balatro_gym.cards.joker.utils import sample_jokers
 from balatro_gym.cards.planet import PLANET_CARDS
 from balatro_gym.cards.spectral import SPECTRAL_CARDS
 from balatro_gym.cards.tarot import TAROT_CARDS
 from balatro_gym.cards.voucher import Voucher
-from balatro_gym.interfaces import Booster, JokerBase
+from balatro_gym.interfaces import Booster, JokerBase, JokerEffects
+from balatro_gym.rng import choices, resolve_rng, sample
 
 __all__ = ["StandardPack", "ArcanaPack", "CelestialPack", "BuffoonPack", "SpectralPack"]
 
@@ -48,9 +49,12 @@ class StandardPack(Booster):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
+        rng = resolve_rng(rng)
         # TODO: add enhancements
-        return random.sample(STANDARD_DECK, self.n_cards)
+        return sample(rng, STANDARD_DECK, self.n_cards)
 
 
 @dataclasses.dataclass
@@ -59,12 +63,15 @@ class ArcanaPack(Booster):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
-        allow_repeat = any([isinstance(j, Showman) for j in jokers])
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
+        rng = resolve_rng(rng)
+        allow_repeat = JokerEffects.from_jokers(jokers).showman > 0
         if allow_repeat:
-            return [card() for card in random.choices(TAROT_CARDS, k=self.n_cards)]
+            return [card() for card in choices(rng, TAROT_CARDS, k=self.n_cards)]
         else:
-            return [card() for card in random.sample(TAROT_CARDS, self.n_cards)]
+            return [card() for card in sample(rng, TAROT_CARDS, self.n_cards)]
 
 
 @dataclasses.dataclass
@@ -73,12 +80,15 @@ class CelestialPack(Booster):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
-        allow_repeat = any([isinstance(j, Showman) for j in jokers])
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
+        rng = resolve_rng(rng)
+        allow_repeat = JokerEffects.from_jokers(jokers).showman > 0
         if allow_repeat:
-            return [card() for card in random.choices(PLANET_CARDS, k=self.n_cards)]
+            return [card() for card in choices(rng, PLANET_CARDS, k=self.n_cards)]
         else:
-            return [card() for card in random.sample(PLANET_CARDS, self.n_cards)]
+            return [card() for card in sample(rng, PLANET_CARDS, self.n_cards)]
 
 
 @dataclasses.dataclass
@@ -87,8 +97,11 @@ class BuffoonPack(Booster):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
-        return sample_jokers(jokers, vouchers, self.n_cards)
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
+        rng = resolve_rng(rng)
+        return sample_jokers(jokers, vouchers, self.n_cards, rng)
 
 
 @dataclasses.dataclass
@@ -97,12 +110,15 @@ class SpectralPack(Booster):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
-        allow_repeat = any([isinstance(j, Showman) for j in jokers])
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
+        rng = resolve_rng(rng)
+        allow_repeat = JokerEffects.from_jokers(jokers).showman > 0
         if allow_repeat:
-            return [card() for card in random.choices(SPECTRAL_CARDS, k=self.n_cards)]
+            return [card() for card in choices(rng, SPECTRAL_CARDS, k=self.n_cards)]
         else:
-            return [card() for card in random.sample(SPECTRAL_CARDS, self.n_cards)]
+            return [card() for card in sample(rng, SPECTRAL_CARDS, self.n_cards)]
 
 
 class BoosterType(enum.Enum):
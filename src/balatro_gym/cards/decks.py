@@ -12,8 +12,18 @@ STANDARD_DECK: Sequence[PlayingCard] = [
 def discard(
     current_hand: Sequence[PlayingCard], discarded: Sequence[PlayingCard], new_cards: Sequence[PlayingCard]
 ) -> Sequence[PlayingCard]:
-    current_hand = list(current_hand)
+    """Removes the discarded cards from the hand and adds the new ones.
+
+    Cards are matched by identity, so the exact cards given are removed even when the hand holds equal cards. A card
+    that isn't in the hand, e.g. a copy, removes the first equal card instead.
+    """
+    slots = {id(card): slot for slot, card in enumerate(current_hand)}
+    removed = set()
     for card in discarded:
-        current_hand.remove(card)
-    current_hand.extend(new_cards)
-    return current_hand
+        slot = slots.get(id(card))
+        if slot is None or slot in removed:
+            slot = next((i for i, c in enumerate(current_hand) if i not in removed and c == card), None)
+            if slot is None:
+                raise ValueError(f"{card} is not in the hand.")
+        removed.add(slot)
+    return [*(card for slot, card in enumerate(current_hand) if slot not in removed), *new_cards]
@@ -0,0 +1,108 @@
+"""Stable integer indices for the card attributes. The base ("no modifier") types are always index 0 so that a
+zeroed buffer decodes to a plain card."""
+
+from collections.abc import Mapping, Sequence
+
+import numpy as np
+
+from .interfaces import (
+    BaseEdition,
+    BaseEnhancement,
+    BaseSeal,
+    BlueSeal,
+    Bonus,
+    BonusCard,
+    Edition,
+    Enhancement,
+    Foil,
+    GlassCard,
+    GoldCard,
+    GoldSeal,
+    Holographic,
+    LuckyCard,
+    MultCard,
+    Negative,
+    PlayingCard,
+    Polychrome,
+    PurpleSeal,
+    Rank,
+    RedSeal,
+    Seal,
+    SteelCard,
+    StoneCard,
+    Suit,
+    WildCard,
+)
+
+SUITS: Sequence[Suit] = tuple(Suit)
+ENHANCEMENTS: Sequence[type[Enhancement]] = (
+    BaseEnhancement,
+    BonusCard,
+    MultCard,
+    WildCard,
+    GlassCard,
+    SteelCard,
+    StoneCard,
+    GoldCard,
+    LuckyCard,
+    Bonus,
+)
+EDITIONS: Sequence[type[Edition]] = (BaseEdition, Foil, Holographic, Polychrome, Negative)
+SEALS: Sequence[type[Seal]] = (BaseSeal, GoldSeal, RedSeal, BlueSeal, PurpleSeal)
+
+SUIT_INDEX: Mapping[Suit, int] = {suit: i for i, suit in enumerate(SUITS)}
+ENHANCEMENT_INDEX: Mapping[type[Enhancement], int] = {cls: i for i, cls in enumerate(ENHANCEMENTS)}
+EDITION_INDEX: Mapping[type[Edition], int] = {cls: i for i, cls in enumerate(EDITIONS)}
+SEAL_INDEX: Mapping[type[Seal], int] = {cls: i for i, cls in enumerate(SEALS)}
+
+CARD_FEATURES: Sequence[str] = ("rank", "suit", "enhancement", "edition", "seal", "chips")
+NUM_CARD_FEATURES = len(CARD_FEATURES)
+
+
+def write_card_features(card: PlayingCard, out: np.ndarray) -> None:
+    """Writes the integer features of a card into `out`, e.g. a row of an observation buffer, ordered as
+    `CARD_FEATURES`. Rank is the card order (1-13) so 0 marks no card."""
+    rank = card.rank.value
+    out[0] = rank.order
+    out[1] = SUIT_INDEX[card.base_suit]
+    out[2] = ENHANCEMENT_INDEX[type(card.enhancement)]
+    out[3] = EDITION_INDEX[type(card.edition)]
+    out[4] = SEAL_INDEX[type(card.seal)]
+    out[5] = rank.value + card.added_chips
+
+
+# Packed card codes. A card is stored in a single integer as
+#   bits 0-3 rank order (1-13), bits 4-5 suit, bits 6-9 enhancement, bits 10-12 edition, bits 13-15 seal
+# and the added chips in the remaining high bits. Code 0 is never a valid card and marks an empty slot.
+RANK_SHIFT, RANK_MASK = 0, 0xF
+SUIT_SHIFT, SUIT_MASK = 4, 0x3
+ENHANCEMENT_SHIFT, ENHANCEMENT_MASK = 6, 0xF
+EDITION_SHIFT, EDITION_MASK = 10, 0x7
+SEAL_SHIFT, SEAL_MASK = 13, 0x7
+ADDED_CHIPS_SHIFT = 16
+EMPTY_CARD = 0
+
+
+def encode_card(card: PlayingCard) -> int:
+    return (
+        card.rank.value.order << RANK_SHIFT
+        | SUIT_INDEX[card.base_suit] << SUIT_SHIFT
+        | ENHANCEMENT_INDEX[type(card.enhancement)] << ENHANCEMENT_SHIFT
+        | EDITION_INDEX[type(card.edition)] << EDITION_SHIFT
+        | SEAL_INDEX[type(card.seal)] << SEAL_SHIFT
+        | card.added_chips << ADDED_CHIPS_SHIFT
+    )
+
+
+def decode_card(code: int) -> PlayingCard:
+    if code == EMPTY_CARD:
+        raise ValueError("Cannot decode an empty card slot.")
+    card = PlayingCard(
+        Rank.from_int(code >> RANK_SHIFT & RANK_MASK),
+        SUITS[code >> SUIT_SHIFT & SUIT_MASK],
+        ENHANCEMENTS[code >> ENHANCEMENT_SHIFT & ENHANCEMENT_MASK](),
+        EDITIONS[code >> EDITION_SHIFT & EDITION_MASK](),
+        SEALS[code >> SEAL_SHIFT & SEAL_MASK](),
+    )
+    card.add_chips(code >> ADDED_CHIPS_SHIFT)
+    return card
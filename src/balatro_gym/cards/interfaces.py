@@ -1,12 +1,12 @@
-import copy
-import random
-from collections import deque
-from collections.abc import Sequence
+import logging
+from collections.abc import Iterator, Sequence
 from enum import Enum, auto
-from typing import Any, Protocol, Union, runtime_checkable
+from functools import partial
+from typing import Any, Optional, Protocol, TypeVar, Union, runtime_checkable
 
 import numpy as np
 
+from ..journal import Journal
 from ..mixins import (
     HasChips,
     HasCreatePlanet,
@@ -18,10 +18,15 @@ from ..mixins import (
     HasReset,
     HasRetrigger,
 )
+from ..rng import resolve_rng
 from .voucher import ClearanceSale, Liquidation, Voucher
 
 __all__ = ["HasCost", "Edition", "Foil", "Holographic", "Polychrome", "Negative"]
 
+_logger = logging.getLogger(__name__)
+
+_T = TypeVar("_T")
+
 
 class Suit(Enum):
     SPADES = auto()
@@ -88,20 +93,32 @@ class Rank(Enum):
         return self
 
 
+_INSTANCES: dict[type, Any] = {}
+
+
+def _instance(cls: type[_T]) -> _T:
+    """The single instance of a card modifier class.
+
+    Editions, enhancements and seals have no state, so each class only ever has one instance and they compare and hash
+    by identity. Copies and unpickled objects go through `__new__` as well and so are the same instance.
+    """
+    instance = _INSTANCES.get(cls)
+    if instance is None:
+        instance = _INSTANCES[cls] = object.__new__(cls)
+    return instance
+
+
 # Editions
 class Edition(HasChips, HasMult, HasMultiplier, Protocol):
+    def __new__(cls: type[_T]) -> _T:
+        return _instance(cls)
+
     def is_negative(self) -> bool:
         return False
 
 
 class BaseEdition(Edition):
-    def __hash__(self) -> int:
-        return hash(None)
-
-    def __eq__(self, obj: Any) -> bool:
-        if isinstance(obj, BaseEdition):
-            return True
-        return False
+    pass
 
 
 class Foil(Edition):
@@ -110,7 +127,7 @@ class Foil(Edition):
 
 
 class Holographic(Edition):
-    def get_mult(self, probability_modifier: int = 1) -> int:
+    def get_mult(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
         return 10
 
 
@@ -126,21 +143,15 @@ class Negative(Edition):
 
 # Enhancements
 class Enhancement(HasChips, HasMult, HasMultiplier, HasMoney, HasIsDestroyed, Protocol):
+    def __new__(cls: type[_T]) -> _T:
+        return _instance(cls)
+
     def get_suit(self, card: "PlayingCard") -> Sequence[Suit]:
         return [card.base_suit]
 
-    def __eq__(self, other: Any) -> bool:
-        return self.__class__.__name__ == other.__class__.__name__
-
 
 class BaseEnhancement(Enhancement):
-    def __hash__(self) -> int:
-        return hash(None)
-
-    def __eq__(self, obj: Any) -> bool:
-        if isinstance(obj, BaseEnhancement):
-            return True
-        return False
+    pass
 
 
 class BonusCard(Enhancement):
@@ -149,7 +160,7 @@ class BonusCard(Enhancement):
 
 
 class MultCard(Enhancement):
-    def get_mult(self, probability_modifier: int = 1) -> int:
+    def get_mult(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
         return 4
 
 
@@ -165,8 +176,8 @@ class GlassCard(Enhancement):
         # When scored
         return 2.0
 
-    def is_destroyed(self, probability_modifier: int = 1) -> bool:
-        if np.random.random() <= min(self._base_destruction_probability * probability_modifier, 1):
+    def is_destroyed(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> bool:
+        if resolve_rng(rng).random() <= min(self._base_destruction_probability * probability_modifier, 1):
             return True
         return False
 
@@ -195,13 +206,20 @@ class LuckyCard(Enhancement):
     _base_mult_probability = 1 / 5
     _base_money_probability = 1 / 15
 
-    def get_mult(self, probability_modifier: int = 1) -> int:
-        if np.random.random() <= min(self._base_mult_probability * probability_modifier, 1):
+    def get_mult(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
+        if resolve_rng(rng).random() <= min(self._base_mult_probability * probability_modifier, 1):
             return 20
         return 0
 
-    def get_scored_money(self, probability_modifier: int = 1) -> int:
-        if np.random.random() <= min(self._base_money_probability * probability_modifier, 1):
+    def get_expected_mult(self, probability_modifier: int = 1) -> float:
+        return 20 * min(self._base_mult_probability * probability_modifier, 1)
+
+    def get_mult_outcomes(self, probability_modifier: int = 1) -> Sequence[tuple[float, float]]:
+        probability = min(self._base_mult_probability * probability_modifier, 1)
+        return ((20, probability), (0, 1 - probability))
+
+    def get_scored_money(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
+        if resolve_rng(rng).random() <= min(self._base_money_probability * probability_modifier, 1):
             return 20
         return 0
 
@@ -212,22 +230,17 @@ class Bonus(Enhancement):
 
 
 class Seal(HasMoney, HasRetrigger, HasCreatePlanet, HasCreateTarot):
-    pass
+    def __new__(cls: type[_T]) -> _T:
+        return _instance(cls)
 
 
 class BaseSeal(Seal):
     # Added for parity with other "Base" types
-    def __hash__(self) -> int:
-        return hash(None)
-
-    def __eq__(self, obj: Any) -> bool:
-        if isinstance(obj, BaseSeal):
-            return True
-        return False
+    pass
 
 
 class GoldSeal(Seal):
-    def get_scored_money(self, probability_modifier: int = 1) -> int:
+    def get_scored_money(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
         return 3
 
 
@@ -251,6 +264,7 @@ class PurpleSeal(Seal):
 
 @runtime_checkable
 class HasCost(Protocol):
+    __slots__ = ()
     _cost: int = 1
 
     @property
@@ -275,6 +289,8 @@ class HasCost(Protocol):
 
 
 class PlayingCard(HasChips, HasCost):
+    # Cards are the most numerous objects of a run, so they are kept small
+    __slots__ = ("_rank", "_base_suit", "_enhancement", "_edition", "_seal", "_base_chips", "_added_chips")
     _rank: Rank
     _base_suit: Suit
     _enhancement: Enhancement
@@ -343,19 +359,29 @@ class PlayingCard(HasChips, HasCost):
             enhancement_chips += self._enhancement.get_chips()
         return self._base_chips + self._added_chips + enhancement_chips
 
-    def get_mult(self) -> float:
+    def get_mult(self, rng: Optional[np.random.Generator] = None) -> float:
+        if isinstance(self.enhancement, HasMult):
+            return self.enhancement.get_mult(rng=rng)
+        return 0.0
+
+    def get_expected_mult(self) -> float:
         if isinstance(self.enhancement, HasMult):
-            return self.enhancement.get_mult()
+            return self.enhancement.get_expected_mult()
         return 0.0
 
+    def get_mult_outcomes(self) -> Sequence[tuple[float, float]]:
+        if isinstance(self.enhancement, HasMult):
+            return self.enhancement.get_mult_outcomes()
+        return ((0.0, 1.0),)
+
     def get_multiplication(self) -> float:
         if isinstance(self.enhancement, HasMultiplier):
             return self.enhancement.get_multiplication()
         return 1.0
 
-    def get_scored_money(self) -> int:
+    def get_scored_money(self, rng: Optional[np.random.Generator] = None) -> int:
         if isinstance(self.enhancement, HasMoney):
-            return self.enhancement.get_scored_money()
+            return self.enhancement.get_scored_money(rng=rng)
         return 0
 
     def get_end_money(self) -> int:
@@ -382,6 +408,18 @@ class PlayingCard(HasChips, HasCost):
         new_order = 1 if self._rank.value.order == 13 else self._rank.value.order + 1
         self._rank = Rank.from_int(new_order)
 
+    def __copy__(self) -> "PlayingCard":
+        # Skips `__init__`, since copying the standard deck is part of resetting a run
+        card = object.__new__(PlayingCard)
+        card._rank = self._rank
+        card._base_suit = self._base_suit
+        card._enhancement = self._enhancement
+        card._edition = self._edition
+        card._seal = self._seal
+        card._base_chips = self._base_chips
+        card._added_chips = self._added_chips
+        return card
+
     def __eq__(self, value: Any) -> bool:
         if isinstance(value, PlayingCard):
             return (
@@ -412,59 +450,162 @@ class PlayingCard(HasChips, HasCost):
         )
 
 
-class Deck(HasReset):
-    _cards_remaining: deque[PlayingCard]
-    _cards_played: deque[PlayingCard]
+_DESTROYED = -1
+"""Marks the place of a destroyed card in `Deck._order` and `Deck._positions`."""
 
-    def __init__(self, cards: Sequence[PlayingCard]) -> None:
-        self._cards_played = deque()
-        self._cards_remaining = deque(cards)
+
+class Deck(HasReset):
+    """The draw pile and the played pile of a run.
+
+    Every card gets a stable id, its index in the card table `_cards`, and the piles hold ids. `_order` lists the draw
+    pile, its top card last, followed by the played pile from the most recently dealt card back, and `_split` is the
+    position between the two. `_positions` maps each id back to its position in `_order`, so destroying a card only
+    leaves a gap in its place. Gaps in the draw pile are dropped by the next shuffle. Shuffling invalidates
+    `_positions` instead of updating it, it is rebuilt by the next destroy. Dealing only moves `_split`, and snapshots
+    and the journal copy ids rather than cards.
+    """
+
+    _cards: list[PlayingCard]
+    _ids: dict[int, int]
+    """The id of each card of the table, keyed by `id(card)`."""
+    _order: list[int]
+    _positions: Optional[list[int]]
+    """Position of each id in `_order`, or None until the next destroy after the order was shuffled."""
+    _split: int
+    _num_remaining: int
+    _journal: Optional[Journal] = None
+    """Set while the owning run is journaling, see `Run.enable_journal`."""
+
+    def __init__(self, cards: Sequence[PlayingCard], rng: Optional[np.random.Generator] = None) -> None:
+        self._set_cards(list(cards), list(range(len(cards))), len(cards), len(cards))
+        self._rng = resolve_rng(rng)
 
     @property
     def cards_remaining(self) -> Sequence[PlayingCard]:
-        return [*self._cards_remaining]
+        cards = self._cards
+        return [cards[i] for i in self._order[: self._split] if i != _DESTROYED]
+
+    def iter_remaining(self) -> Iterator[PlayingCard]:
+        """Iterates over the draw pile in the order of `cards_remaining`, without building a list of it."""
+        cards, order = self._cards, self._order
+        for position in range(self._split):
+            card_id = order[position]
+            if card_id != _DESTROYED:
+                yield cards[card_id]
 
     @property
     def cards_played(self) -> Sequence[PlayingCard]:
-        return [*self._cards_played]
+        cards = self._cards
+        return [cards[i] for i in reversed(self._order[self._split :]) if i != _DESTROYED]
 
     @property
     def cards(self) -> Sequence[PlayingCard]:
-        return [*self._cards_remaining] + [*self._cards_played]
+        return [*self.cards_remaining, *self.cards_played]
+
+    def card_id(self, card: PlayingCard) -> int:
+        """The id of a card of this deck, which stays the same for the whole run."""
+        return self._ids[id(card)]
 
     def reset(self) -> None:
-        self._cards_remaining = deque([*self._cards_remaining, *self._cards_played])
+        self._record_cards()
+        # The played pile goes back under the draw pile in the order it was dealt
+        self._order[self._split :] = reversed(self._order[self._split :])
+        self._split = len(self._order)
+        self._num_remaining = len(self._order) - self._order.count(_DESTROYED)
         self.shuffle()
 
     def add(self, cards: Sequence[PlayingCard]) -> None:
-        self._cards_remaining.extend(cards)
+        self._record_cards()
+        ids = range(len(self._cards), len(self._cards) + len(cards))
+        self._ids.update((id(card), i) for card, i in zip(cards, ids))
+        self._cards.extend(cards)
+        self._order[self._split : self._split] = ids
+        self._split += len(cards)
+        self._num_remaining += len(cards)
         self.shuffle()
 
     def deal(self, num: int) -> Sequence[PlayingCard]:
-        delt = [self._cards_remaining.pop() for i in range(num)]
-        self._cards_played.extend(delt)
+        if num > self._num_remaining:
+            raise IndexError(f"Cannot deal {num} cards from a deck of {self._num_remaining}.")
+        cards, order = self._cards, self._order
+        delt: list[PlayingCard] = []
+        split = self._split
+        while len(delt) < num:
+            split -= 1
+            if order[split] != _DESTROYED:
+                delt.append(cards[order[split]])
+        if self._journal is not None:
+            self._journal.record(partial(self._undo_deal, self._split, len(delt)))
+        self._split = split
+        self._num_remaining -= len(delt)
         return delt
 
+    def _undo_deal(self, split: int, num: int) -> None:
+        self._split = split
+        self._num_remaining += num
+
     def destroy(self, cards: Sequence[PlayingCard]) -> None:
-        """Destroyed cards are removed permanently."""
+        """Destroyed cards are removed permanently, from either pile since the HangedMan tarot destroys cards too."""
+        positions = self._get_positions()
         for card in cards:
-            # Required since cards can get destroyed via the HangedMan tarot card
-            if card in self._cards_remaining:
-                self._cards_remaining.remove(card)
-            try:
-                self._cards_played.remove(card)
-            except ValueError:
-                print("Attempted to destroy card that wasn't played. This is unexpected.")
+            card_id = self._ids.get(id(card))
+            position = _DESTROYED if card_id is None else positions[card_id]
+            if card_id is None or position == _DESTROYED:
+                _logger.warning("Attempted to destroy card that isn't in the deck. This is unexpected.")
+                continue
+            self._order[position] = _DESTROYED
+            positions[card_id] = _DESTROYED
+            if position < self._split:
+                self._num_remaining -= 1
+            if self._journal is not None:
+                self._journal.record(partial(self._undo_destroy, card_id, position))
+
+    def _undo_destroy(self, card_id: int, position: int) -> None:
+        self._order[position] = card_id
+        self._get_positions()[card_id] = position
+        if position < self._split:
+            self._num_remaining += 1
+
+    def _get_positions(self) -> list[int]:
+        positions = self._positions
+        if positions is None:
+            positions = self._positions = [_DESTROYED] * len(self._cards)
+            for position, i in enumerate(self._order):
+                if i != _DESTROYED:
+                    positions[i] = position
+        return positions
 
     def shuffle(self) -> None:
-        cards = list(copy.deepcopy(self._cards_remaining))
-        random.shuffle(cards)
-        self._cards_remaining = deque(cards)
+        """Shuffles the draw pile in place. Only the ids move, the cards are neither copied nor replaced."""
+        self._record_cards()
+        remaining = self._order[: self._split]
+        if self._split != self._num_remaining:
+            # The draw pile has gaps left by destroyed cards
+            remaining = [i for i in remaining if i != _DESTROYED]
+        self._rng.shuffle(remaining)
+        self._order[: self._split] = remaining
+        self._split = self._num_remaining
+        self._positions = None
+
+    def _record_cards(self) -> None:
+        if self._journal is not None:
+            # The order is changed in place, so record a copy
+            self._journal.record(
+                partial(self._set_cards, list(self._cards), list(self._order), self._split, self._num_remaining)
+            )
+
+    def _set_cards(self, cards: list[PlayingCard], order: list[int], split: int, num_remaining: int) -> None:
+        self._cards = cards
+        self._ids = {id(card): i for i, card in enumerate(cards)}
+        self._order = order
+        self._positions = None
+        self._split = split
+        self._num_remaining = num_remaining
 
     def get_num_remaining(self) -> int:
-        return len(self._cards_remaining)
+        return self._num_remaining
 
     def __eq__(self, obj: Any) -> bool:
         if isinstance(obj, Deck):
-            return self._cards_remaining == obj._cards_remaining and self._cards_played == obj._cards_played
+            return self.cards_remaining == obj.cards_remaining and self.cards_played == obj.cards_played
         return False
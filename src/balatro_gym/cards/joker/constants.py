@@ -37,3 +37,43 @@ JOKERS: Mapping[Rarity, Sequence[type[JokerBase]]] = {
         joker.TheDuo,
     ],
 }
+
+# Every implemented joker, in a fixed order. The position of a joker is its id in encoded observations, so new
+# jokers must be appended.
+ALL_JOKERS: Sequence[type[JokerBase]] = [
+    joker.Joker,
+    joker.GreedyJoker,
+    joker.LustyJoker,
+    joker.WrathfulJoker,
+    joker.GluttonousJoker,
+    joker.JollyJoker,
+    joker.ZanyJoker,
+    joker.MadJoker,
+    joker.CrazyJoker,
+    joker.DrollJoker,
+    joker.SlyJoker,
+    joker.WilyJoker,
+    joker.CleverJoker,
+    joker.DeviousJoker,
+    joker.CraftyJoker,
+    joker.HalfJoker,
+    joker.JokerStencil,
+    joker.Fibonacci,
+    joker.SteelJoker,
+    joker.ScaryFace,
+    joker.AbstractJoker,
+    joker.DelayedGratification,
+    joker.GrosMichel,
+    joker.EvenSteven,
+    joker.TheDuo,
+    ejoker.FourFingers,
+    ejoker.Mime,
+    ejoker.Showman,
+    ejoker.OopsAll6s,
+    ejoker.ChaosTheClown,
+    ejoker.Hack,
+    ejoker.Pareidolia,
+]
+
+JOKER_IDS: Mapping[type[JokerBase], int] = {joker: i + 1 for i, joker in enumerate(ALL_JOKERS)}
+"""Joker ids start at 1, 0 marks an empty slot."""
@@ -1,4 +1,4 @@
-from balatro_gym.interfaces import JokerBase, Rarity, Type
+from balatro_gym.interfaces import JokerBase, JokerEffect, Rarity, Type
 
 """This modules exists outside of the `joker` module because generally Effect based
 jokers will be processed elsewhere, like in scoring logic. So Effect jokers may need to be
@@ -6,6 +6,7 @@ imported, which otherwise may cause circular dependencies."""
 
 
 class FourFingers(JokerBase):
+    effect = JokerEffect.FOUR_FINGERS
     _cost: int = 7
 
     @property
@@ -18,6 +19,7 @@ class FourFingers(JokerBase):
 
 
 class Mime(JokerBase):
+    effect = JokerEffect.MIME
     _cost: int = 5
 
     @property
@@ -30,6 +32,7 @@ class Mime(JokerBase):
 
 
 class Showman(JokerBase):
+    effect = JokerEffect.SHOWMAN
     _cost: int = 5
 
     @property
@@ -42,6 +45,7 @@ class Showman(JokerBase):
 
 
 class OopsAll6s(JokerBase):
+    effect = JokerEffect.OOPS_ALL_6S
     _cost: int = 4
 
     @property
@@ -66,6 +70,7 @@ class ChaosTheClown(JokerBase):
 
 
 class Hack(JokerBase):
+    effect = JokerEffect.HACK
     _cost: int = 6
 
     @property
@@ -78,6 +83,7 @@ class Hack(JokerBase):
 
 
 class Pareidolia(JokerBase):
+    effect = JokerEffect.PAREIDOLIA
     _cost: int = 5
 
     @property
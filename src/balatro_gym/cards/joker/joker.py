@@ -1,5 +1,7 @@
-import random
 from collections.abc import Sequence
+from typing import Optional
+
+import numpy as np
 
 from balatro_gym.cards.utils import (
     contains_one_pair,
@@ -11,8 +13,8 @@ from balatro_gym.cards.utils import (
 )
 
 from ...interfaces import BlindState, BoardState, JokerBase, PokerHandType, Rarity, Type
+from ...rng import resolve_rng
 from ..interfaces import PlayingCard, Rank, SteelCard, Suit
-from .effect_joker import Pareidolia
 
 
 class Joker(JokerBase):
@@ -362,8 +364,7 @@ class ScaryFace(JokerBase):
         return Rarity.COMMON
 
     def get_chips_card(self, card: PlayingCard, blind: BlindState, board: "BoardState") -> int:
-        has_pareidolia = any([isinstance(j, Pareidolia) for j in board.jokers])
-        return 30 if card.is_face_card(has_pareidolia) else 0
+        return 30 if card.is_face_card(board.joker_effects.pareidolia > 0) else 0
 
 
 class AbstractJoker(JokerBase):
@@ -412,11 +413,11 @@ class GrosMichel(JokerBase):
     def get_mult_hand(
         self, scored_cards: Sequence[PlayingCard], blind: BlindState, board: BoardState, scored_hand: PokerHandType
     ) -> int:
-        prob = random.random()
-        if prob < 1 / 6:
-            board.jokers.remove(self)
         return 15
 
+    def is_destroyed(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> bool:
+        return resolve_rng(rng).random() < probability_modifier / 6
+
 
 class EvenSteven(JokerBase):
     _cost: int = 4
@@ -1,26 +1,34 @@
-import random
-from typing import Sequence
+from typing import Optional, Sequence
+
+import numpy as np
 
 from balatro_gym.cards.interfaces import BaseEdition, Edition, Foil, Holographic, Polychrome
 from balatro_gym.cards.joker.constants import JOKERS
-from balatro_gym.cards.joker.effect_joker import Showman
+from balatro_gym.cards.joker.joker import Joker
 from balatro_gym.cards.voucher import GlowUp, Hone, Voucher
-from balatro_gym.interfaces import JokerBase, Rarity
+from balatro_gym.interfaces import JokerBase, JokerEffects, Rarity
+from balatro_gym.rng import choice, resolve_rng
 
 
-def sample_jokers(jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], n_jokers: int) -> list[JokerBase]:
+def sample_jokers(
+    jokers: Sequence[JokerBase],
+    vouchers: Sequence[Voucher],
+    n_jokers: int,
+    rng: Optional[np.random.Generator] = None,
+) -> list[JokerBase]:
+    rng = resolve_rng(rng)
     sampled_jokers: list[JokerBase] = []
+    allow_repeat = JokerEffects.from_jokers(jokers).showman > 0
+    prob_edition_modifier = 1.0
+    if any([isinstance(v, GlowUp) for v in vouchers]):
+        prob_edition_modifier = 4.0
+    elif any([isinstance(v, Hone) for v in vouchers]):
+        prob_edition_modifier = 2.0
     for _ in range(n_jokers):
-        prob_rarity = random.random()
+        prob_rarity = rng.random()
 
         # Get edition
-        prob_edition_modifier = 1.0
-        if any([isinstance(v, GlowUp) for v in vouchers]):
-            prob_edition_modifier = 4.0
-        elif any([isinstance(v, Hone) for v in vouchers]):
-            prob_edition_modifier = 2.0
-
-        prob_edition = random.random()
+        prob_edition = rng.random()
         edition: Edition = BaseEdition()
         poly_prob = 0.003 * prob_edition_modifier
         holo_prob = 0.014 * prob_edition_modifier
@@ -40,12 +48,14 @@ def sample_jokers(jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], n_jo
             rarity = Rarity.RARE
 
         jokers_target_rarity = JOKERS[rarity]
-        allow_repeat = any([isinstance(j, Showman) for j in jokers])
         if not allow_repeat:
             jokers_in_use = list(jokers) + sampled_jokers
             jokers_target_rarity = [j for j in jokers_target_rarity
                                     if all([j != owned_j.__class__ for owned_j in jokers_in_use])]
-        sampled_joker = random.choice(jokers_target_rarity)()
+        if not jokers_target_rarity:
+            # As in the game, an exhausted pool yields the plain Joker
+            jokers_target_rarity = [Joker]
+        sampled_joker = choice(rng, jokers_target_rarity)()
         sampled_joker.set_edition(edition)
         sampled_jokers.append(sampled_joker)
     return sampled_jokers
@@ -1,4 +1,3 @@
-import random
 from typing import Sequence
 
 from balatro_gym.cards.interfaces import (
@@ -17,10 +16,10 @@ from balatro_gym.cards.interfaces import (
     Suit,
     WildCard,
 )
-from balatro_gym.cards.joker.effect_joker import OopsAll6s
 from balatro_gym.cards.joker.utils import sample_jokers
 from balatro_gym.cards.planet import PLANET_CARDS
 from balatro_gym.interfaces import BoardState, Tarot
+from balatro_gym.rng import choice, choices, sample
 
 
 class Fool(Tarot):
@@ -49,7 +48,7 @@ class HighPriestess(Tarot):
             return False
         n_cards_to_generate = min(2, num_slots - n_consumables)
         # TODO: Make sure ceres, planetx and eris are only sampled once the associated hand is played once
-        for planet_card in random.sample(PLANET_CARDS, n_cards_to_generate):
+        for planet_card in sample(board_state.rng.consumables, PLANET_CARDS, n_cards_to_generate):
             board_state.acquire_consumable(planet_card())
         return True
 
@@ -70,7 +69,7 @@ class Emperor(Tarot):
         if num_slots > n_consumables:
             return False
         n_cards_to_generate = min(2, num_slots - n_consumables)
-        for tarot_card in random.sample(TAROT_CARDS, n_cards_to_generate):
+        for tarot_card in sample(board_state.rng.consumables, TAROT_CARDS, n_cards_to_generate):
             board_state.acquire_consumable(tarot_card())
         return True
 
@@ -121,15 +120,16 @@ class WheelOfFortune(Tarot):
         if len(non_enhanced_jokers) < 1:
             return False
 
-        prob = random.random()
-        # OopsAll6s doubles probabilities
-        n_oops = len([isinstance(j, OopsAll6s) for j in board_state.jokers]) * 2
-        if prob < 0.25 * n_oops:
+        rng = board_state.rng.consumables
+        prob = rng.random()
+        # Each OopsAll6s doubles probabilities
+        if prob < 0.25 * 2 ** board_state.joker_effects.oops_all_6s:
             editions = [Foil(), Holographic(), Polychrome()]
             probabilities = [0.5, 0.35, 0.15]
-            selected_edition = random.choices(editions, weights=probabilities, k=1)[0]
-            selected_joker = random.choice(non_enhanced_jokers)
+            selected_edition = choices(rng, editions, k=1, weights=probabilities)[0]
+            selected_joker = choice(rng, non_enhanced_jokers)
             selected_joker.set_edition(selected_edition)
+            board_state.jokers_changed()
         return True
 
 
@@ -223,7 +223,7 @@ class Judgement(Tarot):
         n_jokers = len(board_state.jokers)
         if num_slots <= n_jokers:
             return False
-        new_joker = sample_jokers(board_state.jokers, board_state.vouchers, 1)[0]
+        new_joker = sample_jokers(board_state.jokers, board_state.vouchers, 1, board_state.rng.consumables)[0]
         board_state.acquire_joker(new_joker)
         return True
 
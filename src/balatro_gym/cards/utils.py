@@ -2,7 +2,6 @@ from collections import Counter
 from collections.abc import Sequence
 
 from balatro_gym.cards.interfaces import PlayingCard, Rank
-from balatro_gym.cards.joker.effect_joker import FourFingers
 from balatro_gym.interfaces import BoardState
 
 
@@ -12,7 +11,7 @@ def contains_three_set(hand: Sequence[PlayingCard]) -> int:
 
 
 def get_flush(hand: Sequence[PlayingCard], board: BoardState) -> Sequence[PlayingCard]:
-    req_length = 4 if any(isinstance(joker, FourFingers) for joker in board.jokers) else 5
+    req_length = 4 if board.joker_effects.four_fingers else 5
     counter: Counter = Counter()
     for card in hand:
         if card.enhancement is not None:
@@ -31,7 +30,7 @@ def get_flush(hand: Sequence[PlayingCard], board: BoardState) -> Sequence[Playin
 
 
 def get_straight(hand: Sequence[PlayingCard], board: BoardState) -> Sequence[PlayingCard]:
-    req_length = 4 if any(isinstance(joker, FourFingers) for joker in board.jokers) else 5
+    req_length = 4 if board.joker_effects.four_fingers else 5
     sorted_ranks = sorted([card.rank.value.order for card in hand])
     if (is_consecutive(sorted_ranks) or is_royal(hand, board)) and len(sorted_ranks) >= req_length:
         return hand
@@ -51,7 +50,7 @@ def is_consecutive(ordered_ranks: Sequence[int]) -> bool:
 
 def is_royal(hand: Sequence[PlayingCard], board: BoardState) -> bool:
     valid = [{1, 10, 11, 12, 13}]
-    if any(isinstance(joker, FourFingers) for joker in board.jokers):
+    if board.joker_effects.four_fingers:
         valid.extend([{10, 11, 12, 13}, {1, 11, 12, 13}])
     return set([card.rank.value.order for card in hand]) in valid
 
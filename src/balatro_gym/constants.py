@@ -4,6 +4,14 @@ DEFAULT_NUM_CONSUMABLE = 2
 DEFAULT_START_MONEY = 4
 DEFAULT_NUM_JOKER_SLOTS = 5
 
+# Upper bounds used to size fixed-shape observations and action spaces.
+MAX_HAND_SIZE = 10
+MAX_PLAYED_CARDS = 5
+MAX_NUM_JOKER_SLOTS = 10
+MAX_NUM_CONSUMABLE = 4
+MAX_NUM_SHOP_SLOTS = 4
+MAX_NUM_BOOSTER_PACKS = 4
+
 BLIND_ANTE_TO_BASE: Mapping[int, float] = {
     0: 100,
     1: 300,
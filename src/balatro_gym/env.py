@@ -0,0 +1,92 @@
+from collections.abc import Sequence
+from typing import Any, Optional, SupportsFloat
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from .constants import MAX_HAND_SIZE
+from .game.engine import BoardAction, GameAction, GameActionTypes, GameState, HandAction, Run
+from .game.observation import ObservationEncoder
+
+__all__ = ["BalatroEnv", "ACTION_TYPES"]
+
+ACTION_TYPES: Sequence[GameActionTypes] = (
+    HandAction.DISCARD,
+    HandAction.SCORE_HAND,
+    BoardAction.START_ROUND,
+    BoardAction.VIEW_SHOP,
+    BoardAction.NEXT_ROUND,
+)
+"""Maps the `action_type` entry of an action to the engine action."""
+
+_SLOT_BITS = 1 << np.arange(MAX_HAND_SIZE, dtype=np.int64)
+
+ObsType = dict[str, np.ndarray]
+ActType = dict[str, Any]
+
+
+class BalatroEnv(gym.Env[ObsType, ActType]):
+    """A Gymnasium environment around `engine.Run`.
+
+    Actions are a dict with an `action_type` index into `ACTION_TYPES` and a `selected` binary mask over the hand
+    slots. Observations are written in place into preallocated buffers (see `ObservationEncoder`), so the arrays
+    returned by `reset` and `step` are reused between calls unless `copy_observations` is set.
+
+    The reward is the fraction of the current blind's required score gained by the action. The episode terminates
+    when the run is lost and is truncated once the supported blinds are exhausted or after `max_steps` actions.
+    """
+
+    metadata: dict[str, Any] = {"render_modes": []}
+
+    def __init__(
+        self,
+        max_steps: Optional[int] = None,
+        copy_observations: bool = False,
+        buffers: Optional[dict[str, np.ndarray]] = None,
+    ) -> None:
+        self._encoder = ObservationEncoder(buffers)
+        self._copy_observations = copy_observations
+        self.observation_space = self._encoder.observation_space  # type: ignore[assignment]
+        self.action_space = spaces.Dict(
+            {
+                "action_type": spaces.Discrete(len(ACTION_TYPES)),
+                "selected": spaces.MultiBinary(MAX_HAND_SIZE),
+            }
+        )
+        self._max_steps = max_steps
+        self._run = Run()
+
+    @property
+    def run(self) -> Run:
+        return self._run
+
+    def reset(self, *, seed: Optional[int] = None, options: Optional[dict[str, Any]] = None) -> tuple[ObsType, dict]:
+        super().reset(seed=seed)
+        self._run.game_reset(seed)
+        return self._observe(), {}
+
+    def step(self, action: ActType) -> tuple[ObsType, SupportsFloat, bool, bool, dict]:
+        run = self._run
+        blind = run.blind_state
+
+        action_type = ACTION_TYPES[int(action["action_type"])]
+        mask = 0
+        if isinstance(action_type, HandAction):
+            mask = int(np.dot(np.asarray(action["selected"]) != 0, _SLOT_BITS))
+        done, score = run.step_into(GameAction(action_type, selected_mask=mask), self._encoder)
+
+        reward = score / blind.required_score if blind is not None else 0.0
+        terminated = done and run.game_state is GameState.IN_ANTE
+        truncated = run.game_state is GameState.IN_BLIND_SELECT and run.board_state.round_num >= len(run.blinds) - 1
+        if self._max_steps is not None and run.action_counter >= self._max_steps:
+            truncated = True
+        return self._copy(self._encoder.buffers), reward, terminated, truncated, {}
+
+    def _observe(self) -> ObsType:
+        return self._copy(self._encoder.encode(self._run))
+
+    def _copy(self, obs: ObsType) -> ObsType:
+        if self._copy_observations:
+            return {key: value.copy() for key, value in obs.items()}
+        return obs
@@ -0,0 +1,43 @@
+"""A fixed table of every card subset that can be played or discarded, see `Run.legal_hand_actions`.
+
+Subsets are ordered by their bitmask over the hand slots, so the subsets of a hand of `n` cards are exactly the first
+`NUM_SUBSETS[n]` rows of the table (e.g. the 218 subsets of an 8-card hand). The table is built once for
+`MAX_HAND_SIZE` and shared by every hand size, which keeps the action space fixed when the hand size changes."""
+
+from collections.abc import Sequence
+from typing import TypeVar
+
+import numpy as np
+
+from ..constants import MAX_HAND_SIZE, MAX_PLAYED_CARDS
+
+__all__ = [
+    "NUM_SUBSETS",
+    "SUBSET_INDICES",
+    "SUBSET_MASKS",
+    "SUBSET_SIZES",
+    "subset_cards",
+]
+
+_T = TypeVar("_T")
+
+SUBSET_MASKS: np.ndarray = np.array(
+    [mask for mask in range(1, 1 << MAX_HAND_SIZE) if mask.bit_count() <= MAX_PLAYED_CARDS], dtype=np.int64
+)
+"""Bitmask over the hand slots of each subset, in increasing order."""
+SUBSET_SIZES: np.ndarray = np.array([int(mask).bit_count() for mask in SUBSET_MASKS], dtype=np.int64)
+SUBSET_INDICES: np.ndarray = np.full((len(SUBSET_MASKS), MAX_PLAYED_CARDS), -1, dtype=np.int64)
+"""Hand slots of each subset in increasing order, padded with -1."""
+for _row, _mask in enumerate(SUBSET_MASKS):
+    _slots = [slot for slot in range(MAX_HAND_SIZE) if _mask >> slot & 1]
+    SUBSET_INDICES[_row, : len(_slots)] = _slots
+NUM_SUBSETS: np.ndarray = np.searchsorted(SUBSET_MASKS, 1 << np.arange(MAX_HAND_SIZE + 1))
+"""The number of subsets of a hand of each size, i.e. the length of its prefix of the table."""
+for _array in (SUBSET_MASKS, SUBSET_SIZES, SUBSET_INDICES, NUM_SUBSETS):
+    _array.flags.writeable = False
+
+
+def subset_cards(hand: Sequence[_T], subset: int) -> list[_T]:
+    """Returns the cards of `hand` selected by row `subset` of the table."""
+    slots = SUBSET_INDICES[subset, : SUBSET_SIZES[subset]]
+    return [hand[slot] for slot in slots]
@@ -0,0 +1,663 @@
+"""A structure-of-arrays version of the engine that advances many runs with NumPy operations.
+
+The batched runs follow the rules of `Run._process_hand_action` and `score_hand` for the standard deck: the
+round loop is played back to back (the shop is skipped) and cards carry no enhancements, editions or seals.
+`score_hands` exposes the same scoring kernel for offline batches of hands against a fixed joker lineup, and
+`classify_hands` its poker hand classifier, which also supports stone and wild cards."""
+
+from collections.abc import Callable, Mapping, Sequence
+from typing import NamedTuple, Optional, Union
+
+import numpy as np
+
+from ..cards.decks import STANDARD_DECK
+from ..cards.encoding import (
+    ADDED_CHIPS_SHIFT,
+    EDITION_INDEX,
+    EDITIONS,
+    EMPTY_CARD,
+    ENHANCEMENT_INDEX,
+    ENHANCEMENT_MASK,
+    ENHANCEMENT_SHIFT,
+    RANK_MASK,
+    RANK_SHIFT,
+    SUIT_INDEX,
+    SUIT_MASK,
+    SUIT_SHIFT,
+    decode_card,
+    encode_card,
+)
+from ..cards.interfaces import Deck, Rank, StoneCard, Suit, WildCard
+from ..cards.joker import effect_joker as ejoker
+from ..cards.joker import joker
+from ..cards.joker.constants import JOKER_IDS
+from ..constants import DEFAULT_NUM_JOKER_SLOTS, DEFAULT_START_MONEY, MAX_PLAYED_CARDS
+from ..interfaces import BlindState, BoardState, JokerBase, PokerHandType
+from ..rng import RandomStreams
+from .blinds import generate_run_blinds, get_blind_required_score
+from .engine import HandAction
+from .scoring import _HAND_TYPE_INDEX, POKER_HAND_TYPES, _score_hand
+
+__all__ = [
+    "BatchedRun",
+    "HandClasses",
+    "HandScores",
+    "POKER_HAND_TYPES",
+    "VECTORIZED_JOKERS",
+    "classify_hands",
+    "score_hands",
+]
+
+_BASE_CHIPS = np.array([hand_type.value.chips for hand_type in POKER_HAND_TYPES], dtype=np.float64)
+_BASE_MULT = np.array([hand_type.value.mult for hand_type in POKER_HAND_TYPES], dtype=np.float64)
+_DELTA_CHIPS = np.array([hand_type.value.delta_chips for hand_type in POKER_HAND_TYPES], dtype=np.float64)
+_DELTA_MULT = np.array([hand_type.value.delta_mult for hand_type in POKER_HAND_TYPES], dtype=np.float64)
+
+# Indexed by rank order, 0 is the empty slot
+_RANK_CHIPS = np.array([0] + [Rank.from_int(order).value.value for order in range(1, 14)], dtype=np.float64)
+_NUM_RANK_SLOTS = 14
+_RANKS = np.arange(_NUM_RANK_SLOTS)
+_SUITS = np.arange(len(Suit))
+_ROYAL = sum(1 << order for order in (1, 10, 11, 12, 13))
+_FOUR_FINGERS_ROYALS = (sum(1 << order for order in (10, 11, 12, 13)), sum(1 << order for order in (1, 11, 12, 13)))
+_FIBONACCI_RANKS = np.isin(_RANKS, [1, 2, 3, 5, 8])
+_EVEN_RANKS = np.isin(_RANKS, [2, 4, 6, 8, 10])
+_FACE_RANKS = np.isin(_RANKS, [11, 12, 13])
+_HACK_RANKS = np.isin(_RANKS, [2, 3, 4, 5])
+# Indexed by edition index
+_EDITION_CHIPS = np.array([edition().get_chips() for edition in EDITIONS], dtype=np.float64)
+_EDITION_MULT = np.array([edition().get_mult() for edition in EDITIONS], dtype=np.float64)
+_EDITION_MULTIPLICATION = np.array([edition().get_multiplication() for edition in EDITIONS], dtype=np.float64)
+_EDITION_NEGATIVE = np.array([edition().is_negative() for edition in EDITIONS])
+# The enhancement, edition and seal bits of a card code, which are all zero for a plain card
+_MODIFIER_BITS = (1 << ADDED_CHIPS_SHIFT) - (1 << ENHANCEMENT_SHIFT)
+
+_STANDARD_CODES = np.array([encode_card(card) for card in STANDARD_DECK], dtype=np.int64)
+_BLINDS = generate_run_blinds()
+_MAX_ROUND = len(_BLINDS) - 1
+# The engine looks blinds up by round number, see `Run._setup_round`. Late blinds overflow int64, so scores are floats.
+_REQUIRED_SCORES = np.array([get_blind_required_score(i) for i in range(len(_BLINDS))], dtype=np.float64)
+_REWARDS = np.array([blind.reward for blind in _BLINDS], dtype=np.int64)
+
+
+class HandFeatures(NamedTuple):
+    num_cards: np.ndarray
+    rank_counts: np.ndarray
+    slot_counts: np.ndarray
+    """The number of cards sharing the rank of the card in each slot."""
+    top_count: np.ndarray
+    second_count: np.ndarray
+    flush: np.ndarray
+    straight: np.ndarray
+    royal: np.ndarray
+
+
+def _hand_features(
+    ranks: np.ndarray,
+    suits: np.ndarray,
+    mask: np.ndarray,
+    four_fingers: np.ndarray,
+    stone: Optional[np.ndarray] = None,
+    wild: Optional[np.ndarray] = None,
+) -> HandFeatures:
+    """Vectorized equivalent of the rank counter, `get_flush`, `get_straight` and `is_royal` for the masked cards.
+
+    Stone cards have no suit and wild cards count towards every suit, as in `get_poker_hand`. Both still count by rank.
+    """
+    num_cards = mask.sum(axis=1)
+    ranks = np.where(mask, ranks, 0)
+    rank_counts = ((ranks[..., None] == _RANKS) & mask[..., None]).sum(axis=1)
+    slot_counts = np.take_along_axis(rank_counts, ranks, axis=1) * mask
+    sorted_counts = np.sort(rank_counts, axis=1)
+    top_count, second_count = sorted_counts[:, -1], sorted_counts[:, -2]
+    req_length = np.where(four_fingers, 4, 5)
+
+    suited = mask
+    num_wild = np.zeros(len(mask), dtype=np.int64)
+    if stone is not None:
+        suited = suited & ~stone
+    if wild is not None:
+        suited = suited & ~wild
+        num_wild = (mask & wild).sum(axis=1)
+    suit_counts = ((suits[..., None] == _SUITS) & suited[..., None]).sum(axis=1)
+    flush = suit_counts.max(axis=1) + num_wild >= req_length
+
+    rank_bits = np.bitwise_or.reduce(np.where(mask, 1 << ranks, 0), axis=1)
+    royal = rank_bits == _ROYAL
+    royal |= four_fingers & np.isin(rank_bits, _FOUR_FINGERS_ROYALS)
+    num_distinct = (rank_counts > 0).sum(axis=1)
+    min_rank = np.where(mask, ranks, _NUM_RANK_SLOTS).min(axis=1)
+    max_rank = ranks.max(axis=1)
+    consecutive = (num_cards > 0) & (num_distinct == num_cards) & (max_rank - min_rank == num_cards - 1)
+    straight = (consecutive | royal) & (num_cards >= req_length)
+    return HandFeatures(num_cards, rank_counts, slot_counts, top_count, second_count, flush, straight, royal)
+
+
+def _classify(
+    features: HandFeatures, ranks: np.ndarray, mask: np.ndarray, stone: Optional[np.ndarray] = None
+) -> tuple[np.ndarray, np.ndarray]:
+    """Vectorized `get_poker_hand`. Returns the hand type indices and the mask of scored cards."""
+    f = features
+    is_full = (f.top_count == 3) & (f.second_count == 2)
+    is_two_pair = (f.top_count >= 2) & (f.second_count >= 2)
+    conditions = [
+        f.royal & f.flush & f.straight,
+        f.flush & f.straight,
+        f.flush & is_full,
+        f.flush & (f.top_count == 5),
+        f.straight,
+        f.flush,
+        f.top_count == 5,
+        f.top_count == 4,
+        is_full,
+        f.top_count == 3,
+        is_two_pair,
+        f.top_count == 2,
+    ]
+    choices = [
+        PokerHandType.ROYAL_FLUSH,
+        PokerHandType.STRAIGHT_FLUSH,
+        PokerHandType.FLUSH_HOUSE,
+        PokerHandType.FLUSH_FIVE,
+        PokerHandType.STRAIGHT,
+        PokerHandType.FLUSH,
+        PokerHandType.FIVE_SET,
+        PokerHandType.FOUR_SET,
+        PokerHandType.FULL_HOUSE,
+        PokerHandType.THREE_SET,
+        PokerHandType.TWO_PAIR,
+        PokerHandType.PAIR,
+    ]
+    hand_type = np.select(conditions, [_HAND_TYPE_INDEX[c] for c in choices], _HAND_TYPE_INDEX[PokerHandType.HIGH_CARD])
+
+    # Ties on the largest set go to the rank that was played first, as with `Counter.most_common`
+    first_top_slot = np.argmax(mask & (f.slot_counts == f.top_count[:, None]), axis=1)
+    top_rank = np.take_along_axis(ranks, first_top_slot[:, None], axis=1)
+    largest_set = mask & (ranks == top_rank)
+    whole_hand = np.isin(hand_type, [_HAND_TYPE_INDEX[c] for c in (*choices[:7], PokerHandType.FULL_HOUSE)])
+    two_pair = hand_type == _HAND_TYPE_INDEX[PokerHandType.TWO_PAIR]
+    scored = np.where(
+        whole_hand[:, None], mask, np.where(two_pair[:, None], mask & (f.slot_counts >= 2), largest_set)
+    )
+    if stone is not None:
+        # Stone cards always score, except alongside a five of a kind or a lone high card
+        with_stone_types = (PokerHandType.FOUR_SET, PokerHandType.THREE_SET, PokerHandType.TWO_PAIR, PokerHandType.PAIR)
+        with_stone = np.isin(hand_type, [_HAND_TYPE_INDEX[c] for c in with_stone_types])
+        scored |= with_stone[:, None] & mask & stone
+    return hand_type, scored
+
+
+class HandClasses(NamedTuple):
+    hand_type: np.ndarray
+    """The poker hand of each row, as an index into `POKER_HAND_TYPES`."""
+    scored: np.ndarray
+    """Mask of the cards that score, i.e. the played cards of `get_poker_hand`."""
+
+
+_STONE_INDEX = ENHANCEMENT_INDEX[StoneCard]
+_WILD_INDEX = ENHANCEMENT_INDEX[WildCard]
+
+
+def classify_hands(codes: np.ndarray, four_fingers: Union[bool, np.ndarray] = False) -> HandClasses:
+    """Classifies each row of `codes` as `get_poker_hand` would, with array operations only.
+
+    `codes` is an (N, k) array of packed card codes (see `cards.encoding`) with k at most `MAX_PLAYED_CARDS`, 0 marking
+    an empty slot. Only the rank, suit and enhancement of each card are read. `four_fingers` tells whether `FourFingers`
+    is in play, for all rows or per row.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    if codes.ndim != 2 or codes.shape[1] > MAX_PLAYED_CARDS:
+        raise ValueError(f"Expected an (N, k) array of codes with k <= {MAX_PLAYED_CARDS}, got shape {codes.shape}.")
+    played = codes != EMPTY_CARD
+    ranks = np.where(played, codes >> RANK_SHIFT & RANK_MASK, 0)
+    suits = codes >> SUIT_SHIFT & SUIT_MASK
+    enhancements = codes >> ENHANCEMENT_SHIFT & ENHANCEMENT_MASK
+    stone, wild = enhancements == _STONE_INDEX, enhancements == _WILD_INDEX
+    four_fingers = np.broadcast_to(np.asarray(four_fingers, dtype=bool), (len(codes),))
+    features = _hand_features(ranks, suits, played, four_fingers, stone, wild)
+    return HandClasses(*_classify(features, ranks, played, stone))
+
+
+def _three_identical(codes: np.ndarray, mask: np.ndarray) -> np.ndarray:
+    """Vectorized `contains_three_set`, which counts equal cards rather than ranks."""
+    equal = (codes[:, :, None] == codes[:, None, :]) & mask[:, :, None] & mask[:, None, :]
+    counts = equal.sum(axis=2)
+    # Each group of equal cards is counted once per member, so divide the per-slot contribution back out
+    triples = np.where(mask, (counts // 3) / np.maximum(counts, 1), 0).sum(axis=1)
+    return np.isclose(triples, 1)
+
+
+class _ScoringContext(NamedTuple):
+    scored: HandFeatures
+    scored_suit_counts: np.ndarray
+    three_identical: np.ndarray
+    num_jokers: np.ndarray
+    num_negative_jokers: np.ndarray
+    num_joker_slots: int
+
+
+# Hand-level joker effects as (chips, mult, multiplication) updates over the rows holding the joker
+_HandEffect = Callable[[_ScoringContext, np.ndarray, np.ndarray, np.ndarray], None]
+
+
+def _suit_mult(suit: Suit) -> _HandEffect:
+    def effect(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+        mult[rows] += 3 * ctx.scored_suit_counts[rows, SUIT_INDEX[suit]]
+
+    return effect
+
+
+def _add_mult(amount: float, condition: Callable[[_ScoringContext], np.ndarray]) -> _HandEffect:
+    def effect(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+        mult[rows] += amount * condition(ctx)[rows]
+
+    return effect
+
+
+def _add_chips(amount: float, condition: Callable[[_ScoringContext], np.ndarray]) -> _HandEffect:
+    def effect(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+        chips[rows] += amount * condition(ctx)[rows]
+
+    return effect
+
+
+def _pair(ctx: _ScoringContext) -> np.ndarray:
+    return ctx.scored.top_count >= 2
+
+
+def _two_pair(ctx: _ScoringContext) -> np.ndarray:
+    return (ctx.scored.top_count >= 2) & (ctx.scored.second_count >= 2)
+
+
+def _joker_stencil(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+    mult[rows] *= ctx.num_joker_slots - ctx.num_jokers[rows] + ctx.num_negative_jokers[rows]
+
+
+def _abstract_joker(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+    mult[rows] += 3 * ctx.num_jokers[rows]
+
+
+def _the_duo(ctx: _ScoringContext, rows: np.ndarray, chips: np.ndarray, mult: np.ndarray) -> None:
+    mult[rows] *= np.where(_pair(ctx)[rows], 2.0, 1.0)
+
+
+_HAND_EFFECTS: Mapping[type[JokerBase], _HandEffect] = {
+    joker.Joker: _add_mult(4, lambda ctx: np.ones_like(ctx.scored.flush)),
+    joker.GreedyJoker: _suit_mult(Suit.DIAMONDS),
+    joker.LustyJoker: _suit_mult(Suit.HEARTS),
+    joker.WrathfulJoker: _suit_mult(Suit.CLUBS),
+    joker.GluttonousJoker: _suit_mult(Suit.SPADES),
+    joker.JollyJoker: _add_mult(8, _pair),
+    joker.ZanyJoker: _add_mult(12, lambda ctx: ctx.three_identical),
+    joker.MadJoker: _add_mult(10, _two_pair),
+    joker.CrazyJoker: _add_mult(12, lambda ctx: ctx.scored.straight),
+    joker.DrollJoker: _add_mult(10, lambda ctx: ctx.scored.flush),
+    joker.SlyJoker: _add_chips(50, _pair),
+    joker.WilyJoker: _add_chips(100, lambda ctx: ctx.three_identical),
+    joker.CleverJoker: _add_chips(80, _two_pair),
+    joker.DeviousJoker: _add_chips(100, lambda ctx: ctx.scored.straight & (ctx.scored.num_cards == 5)),
+    joker.CraftyJoker: _add_chips(80, lambda ctx: ctx.scored.flush),
+    joker.HalfJoker: _add_mult(20, lambda ctx: ctx.scored.num_cards <= 3),
+    joker.JokerStencil: _joker_stencil,
+    joker.AbstractJoker: _abstract_joker,
+    joker.GrosMichel: _add_mult(15, lambda ctx: np.ones_like(ctx.scored.flush)),
+    joker.TheDuo: _the_duo,
+}
+"""Jokers missing from this mapping have no hand-level effect on a standard deck."""
+_HAND_EFFECTS_BY_ID: Mapping[int, _HandEffect] = {JOKER_IDS[j]: effect for j, effect in _HAND_EFFECTS.items()}
+
+_FOUR_FINGERS_ID = JOKER_IDS[ejoker.FourFingers]
+_HACK_ID = JOKER_IDS[ejoker.Hack]
+_PAREIDOLIA_ID = JOKER_IDS[ejoker.Pareidolia]
+_FIBONACCI_ID = JOKER_IDS[joker.Fibonacci]
+_EVEN_STEVEN_ID = JOKER_IDS[joker.EvenSteven]
+_SCARY_FACE_ID = JOKER_IDS[joker.ScaryFace]
+_GROS_MICHEL_ID = JOKER_IDS[joker.GrosMichel]
+
+VECTORIZED_JOKERS: frozenset[type[JokerBase]] = frozenset(
+    [
+        *_HAND_EFFECTS,
+        ejoker.FourFingers,
+        ejoker.Hack,
+        ejoker.Pareidolia,
+        joker.Fibonacci,
+        joker.EvenSteven,
+        joker.ScaryFace,
+        # No effect on the score of plain played cards when no cards are held
+        ejoker.Mime,
+        ejoker.Showman,
+        ejoker.OopsAll6s,
+        ejoker.ChaosTheClown,
+        joker.DelayedGratification,
+    ]
+)
+"""Jokers scored by `score_hands` with array operations. The others, e.g. `SteelJoker` which reads the deck, fall
+back to `score_hand`."""
+
+
+class HandScores(NamedTuple):
+    hand_type: np.ndarray
+    chips: np.ndarray
+    mult: np.ndarray
+    destroyed_jokers: np.ndarray
+    """Mask over the joker slots of jokers that destroyed themselves while scoring."""
+
+    @property
+    def score(self) -> np.ndarray:
+        return self.chips * self.mult
+
+
+def _score_hands(
+    codes: np.ndarray,
+    played: np.ndarray,
+    joker_ids: np.ndarray,
+    hand_levels: np.ndarray,
+    num_joker_slots: int,
+    rng: Optional[np.random.Generator],
+    joker_editions: Optional[np.ndarray] = None,
+) -> HandScores:
+    """Vectorized `score_hand` for rows of standard cards, see the module docstring for the supported rules.
+
+    `joker_editions` holds the edition index of each joker, all base editions by default. Without `rng` no joker is
+    destroyed.
+    """
+    ranks = np.where(played, codes >> RANK_SHIFT & RANK_MASK, 0)
+    suits = codes >> SUIT_SHIFT & SUIT_MASK
+    rows = np.arange(len(codes))
+    four_fingers = (joker_ids == _FOUR_FINGERS_ID).any(axis=1)
+
+    hand_type, scored = _classify(_hand_features(ranks, suits, played, four_fingers), ranks, played)
+    level = hand_levels[rows, hand_type] - 1
+    chips = _BASE_CHIPS[hand_type] + _DELTA_CHIPS[hand_type] * level
+    mult = _BASE_MULT[hand_type] + _DELTA_MULT[hand_type] * level
+
+    # Played cards, including retriggers
+    num_triggers = 1 + ((joker_ids == _HACK_ID).any(axis=1)[:, None] & _HACK_RANKS[ranks])
+    card_chips = _RANK_CHIPS[ranks] + (codes >> ADDED_CHIPS_SHIFT)
+    chips += (card_chips * num_triggers * scored).sum(axis=1)
+
+    # Per-card joker effects are additive, so they can be applied per joker type
+    def num_scored(rank_mask: np.ndarray) -> np.ndarray:
+        return (rank_mask[ranks] & scored).sum(axis=1)
+
+    mult += 8 * (joker_ids == _FIBONACCI_ID).sum(axis=1) * num_scored(_FIBONACCI_RANKS)
+    mult += 4 * (joker_ids == _EVEN_STEVEN_ID).sum(axis=1) * num_scored(_EVEN_RANKS)
+    pareidolia = (joker_ids == _PAREIDOLIA_ID).any(axis=1)
+    num_faces = np.where(pareidolia, scored.sum(axis=1), num_scored(_FACE_RANKS))
+    chips += 30 * (joker_ids == _SCARY_FACE_ID).sum(axis=1) * num_faces
+
+    # Hand-level joker effects and joker editions, in joker order
+    if joker_editions is None:
+        joker_editions = np.zeros_like(joker_ids)
+    ctx = _ScoringContext(
+        _hand_features(ranks, suits, scored, four_fingers),
+        ((suits[..., None] == _SUITS) & scored[..., None]).sum(axis=1),
+        _three_identical(codes, scored),
+        (joker_ids > 0).sum(axis=1),
+        _EDITION_NEGATIVE[joker_editions].sum(axis=1),
+        num_joker_slots,
+    )
+    for slot in range(joker_ids.shape[1]):
+        slot_ids = joker_ids[:, slot]
+        for joker_id in np.unique(slot_ids[slot_ids > 0]):
+            effect = _HAND_EFFECTS_BY_ID.get(int(joker_id))
+            if effect is not None:
+                effect(ctx, slot_ids == joker_id, chips, mult)
+        editions = joker_editions[:, slot]
+        mult += _EDITION_MULT[editions]
+        chips += _EDITION_CHIPS[editions]
+        mult *= _EDITION_MULTIPLICATION[editions]
+
+    destroyed = np.zeros(joker_ids.shape, dtype=bool)
+    if rng is not None:
+        destroyed = (joker_ids == _GROS_MICHEL_ID) & (rng.random(joker_ids.shape) < 1 / 6)
+    return HandScores(hand_type, chips, mult, destroyed)
+
+
+def score_hands(
+    codes: np.ndarray,
+    jokers: Sequence[JokerBase] = (),
+    hand_levels: Optional[np.ndarray] = None,
+    num_joker_slots: int = DEFAULT_NUM_JOKER_SLOTS,
+    seed: Optional[int] = None,
+) -> HandScores:
+    """Scores each row of `codes` as a played hand against the same jokers, as `score_hand` would with no held cards.
+
+    `codes` is an (N, `MAX_PLAYED_CARDS`) array of packed card codes (see `cards.encoding`), 0 marking an empty slot,
+    and `hand_levels` holds the poker hand levels ordered as `POKER_HAND_TYPES`, all 1 by default. Every row is scored
+    against the whole lineup, so jokers that destroy themselves (e.g. `GrosMichel`) are never destroyed.
+
+    Rows of cards without enhancements, editions or seals are scored with array operations when every joker is in
+    `VECTORIZED_JOKERS`. The other rows are decoded and scored one at a time by `score_hand` on a fresh board, drawing
+    the random effects of their cards from `seed`.
+    """
+    codes = np.asarray(codes, dtype=np.int64)
+    levels = np.ones(len(POKER_HAND_TYPES), dtype=np.int64) if hand_levels is None else np.asarray(hand_levels)
+    n = len(codes)
+    played = codes != EMPTY_CARD
+    vectorized = ((codes & _MODIFIER_BITS) == 0).all(axis=1)
+    vectorized &= all(type(j) in VECTORIZED_JOKERS for j in jokers)
+
+    hand_type = np.zeros(n, dtype=np.int64)
+    chips = np.zeros(n, dtype=np.float64)
+    mult = np.zeros(n, dtype=np.float64)
+    rows = np.flatnonzero(vectorized)
+    if len(rows):
+        lineup_ids = np.array([JOKER_IDS[type(j)] for j in jokers], dtype=np.int64)
+        lineup_editions = np.array([EDITION_INDEX[type(j.edition)] for j in jokers], dtype=np.int64)
+        joker_ids = np.broadcast_to(lineup_ids, (len(rows), len(jokers)))
+        scores = _score_hands(
+            codes[rows],
+            played[rows],
+            joker_ids,
+            np.broadcast_to(levels, (len(rows), len(levels))),
+            num_joker_slots,
+            None,
+            np.broadcast_to(lineup_editions, joker_ids.shape),
+        )
+        hand_type[rows], chips[rows], mult[rows] = scores.hand_type, scores.chips, scores.mult
+
+    rows = np.flatnonzero(~vectorized)
+    if len(rows):
+        board = BoardState(RandomStreams.from_seed(seed))
+        board.num_joker_slots = num_joker_slots
+        for poker_hand_type, level in zip(POKER_HAND_TYPES, levels.tolist()):
+            board.get_poker_hand(poker_hand_type).level = level
+        for row in rows:
+            # Dealing the cards lets effects that destroy them remove them from the deck, as in a run
+            cards = [decode_card(code) for code in codes[row, played[row]].tolist()]
+            board.deck = Deck(cards[::-1], board.rng.deck)
+            hand = board.deck.deal(len(cards))
+            board.jokers = list(jokers)
+            row_type, chips[row], mult[row] = _score_hand(hand, board, BlindState([], 0, 0, 0, 0, 0))
+            hand_type[row] = _HAND_TYPE_INDEX[row_type]
+    return HandScores(hand_type, chips, mult, np.zeros((n, len(jokers)), dtype=bool))
+
+
+class BatchedRun:
+    """N runs held as structure-of-arrays state and stepped in lockstep.
+
+    Hands are arrays of packed card codes (see `cards.encoding`), 0 marking an empty slot. Actions are an (N, 2)
+    integer array of a `HandAction` value and a bitmask over the hand slots of the selected cards. Rows that are
+    `done` ignore their actions until they are `reset`.
+    """
+
+    hand: np.ndarray
+    deck: np.ndarray
+    deck_position: np.ndarray
+    """Number of cards dealt from each row of `deck` since the last shuffle."""
+    money: np.ndarray
+    ante_num: np.ndarray
+    round_num: np.ndarray
+    num_hands_remaining: np.ndarray
+    num_discards_remaining: np.ndarray
+    current_score: np.ndarray
+    required_score: np.ndarray
+    reward: np.ndarray
+    hand_levels: np.ndarray
+    """Poker hand levels, with columns ordered as `POKER_HAND_TYPES`."""
+    joker_ids: np.ndarray
+    """Joker ids as in `JOKER_IDS`, 0 marking an empty slot."""
+    lost: np.ndarray
+    done: np.ndarray
+    """Set once a run is lost or has beaten every supported blind."""
+
+    def __init__(
+        self,
+        num_runs: int,
+        jokers: Sequence[type[JokerBase]] = (),
+        hand_size: int = 8,
+        num_hands: int = 4,
+        num_discards: int = 3,
+        num_joker_slots: int = DEFAULT_NUM_JOKER_SLOTS,
+        seed: Optional[int] = None,
+    ) -> None:
+        if len(jokers) > num_joker_slots:
+            raise ValueError("More jokers were given than there are joker slots.")
+        self.num_runs = num_runs
+        self.hand_size = hand_size
+        self.num_hands = num_hands
+        self.num_discards = num_discards
+        self.num_joker_slots = num_joker_slots
+        self._initial_jokers = np.zeros(num_joker_slots, dtype=np.int64)
+        self._initial_jokers[: len(jokers)] = [JOKER_IDS[j] for j in jokers]
+        self._rng = np.random.default_rng(seed)
+
+        n = num_runs
+        self.hand = np.zeros((n, hand_size), dtype=np.int64)
+        self.deck = np.zeros((n, len(_STANDARD_CODES)), dtype=np.int64)
+        self.deck_position = np.zeros(n, dtype=np.int64)
+        self.money = np.zeros(n, dtype=np.int64)
+        self.ante_num = np.zeros(n, dtype=np.int64)
+        self.round_num = np.zeros(n, dtype=np.int64)
+        self.num_hands_remaining = np.zeros(n, dtype=np.int64)
+        self.num_discards_remaining = np.zeros(n, dtype=np.int64)
+        self.current_score = np.zeros(n, dtype=np.float64)
+        self.required_score = np.zeros(n, dtype=np.float64)
+        self.reward = np.zeros(n, dtype=np.int64)
+        self.hand_levels = np.ones((n, len(POKER_HAND_TYPES)), dtype=np.int64)
+        self.joker_ids = np.zeros((n, num_joker_slots), dtype=np.int64)
+        self.lost = np.zeros(n, dtype=bool)
+        self.done = np.zeros(n, dtype=bool)
+        self.reset()
+
+    def reset(self, rows: Optional[np.ndarray] = None) -> None:
+        """Starts new runs in the given rows (all rows by default), up to the first round being dealt."""
+        rows = np.arange(self.num_runs) if rows is None else np.flatnonzero(rows) if rows.dtype == bool else rows
+        self.money[rows] = DEFAULT_START_MONEY
+        self.ante_num[rows] = 0
+        self.round_num[rows] = 0
+        self.hand_levels[rows] = 1
+        self.joker_ids[rows] = self._initial_jokers
+        self.lost[rows] = False
+        self.done[rows] = False
+        self._shuffle(rows)
+        self._start_round(rows)
+
+    def _shuffle(self, rows: np.ndarray) -> None:
+        decks = np.broadcast_to(_STANDARD_CODES, (len(rows), len(_STANDARD_CODES)))
+        self.deck[rows] = self._rng.permuted(decks, axis=1)
+        self.deck_position[rows] = 0
+
+    def _deal(self, rows: np.ndarray, counts: np.ndarray) -> np.ndarray:
+        """Deals up to `counts` cards per row, padded with empty slots once a deck runs out."""
+        offsets = np.arange(self.hand_size)
+        deck_size = self.deck.shape[1]
+        positions = self.deck_position[rows, None] + offsets
+        valid = (offsets < counts[:, None]) & (positions < deck_size)
+        dealt = np.where(valid, np.take_along_axis(self.deck[rows], np.minimum(positions, deck_size - 1), 1), 0)
+        self.deck_position[rows] += valid.sum(axis=1)
+        return dealt
+
+    def _start_round(self, rows: np.ndarray) -> None:
+        # Mirrors `Run._setup_ante` and `Run._setup_round`
+        self.ante_num[rows] += self.round_num[rows] % 3 == 0
+        self.round_num[rows] += 1
+        self.required_score[rows] = _REQUIRED_SCORES[self.round_num[rows]]
+        self.reward[rows] = _REWARDS[self.round_num[rows]]
+        self.current_score[rows] = 0
+        self.num_hands_remaining[rows] = self.num_hands
+        self.num_discards_remaining[rows] = self.num_discards
+        self.hand[rows] = self._deal(rows, np.full(len(rows), self.hand_size))
+
+    def _replace_cards(self, rows: np.ndarray, selected: np.ndarray) -> None:
+        """Removes the selected cards from the hands, keeping the order of the rest, and deals replacements."""
+        hand = self.hand[rows]
+        keep = ~selected & (hand != 0)
+        num_kept = keep.sum(axis=1)
+        hand = np.take_along_axis(hand, np.argsort(~keep, axis=1, kind="stable"), axis=1)
+        offsets = np.arange(self.hand_size)
+        hand[offsets >= num_kept[:, None]] = 0
+
+        dealt = self._deal(rows, selected.sum(axis=1))
+        positions = num_kept[:, None] + offsets
+        fill = (positions < self.hand_size) & (dealt != 0)
+        row_idx = np.broadcast_to(np.arange(len(rows))[:, None], fill.shape)
+        hand[row_idx[fill], positions[fill]] = dealt[fill]
+        self.hand[rows] = hand
+
+    def step(self, actions: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Applies one hand action per run.
+
+        Returns the score of each played hand (0 for other rows) and, as `Run.step`, whether the action ended the
+        round, either by beating the blind or by losing the run.
+        """
+        action_type = actions[:, 0]
+        slots = np.arange(self.hand_size)
+        selected = ((actions[:, 1, None] >> slots) & 1).astype(bool) & (self.hand != 0)
+        active = ~self.done & selected.any(axis=1)
+        hand_scores = np.zeros(self.num_runs, dtype=np.float64)
+        round_over = np.zeros(self.num_runs, dtype=bool)
+
+        discard = np.flatnonzero(
+            active & (action_type == HandAction.DISCARD) & (self.num_discards_remaining > 0)
+        )
+        if len(discard):
+            self._replace_cards(discard, selected[discard])
+            self.num_discards_remaining[discard] -= 1
+            self._lose_empty_hands(discard, round_over)
+
+        play = np.flatnonzero(active & (action_type == HandAction.SCORE_HAND))
+        if len(play):
+            scores = _score_hands(
+                self.hand[play],
+                selected[play],
+                self.joker_ids[play],
+                self.hand_levels[play],
+                self.num_joker_slots,
+                self._rng,
+            )
+            hand_scores[play] = np.floor(scores.score)
+            self.joker_ids[play] = np.where(scores.destroyed_jokers, 0, self.joker_ids[play])
+            self.current_score[play] += hand_scores[play]
+            self.num_hands_remaining[play] -= 1
+
+            # Split before starting the next round of the winners, which resets their score
+            won_mask = self.required_score[play] <= self.current_score[play]
+            won, still_playing = play[won_mask], play[~won_mask]
+            self.money[won] += self.reward[won]
+            end_of_ante = won[self.round_num[won] % 3 == 0]
+            self._shuffle(end_of_ante)
+            exhausted = self.round_num[won] >= _MAX_ROUND
+            self.done[won[exhausted]] = True
+            self._start_round(won[~exhausted])
+            # The deck is only refilled after a boss blind, so a new round may be dealt no cards at all
+            self._lose_empty_hands(won[~exhausted], round_over)
+
+            lost = still_playing[self.num_hands_remaining[still_playing] < 0]
+            self.lost[lost] = True
+            self.done[lost] = True
+            replace = still_playing[self.num_hands_remaining[still_playing] >= 0]
+            self._replace_cards(replace, selected[replace])
+            self._lose_empty_hands(replace, round_over)
+            round_over[won] = True
+            round_over[lost] = True
+
+        return hand_scores, round_over
+
+    def _lose_empty_hands(self, rows: np.ndarray, round_over: np.ndarray) -> None:
+        # Mirrors `Run._deal`: once the deck has run out, a blind whose hand is emptied is lost
+        empty = rows[~self.hand[rows].any(axis=1)]
+        self.lost[empty] = True
+        self.done[empty] = True
+        round_over[empty] = True
@@ -1,14 +1,28 @@
 import dataclasses
+import sys
 from enum import Enum, IntEnum, auto
-from typing import Optional, Sequence, Union
+from typing import TYPE_CHECKING, Optional, Sequence, Union
+
+import numpy as np
 
 from balatro_gym.game.scoring import score_hand
 
 from ..cards.decks import discard
-from ..cards.interfaces import PlayingCard
-from ..interfaces import BlindState, BoardState
+from ..cards.interfaces import Deck, PlayingCard
+from ..cards.joker.constants import ALL_JOKERS
+from ..constants import MAX_HAND_SIZE
+from ..interfaces import BlindState, BoardState, JokerBase
+from ..journal import Journal
+from ..profiling import Profiler, Target
+from ..rng import RandomStreams
+from . import scoring
+from .actions import NUM_SUBSETS, SUBSET_MASKS
 from .blinds import BlindInfo, generate_run_blinds, get_blind_required_score
 from .shop import Shop, ShopState
+from .snapshot import RunSnapshot, _copy_seed_sequence
+
+if TYPE_CHECKING:
+    from .observation import ObservationEncoder
 
 
 class HandAction(IntEnum):
@@ -51,12 +65,73 @@ class RunObservation:
 
 GameActionTypes = Union[HandAction, BoardAction]
 
+HAND_ACTIONS: Sequence[HandAction] = tuple(HandAction)
+"""Rows of the mask returned by `Run.legal_hand_actions`."""
+
+# Run attributes recorded by the journal
+_STEP_FIELDS = ("_game_state", "_blind_state", "_shop_state", "_action_counter")
+_RUN_FIELDS = (*_STEP_FIELDS, "_board_state", "_run_blinds", "_shop")
+
+
+_JOKER_HOOKS = (
+    "get_chips_card",
+    "get_mult_card",
+    "get_chips_hand",
+    "get_mult_hand",
+    "get_multiplication",
+    "get_money",
+    "get_end_of_round_money",
+    "is_destroyed",
+)
+
+
+def _profiled_targets() -> list[Target]:
+    targets: list[Target] = [
+        (Run, "_process_hand_action", "Run._process_hand_action"),
+        (sys.modules[__name__], "score_hand", "score_hand"),
+        (scoring, "get_poker_hand", "get_poker_hand"),
+        (Deck, "deal", "Deck.deal"),
+        (Deck, "shuffle", "Deck.shuffle"),
+        (Shop, "generate_shop_state", "Shop.generate_shop_state"),
+        (Shop, "reroll", "Shop.reroll"),
+    ]
+    # Each joker hook is reported under the class that implements it, the defaults under `JokerBase`
+    jokers: list[type[JokerBase]] = [JokerBase, *ALL_JOKERS]
+    for joker in jokers:
+        targets.extend((joker, hook, f"{joker.__name__}.{hook}") for hook in _JOKER_HOOKS if hook in vars(joker))
+    return targets
+
 
 @dataclasses.dataclass
 class GameAction:
     action_type: GameActionTypes
-    selected_playing: Sequence[PlayingCard]
+    selected_playing: Sequence[PlayingCard] = ()
     # selected_consumable: Sequence[Consumable]
+    selected_mask: Optional[int] = None
+    """Bitmask over the hand slots, used instead of `selected_playing` when set.
+
+    Slots are resolved by position, so this selects the intended card even when the hand holds equal cards, and
+    avoids comparing cards field by field. Bits past the end of the hand are ignored.
+    """
+
+    @staticmethod
+    def from_subset(action_type: GameActionTypes, subset: int) -> "GameAction":
+        """Selects the cards of row `subset` of the subset table, see `Run.legal_hand_actions`."""
+        return GameAction(action_type, selected_mask=int(SUBSET_MASKS[subset]))
+
+
+def _split_hand(
+    hand: Sequence[PlayingCard], action: GameAction
+) -> tuple[Sequence[PlayingCard], Sequence[PlayingCard]]:
+    # Returns the selected cards and the cards kept in hand
+    mask = action.selected_mask
+    if mask is None:
+        return action.selected_playing, discard(hand, action.selected_playing, [])
+    selected: list[PlayingCard] = []
+    kept: list[PlayingCard] = []
+    for slot, card in enumerate(hand):
+        (selected if mask >> slot & 1 else kept).append(card)
+    return selected, kept
 
 
 class Run:
@@ -67,8 +142,15 @@ class Run:
     _run_blinds: Sequence[BlindInfo]
     _action_counter: int
     _shop: Shop
-
-    def __init__(self) -> None:
+    _journal: Optional[Journal]
+    _profiler: Optional[Profiler]
+    _seed_sequence: np.random.SeedSequence
+
+    def __init__(self, seed: Optional[int] = None) -> None:
+        """All randomness of the run derives from `seed`, see `RandomStreams`. Without a seed, OS entropy is used."""
+        self._journal = None
+        self._profiler = None
+        self._seed_sequence = np.random.SeedSequence(seed)
         self.game_reset()
 
     @property
@@ -83,6 +165,10 @@ class Run:
     def blind_state(self) -> Optional[BlindState]:
         return self._blind_state
 
+    @property
+    def rng(self) -> RandomStreams:
+        return self._board_state.rng
+
     @property
     def blinds(self) -> Sequence[BlindInfo]:
         return self._run_blinds
@@ -95,15 +181,118 @@ class Run:
     def shop_state(self) -> Optional[ShopState]:
         return self._shop_state
 
-    def game_reset(self) -> None:
-        # Resets the run to the start, with new randomness
+    def game_reset(self, seed: Optional[int] = None) -> None:
+        # Resets the run to the start, with new randomness. Each reset without a seed continues the run's seed
+        # sequence, so a seeded run also reproduces the games that follow it.
+        if self._journal is not None:
+            self._journal.record_setattr(self, *_RUN_FIELDS)
+        if seed is not None:
+            self._seed_sequence = np.random.SeedSequence(seed)
+        rng = RandomStreams.from_seed(self._seed_sequence.spawn(1)[0])
         self._game_state = GameState.IN_BLIND_SELECT
         self._blind_state = None
         self._shop_state = None
-        self._board_state = BoardState()
+        self._board_state = BoardState(rng)
         self._run_blinds = generate_run_blinds()
         self._action_counter = 0
-        self._shop = Shop()
+        self._shop = Shop(rng=rng.shop)
+        self._board_state.set_journal(self._journal)
+
+    def legal_hand_actions(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """Returns a `(len(HAND_ACTIONS), len(SUBSET_MASKS))` boolean mask of the hand actions `step` would apply.
+
+        Column `i` stands for the cards selected by row `i` of the subset table in `actions`. Only subsets of the
+        current hand are legal, discarding needs discards remaining, and no hand action is legal outside of a blind
+        or once it is lost, which includes the hand running out of cards. The mask is written into `out` if given.
+        """
+        if out is None:
+            out = np.zeros((len(HAND_ACTIONS), len(SUBSET_MASKS)), dtype=bool)
+        else:
+            out.fill(False)
+        blind = self._blind_state
+        # The blind is lost once the hands remaining drop below zero, see `_process_hand_action`
+        if self._game_state is not GameState.IN_ANTE or blind is None or blind.num_hands_remaining < 0:
+            return out
+        num_subsets = NUM_SUBSETS[min(len(blind.hand), MAX_HAND_SIZE)]
+        out[HAND_ACTIONS.index(HandAction.SCORE_HAND), :num_subsets] = True
+        if blind.num_discards_remaining > 0:
+            out[HAND_ACTIONS.index(HandAction.DISCARD), :num_subsets] = True
+        return out
+
+    def snapshot(self) -> RunSnapshot:
+        """Captures the full state of the run, including the deck order and the random state.
+
+        This is much cheaper than `copy.deepcopy`: cards and jokers are not copied, only their fields are. The
+        snapshot can be restored into this run any number of times, see `restore`.
+        """
+        return RunSnapshot.capture(
+            self._game_state,
+            self._action_counter,
+            self._run_blinds,
+            self._board_state,
+            self._blind_state,
+            self._shop_state,
+            self._shop,
+            self._seed_sequence,
+        )
+
+    def restore(self, snapshot: RunSnapshot) -> None:
+        """Returns the run to the state captured by `snapshot`, which must have been taken from this run."""
+        self._blind_state, self._shop_state = snapshot.restore_objects(self._board_state, self._shop)
+        self._game_state = GameState(snapshot.game_state)
+        self._action_counter = snapshot.action_counter
+        self._run_blinds = snapshot.run_blinds
+        self._seed_sequence = _copy_seed_sequence(snapshot.seed_sequence)
+
+    def enable_journal(self) -> None:
+        """Starts recording every mutation of the run so that it can be reverted with `undo`.
+
+        Journaling covers `step` and `game_reset`. The random number generators are not rewound, so replaying actions
+        after an undo draws new random outcomes.
+        """
+        if self._journal is None:
+            self._journal = Journal()
+            self._board_state.set_journal(self._journal)
+
+    def disable_journal(self) -> None:
+        self._journal = None
+        self._board_state.set_journal(None)
+
+    def enable_profiling(self) -> Profiler:
+        """Starts counting calls and wall time of each phase of a step, see `Profiler`.
+
+        The phases are `_process_hand_action`, `score_hand`, `get_poker_hand`, every joker hook, `Deck.deal` and
+        `Deck.shuffle`, and `Shop.generate_shop_state` and `Shop.reroll`. They are profiled for every run of the
+        process until `disable_profiling` is called, and cost nothing while profiling is disabled.
+        """
+        if self._profiler is None:
+            profiler = Profiler()
+            profiler.enable(_profiled_targets())
+            self._profiler = profiler
+        return self._profiler
+
+    def disable_profiling(self) -> None:
+        """Stops profiling. The profiler returned by `enable_profiling` keeps the collected stats."""
+        if self._profiler is not None:
+            self._profiler.disable()
+            self._profiler = None
+
+    @property
+    def profile(self) -> dict[str, dict[str, float]]:
+        """The calls and cumulative seconds of each phase while profiling is enabled, see `Profiler.stats`."""
+        return {} if self._profiler is None else self._profiler.stats()
+
+    def mark(self) -> int:
+        """Returns the current position in the journal, to be passed to `undo`."""
+        if self._journal is None:
+            raise RuntimeError("Journaling is not enabled, see `Run.enable_journal`.")
+        return self._journal.mark()
+
+    def undo(self, mark: int) -> None:
+        """Reverts every mutation made since `mark` was taken."""
+        if self._journal is None:
+            raise RuntimeError("Journaling is not enabled, see `Run.enable_journal`.")
+        self._journal.undo(mark)
 
     def _end_round(self) -> None:
         # Call at the end of the round
@@ -113,41 +302,55 @@ class Run:
         # Call at the end of the ante
         self._board_state.deck.reset()
 
-    def _process_board_action(self, action: GameAction) -> None:
+    def _process_board_action(self, action: GameAction) -> bool:
         if action.action_type == BoardAction.START_ROUND:
             if self._game_state is GameState.IN_BLIND_SELECT:
                 self._game_state = GameState.IN_ANTE
                 if self._board_state.round_num % 3 == 0:
                     self._setup_ante()
                 self._setup_round()
-            else:
-                return None
+                assert self._blind_state is not None
+                # The deck is only refilled after a boss blind, so it may be empty by the last blind of an ante
+                return len(self._blind_state.hand) == 0
         elif action.action_type == BoardAction.VIEW_SHOP:
+            if self._journal is not None:
+                self._journal.record_setattr(self._shop, "vouchers", "booster_packs")
             self._shop_state = self._shop.generate_shop_state(self._board_state.round_num, self._board_state.jokers)
             self._game_state = GameState.IN_SHOP
         elif action.action_type == BoardAction.NEXT_ROUND:
             self._game_state = GameState.IN_BLIND_SELECT
+        return False
+
+    def _deal(self, num: int) -> Sequence[PlayingCard]:
+        # Deals fewer cards once the deck runs out, the hand then shrinks until it is empty and the blind is lost
+        deck = self._board_state.deck
+        return deck.deal(min(num, deck.get_num_remaining()))
 
     def _process_hand_action(self, action: GameAction) -> bool:
-        if len(action.selected_playing) == 0:
-            return False
         if self._game_state is GameState.IN_ANTE:
             assert self._blind_state is not None
+            selected, kept = _split_hand(self._blind_state.hand, action)
+            if len(selected) == 0:
+                return False
+            if self._journal is not None:
+                self._journal.record_setattr(
+                    self._blind_state, "hand", "current_score", "num_hands_remaining", "num_discards_remaining"
+                )
             if action.action_type == HandAction.DISCARD:
                 if self._blind_state.num_discards_remaining == 0:
                     return False
-                new_cards = self._board_state.deck.deal(len(action.selected_playing))
-                self._blind_state.hand = discard(self._blind_state.hand, action.selected_playing, new_cards)
+                self._blind_state.hand = [*kept, *self._deal(len(selected))]
                 self._blind_state.num_discards_remaining -= 1
+                return len(self._blind_state.hand) == 0
 
             if action.action_type == HandAction.SCORE_HAND:
-                hand_score = score_hand(action.selected_playing, self._board_state, self._blind_state)
+                hand_score = score_hand(selected, self._board_state, self._blind_state)
                 self._blind_state.current_score += int(hand_score)
                 self._blind_state.num_hands_remaining -= 1
 
                 if self._blind_state.required_score <= self._blind_state.current_score:
                     self._game_state = GameState.GENERATE_SHOP
-                    self._board_state.money += self._blind_state.reward
+                    self._board_state.set_money(self._board_state.money + self._blind_state.reward)
                     # Round is won. End round and transition to next state
                     self._end_round()
                     # If we beat a boss blind, then we end the ante too
@@ -159,14 +362,16 @@ class Run:
                     # Game loss
                     return True
 
-                new_cards = self._board_state.deck.deal(len(action.selected_playing))
-                self._blind_state.hand = discard(self._blind_state.hand, action.selected_playing, new_cards)
+                self._blind_state.hand = [*kept, *self._deal(len(selected))]
+                return len(self._blind_state.hand) == 0
 
         return False
 
     def _setup_round(self) -> None:
+        if self._journal is not None:
+            self._journal.record_setattr(self._board_state, "round_num")
         self._board_state.round_num += 1
-        initial_hand = self._board_state.deck.deal(self._board_state.hand_size)
+        initial_hand = self._deal(self._board_state.hand_size)
         req_score = get_blind_required_score(self._board_state.round_num)
         money_reward = self.blinds[self._board_state.round_num].reward
         self._blind_state = BlindState(
@@ -175,18 +380,45 @@ class Run:
         self._shop_state = None
 
     def _setup_ante(self) -> None:
+        if self._journal is not None:
+            self._journal.record_setattr(self._board_state, "ante_num")
         self._board_state.ante_num += 1
 
     def step(self, action: Optional[GameAction]) -> RunObservation:
+        """Applies `action` and returns the new state of the run.
+
+        The observation refers to the run's live board, blind and shop states, which later steps keep changing. See
+        `step_into` to get a copy of the state without allocating.
+        """
+        done = self._apply(action)
+        return RunObservation(
+            self._game_state, self._board_state, self._shop_state, self._blind_state, self._action_counter, done
+        )
+
+    def step_into(self, action: Optional[GameAction], out: "ObservationEncoder") -> tuple[bool, int]:
+        """Applies `action` and encodes the new state of the run into the buffers of `out`.
+
+        The buffers are owned by the caller and overwritten in place, so stepping creates no observation objects and
+        the encoded state does not change with later steps. Returns whether the action ended the blind, as
+        `RunObservation.done`, and the score it gained.
+        """
+        blind = self._blind_state
+        score_before = blind.current_score if blind is not None else 0
+        done = self._apply(action)
+        out.encode(self)
+        # The blind is cleared from the run once it is won, but still holds the final score
+        return done, blind.current_score - score_before if blind is not None else 0
+
+    def _apply(self, action: Optional[GameAction]) -> bool:
         done = False
+        if self._journal is not None:
+            self._journal.record_setattr(self, *_STEP_FIELDS)
 
         if action is not None:
             if isinstance(action.action_type, HandAction):
                 done = self._process_hand_action(action)
             else:
-                self._process_board_action(action)
+                done = self._process_board_action(action)
 
         self._action_counter += 1
-        return RunObservation(
-            self._game_state, self._board_state, self._shop_state, self._blind_state, self._action_counter, done
-        )
+        return done
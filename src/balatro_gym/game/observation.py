@@ -0,0 +1,198 @@
+from collections.abc import Mapping, Sequence
+from enum import IntEnum
+from typing import Optional
+
+import numpy as np
+from gymnasium import spaces
+
+from ..cards.booster_packs import BoosterType
+from ..cards.encoding import EDITION_INDEX, NUM_CARD_FEATURES, SUIT_INDEX, write_card_features
+from ..cards.interfaces import HasCost, Rank, Suit
+from ..cards.joker.constants import JOKER_IDS
+from ..cards.planet import PLANET_CARDS
+from ..cards.tarot import TAROT_CARDS
+from ..cards.voucher import ALL_VOUCHERS, Voucher
+from ..constants import (
+    MAX_HAND_SIZE,
+    MAX_NUM_BOOSTER_PACKS,
+    MAX_NUM_CONSUMABLE,
+    MAX_NUM_JOKER_SLOTS,
+    MAX_NUM_SHOP_SLOTS,
+)
+from ..interfaces import JokerBase, PokerHandType
+from .engine import GameState, Run
+
+__all__ = ["ObservationEncoder"]
+
+GAME_STATES: Sequence[GameState] = tuple(GameState)
+GAME_STATE_INDEX: Mapping[GameState, int] = {state: i for i, state in enumerate(GAME_STATES)}
+
+CONSUMABLE_IDS: Mapping[type[HasCost], int] = {
+    card: i + 1 for i, card in enumerate([*TAROT_CARDS, *PLANET_CARDS])
+}
+"""Consumable ids start at 1, 0 marks an empty slot."""
+# Voucher hashing is based on class names, so sort to get an order that is stable across interpreter runs.
+VOUCHERS: Sequence[Voucher] = sorted(ALL_VOUCHERS, key=lambda v: v.__class__.__name__)
+VOUCHER_INDEX: Mapping[type[Voucher], int] = {v.__class__: i for i, v in enumerate(VOUCHERS)}
+BOOSTER_IDS: Mapping[type, int] = {booster.value: i + 1 for i, booster in enumerate(BoosterType)}
+
+
+class ShopCardKind(IntEnum):
+    NONE = 0
+    JOKER = 1
+    TAROT = 2
+    PLANET = 3
+
+
+BOARD_FEATURES: Sequence[str] = (
+    "money",
+    "ante_num",
+    "round_num",
+    "num_hands",
+    "num_discards",
+    "hand_size",
+    "num_joker_slots",
+    "num_consumable_slots",
+    "num_cards_remaining",
+    "action_counter",
+)
+BLIND_FEATURES: Sequence[str] = (
+    "required_score",
+    "current_score",
+    "num_hands_remaining",
+    "num_discards_remaining",
+    "reward",
+)
+
+_INT_MAX = np.iinfo(np.int32).max
+_NUM_RANKS = len(Rank)
+
+
+def _observation_space() -> spaces.Dict:
+    return spaces.Dict(
+        {
+            "game_state": spaces.MultiBinary(len(GAME_STATES)),
+            "board": spaces.Box(-np.inf, np.inf, shape=(len(BOARD_FEATURES),), dtype=np.float32),
+            "blind": spaces.Box(-np.inf, np.inf, shape=(len(BLIND_FEATURES),), dtype=np.float32),
+            "hand": spaces.Box(0, _INT_MAX, shape=(MAX_HAND_SIZE, NUM_CARD_FEATURES), dtype=np.int32),
+            "hand_mask": spaces.MultiBinary(MAX_HAND_SIZE),
+            "deck": spaces.Box(0, _INT_MAX, shape=(len(Suit), len(Rank)), dtype=np.int32),
+            "poker_hands": spaces.Box(0, _INT_MAX, shape=(len(PokerHandType),), dtype=np.int32),
+            "jokers": spaces.Box(0, _INT_MAX, shape=(MAX_NUM_JOKER_SLOTS, 2), dtype=np.int32),
+            "consumables": spaces.Box(0, len(CONSUMABLE_IDS), shape=(MAX_NUM_CONSUMABLE,), dtype=np.int32),
+            "shop_cards": spaces.Box(0, _INT_MAX, shape=(MAX_NUM_SHOP_SLOTS, 3), dtype=np.int32),
+            "shop_vouchers": spaces.MultiBinary(len(VOUCHERS)),
+            "shop_boosters": spaces.Box(0, _INT_MAX, shape=(MAX_NUM_BOOSTER_PACKS, 4), dtype=np.int32),
+        }
+    )
+
+
+class ObservationEncoder:
+    """Encodes a `Run` into a fixed set of NumPy buffers.
+
+    The buffers are allocated once and overwritten by every call to `encode`, so the returned arrays alias the
+    encoder's state. Copy them if they need to outlive the next step. Buffers may also be passed in, e.g. views
+    into shared memory, as long as they match `observation_space`. Encoding writes the features straight into the
+    buffers, through views made once here, rather than building lists or tuples of them on every step.
+    """
+
+    observation_space: spaces.Dict
+    buffers: dict[str, np.ndarray]
+
+    def __init__(self, buffers: Optional[Mapping[str, np.ndarray]] = None) -> None:
+        self.observation_space = _observation_space()
+        if buffers is None:
+            self.buffers = {
+                key: np.zeros(space.shape, dtype=space.dtype)  # type: ignore[arg-type]
+                for key, space in self.observation_space.spaces.items()
+            }
+        else:
+            for key, space in self.observation_space.spaces.items():
+                buffer = buffers[key]
+                if buffer.shape != space.shape or buffer.dtype != space.dtype:
+                    raise ValueError(f"Buffer '{key}' does not match the observation space {space}.")
+            self.buffers = {key: buffers[key] for key in self.observation_space.spaces}
+        self._hand_rows = list(self.buffers["hand"])
+        self._deck_counts = self.buffers["deck"].reshape(-1)
+
+    def encode(self, run: Run) -> dict[str, np.ndarray]:
+        b = self.buffers
+        board = run.board_state
+        blind = run.blind_state
+        shop = run.shop_state
+
+        b["game_state"].fill(0)
+        b["game_state"][GAME_STATE_INDEX[run.game_state]] = 1
+
+        board_features = b["board"]
+        board_features[0] = board.money
+        board_features[1] = board.ante_num
+        board_features[2] = board.round_num
+        board_features[3] = board.num_hands
+        board_features[4] = board.num_discards
+        board_features[5] = board.hand_size
+        board_features[6] = board.num_joker_slots
+        board_features[7] = board.consumable.num_slots
+        board_features[8] = board.deck.get_num_remaining()
+        board_features[9] = run.action_counter
+
+        blind_features = b["blind"]
+        hand = b["hand"]
+        hand_mask = b["hand_mask"]
+        blind_features.fill(0)
+        hand.fill(0)
+        hand_mask.fill(0)
+        if blind is not None:
+            blind_features[0] = blind.required_score
+            blind_features[1] = blind.current_score
+            blind_features[2] = blind.num_hands_remaining
+            blind_features[3] = blind.num_discards_remaining
+            blind_features[4] = blind.reward
+            for i, card in zip(range(MAX_HAND_SIZE), blind.hand):
+                write_card_features(card, self._hand_rows[i])
+                hand_mask[i] = 1
+
+        deck_counts = self._deck_counts
+        deck_counts.fill(0)
+        for card in board.deck.iter_remaining():
+            deck_counts[SUIT_INDEX[card.base_suit] * _NUM_RANKS + card.rank.value.order - 1] += 1
+
+        poker_hands = b["poker_hands"]
+        for i, poker_hand in enumerate(board.poker_hands.values()):
+            poker_hands[i] = poker_hand.level
+
+        jokers = b["jokers"]
+        jokers.fill(0)
+        for i, joker in zip(range(MAX_NUM_JOKER_SLOTS), board.jokers):
+            jokers[i, 0] = JOKER_IDS[type(joker)]
+            jokers[i, 1] = EDITION_INDEX[type(joker.edition)]
+
+        consumables = b["consumables"]
+        consumables.fill(0)
+        for i, consumable in zip(range(MAX_NUM_CONSUMABLE), board.consumable.consumables):
+            consumables[i] = CONSUMABLE_IDS[type(consumable)]
+
+        shop_cards = b["shop_cards"]
+        shop_vouchers = b["shop_vouchers"]
+        shop_boosters = b["shop_boosters"]
+        shop_cards.fill(0)
+        shop_vouchers.fill(0)
+        shop_boosters.fill(0)
+        if shop is not None:
+            for i, buyable in zip(range(MAX_NUM_SHOP_SLOTS), shop.buyable_cards):
+                if isinstance(buyable, JokerBase):
+                    shop_cards[i, 0] = ShopCardKind.JOKER
+                    shop_cards[i, 1] = JOKER_IDS[type(buyable)]
+                elif type(buyable) in CONSUMABLE_IDS:
+                    is_tarot = CONSUMABLE_IDS[type(buyable)] <= len(TAROT_CARDS)
+                    shop_cards[i, 0] = ShopCardKind.TAROT if is_tarot else ShopCardKind.PLANET
+                    shop_cards[i, 1] = CONSUMABLE_IDS[type(buyable)]
+                shop_cards[i, 2] = buyable.cost(board.vouchers)
+            for voucher in shop.vouchers:
+                shop_vouchers[VOUCHER_INDEX[type(voucher)]] = 1
+            for i, booster in zip(range(MAX_NUM_BOOSTER_PACKS), shop.booster_packs):
+                shop_boosters[i, 0] = BOOSTER_IDS[type(booster)]
+                shop_boosters[i, 1] = booster.cost
+                shop_boosters[i, 2] = booster.n_cards
+                shop_boosters[i, 3] = booster.n_choice
+        return b
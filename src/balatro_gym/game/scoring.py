@@ -1,24 +1,19 @@
-from collections import Counter
-from typing import Sequence
+import copy
+from collections import Counter, OrderedDict
+from collections.abc import Callable, Mapping
+from typing import Any, NamedTuple, Optional, Sequence, Union
 
-from balatro_gym.cards.interfaces import LuckyCard, PlayingCard, Rank, RedSeal, StoneCard
-from balatro_gym.cards.joker.effect_joker import Hack, Mime
-from balatro_gym.cards.utils import contains_two_pair, get_flush, get_straight, is_royal
-from balatro_gym.interfaces import BlindState, BoardState, JokerBase, PokerHandType
+import numpy as np
 
+from balatro_gym.cards.encoding import SUIT_INDEX
+from balatro_gym.cards.interfaces import LuckyCard, PlayingCard, Rank, RedSeal, StoneCard, Suit, WildCard
+from balatro_gym.constants import MAX_HAND_SIZE
+from balatro_gym.interfaces import BlindState, BoardState, JokerBase, JokerEffects, PokerHandType, ScoringPlan
 
-def _process_joker_card(
-    joker: JokerBase,
-    card: PlayingCard,
-    hand_type: PokerHandType,
-    board_state: BoardState,
-    blind_state: BlindState,
-) -> tuple[int, float]:
-    chips_sum = 0
-    mult_sum = 0.0
-    chips_sum += joker.get_chips_card(card, blind_state, board_state)
-    mult_sum += float(joker.get_mult_card(card, blind_state, board_state))
-    return chips_sum, mult_sum
+from .actions import NUM_SUBSETS, SUBSET_MASKS, subset_cards
+
+POKER_HAND_TYPES: Sequence[PokerHandType] = tuple(PokerHandType)
+_HAND_TYPE_INDEX: Mapping[PokerHandType, int] = {hand_type: i for i, hand_type in enumerate(POKER_HAND_TYPES)}
 
 
 def score_hand(hand: Sequence[PlayingCard], board_state: BoardState, blind_state: BlindState) -> float:
@@ -51,50 +46,333 @@ def score_hand(hand: Sequence[PlayingCard], board_state: BoardState, blind_state
                     3) add multiplication | scored_hand
                     4) subtract multiplication | round
     """
+    _, chips, mult = _score_hand(hand, board_state, blind_state)
+    return chips * mult
+
+
+def _score_hand(
+    hand: Sequence[PlayingCard], board_state: BoardState, blind_state: BlindState
+) -> tuple[PokerHandType, float, float]:
+    """`score_hand` returning the poker hand along with the final chips and mult rather than their product."""
+    preview = _preview_score(hand, board_state, blind_state, board_state.rng.scoring)
+    commit_score(preview, board_state)
+    return preview.hand_type, preview.chips, preview.mult
+
+
+class DestroyCard(NamedTuple):
+    card: PlayingCard
+
+    def apply(self, board_state: BoardState) -> None:
+        board_state.deck.destroy([self.card])
+
+
+class DestroyJoker(NamedTuple):
+    joker: JokerBase
+
+    def apply(self, board_state: BoardState) -> None:
+        board_state.remove_joker(self.joker)
+
+
+PendingEffect = Union[DestroyCard, DestroyJoker]
+
+
+class ScorePreview(NamedTuple):
+    hand_type: PokerHandType
+    chips: float
+    mult: float
+    money: int
+    """Money earned by the hand. It is not paid out yet, see #25."""
+    effects: tuple[PendingEffect, ...]
+    """Changes to the board caused by the hand, in the order `commit_score` applies them."""
+    random_state: Optional[Mapping[str, Any]]
+    """The state of the scoring stream after the draws of the preview, if it drew from a copy of it."""
+
+    @property
+    def score(self) -> float:
+        return self.chips * self.mult
+
+
+def preview_score(
+    hand: Sequence[PlayingCard],
+    board_state: BoardState,
+    blind_state: BlindState,
+    rng: Optional[np.random.Generator] = None,
+) -> ScorePreview:
+    """Scores a hand as `score_hand` would without changing anything, so candidate plays need no copy of the board.
+
+    The cards and jokers destroyed by the hand are returned as pending effects instead, which `commit_score` applies.
+    Random effects draw from `rng` if given, otherwise from a copy of the scoring stream of the board: the preview is
+    then exactly what `score_hand` would score next, and committing it also moves the stream past its draws.
+    """
+    if rng is not None:
+        return _preview_score(hand, board_state, blind_state, rng)
+    rng = copy.deepcopy(board_state.rng.scoring)
+    preview = _preview_score(hand, board_state, blind_state, rng)
+    return preview._replace(random_state=rng.bit_generator.state)
+
+
+def commit_score(preview: ScorePreview, board_state: BoardState) -> None:
+    """Applies the pending effects of `preview` to the board it was previewed on."""
+    for effect in preview.effects:
+        effect.apply(board_state)
+    if preview.random_state is not None:
+        board_state.rng.scoring.bit_generator.state = dict(preview.random_state)
+
+
+def _preview_score(
+    hand: Sequence[PlayingCard], board_state: BoardState, blind_state: BlindState, rng: np.random.Generator
+) -> ScorePreview:
+    def card_mult(card: PlayingCard) -> float:
+        return card.get_mult(rng) + card.edition.get_mult(rng=rng)
+
+    played_cards, hand_type, chips_sum, mult_sum = _score_steps(hand, board_state, blind_state, card_mult)
+    money_sum = 0
+    effects: list[PendingEffect] = []
+    for card in played_cards:
+        if isinstance(card.enhancement, LuckyCard):
+            money_sum += card.enhancement.get_scored_money(rng=rng)  # TODO See #25. this should be influenced by jokers
+        if card.enhancement.is_destroyed(rng=rng):  # TODO See #25. This should be influenced by jokers
+            effects.append(DestroyCard(card))
+    plan = board_state.scoring_plan
+    for joker in plan.money:
+        money_sum += joker.get_money(blind_state)
+    # TODO update joker. E.g. num hands played influences chips
+    effects.extend(DestroyJoker(joker) for joker in plan.destroyable if joker.is_destroyed(rng=rng))
+    return ScorePreview(hand_type, chips_sum, mult_sum, money_sum, tuple(effects), None)
+
+
+def _score_steps(
+    hand: Sequence[PlayingCard],
+    board_state: BoardState,
+    blind_state: BlindState,
+    card_mult: Callable[[PlayingCard], Any],
+) -> tuple[Sequence[PlayingCard], PokerHandType, float, Any]:
+    """The chips and mult of a hand: played cards, then held cards, then jokers. Nothing is changed.
+
+    `card_mult` gives the mult a played card adds each time it triggers, the only random part of the score. It returns
+    a drawn value when scoring a hand and a `_MultDistribution` when enumerating every outcome, in which case the mult
+    is a `_MultDistribution` too.
+    """
     played_cards, hand_type = get_poker_hand(hand, board_state)
     poker_scale = board_state.get_poker_hand(hand_type).score
-    chips_sum = poker_scale.chips
-    mult_sum: float = poker_scale.mult
-    money_sum = 0
+    chips_sum: float = poker_scale.chips
+    mult_sum: Any = poker_scale.mult
+    plan = board_state.scoring_plan
     for card in played_cards:
         num_card_retriggers = 2 if isinstance(card.seal, RedSeal) else 1
-        if (any(isinstance(j, Hack) for j in board_state.jokers) and
-                card.rank in [Rank.TWO, Rank.THREE, Rank.FOUR, Rank.FIVE]):
+        if plan.effects.hack and card.rank in [Rank.TWO, Rank.THREE, Rank.FOUR, Rank.FIVE]:
             num_card_retriggers += 1
         for _ in range(num_card_retriggers):
             chips_sum += card.get_chips() + card.edition.get_chips()
-            mult_sum += card.get_mult() + card.edition.get_mult()
+            mult_sum += card_mult(card)
             mult_sum *= card.get_multiplication() * card.edition.get_multiplication()
-        if isinstance(card.enhancement, LuckyCard):
-            money_sum += card.enhancement.get_scored_money()  # TODO See #25. this should be influenced by jokers
-        if card.enhancement.is_destroyed():  # TODO See #25. This should be influenced by jokers
-            board_state.deck.destroy([card])
-
-        for unplayed_card in blind_state.hand:
-            num_card_retriggers = 2 if isinstance(unplayed_card.seal, RedSeal) else 1
-            num_card_retriggers += 1 if Mime() in board_state.jokers else 0
-            mult_sum *= unplayed_card.get_multiplication() ** num_card_retriggers
-
-        for joker in board_state.jokers:
-            # TODO track retriggers on jokers
-            chips, mult = _process_joker_card(joker, card, hand_type, board_state, blind_state)
-            chips_sum += chips
-            mult_sum += mult
-
-    for joker in board_state.jokers:
-        chips_sum += joker.get_chips_hand(played_cards, blind_state, board_state, hand_type)
-        mult_sum += joker.get_mult_hand(played_cards, blind_state, board_state, hand_type)
-        mult_sum *= joker.get_multiplication(played_cards, blind_state, board_state, hand_type)
-        money_sum += joker.get_money(blind_state)
 
-        # Handle Edition, if any
-        mult_sum += joker.edition.get_mult()
-        chips_sum += joker.edition.get_chips()
-        mult_sum *= joker.edition.get_multiplication()
-        # TODO update joker. E.g. num hands played influences chips
+        # TODO track retriggers on jokers
+        for joker in plan.card_chips:
+            chips_sum += joker.get_chips_card(card, blind_state, board_state)
+        for joker in plan.card_mult:
+            mult_sum += float(joker.get_mult_card(card, blind_state, board_state))
+
+    # Cards held in hand trigger once the played cards are scored
+    played_ids = {id(card) for card in hand}
+    held_cards = [card for card in blind_state.hand if id(card) not in played_ids]
+    for multiplication in _held_multiplications(held_cards, plan.effects):
+        mult_sum *= multiplication
+
+    chips_sum, mult_sum = _apply_hand_steps(
+        plan, chips_sum, mult_sum, played_cards, board_state, blind_state, hand_type
+    )
+    return played_cards, hand_type, chips_sum, mult_sum
+
+
+class _MultDistribution:
+    """A discrete distribution of the mult, as the probability of each value.
+
+    Adding a constant or multiplying by one maps the values, while adding another distribution convolves the two as
+    independent draws. Outcomes reaching the same value are merged.
+    """
+
+    def __init__(self, probabilities: dict[float, float]) -> None:
+        self.probabilities = probabilities
+
+    @staticmethod
+    def of(outcomes: Sequence[tuple[float, float]]) -> "_MultDistribution":
+        probabilities: dict[float, float] = {}
+        for value, probability in outcomes:
+            if probability > 0:
+                probabilities[value] = probabilities.get(value, 0.0) + probability
+        return _MultDistribution(probabilities)
+
+    def __add__(self, other: Any) -> "_MultDistribution":
+        outcomes = other.probabilities.items() if isinstance(other, _MultDistribution) else [(other, 1.0)]
+        probabilities: dict[float, float] = {}
+        for value, probability in self.probabilities.items():
+            for other_value, other_probability in outcomes:
+                total = value + other_value
+                probabilities[total] = probabilities.get(total, 0.0) + probability * other_probability
+        return _MultDistribution(probabilities)
+
+    __radd__ = __add__
+
+    def __mul__(self, factor: float) -> "_MultDistribution":
+        probabilities: dict[float, float] = {}
+        for value, probability in self.probabilities.items():
+            probabilities[value * factor] = probabilities.get(value * factor, 0.0) + probability
+        return _MultDistribution(probabilities)
+
+    __rmul__ = __mul__
+
+
+class ScoreDistribution(NamedTuple):
+    scores: np.ndarray
+    """Every score the hand can reach, in increasing order."""
+    probabilities: np.ndarray
+
+    @property
+    def mean(self) -> float:
+        return float(self.scores @ self.probabilities)
+
+    @property
+    def variance(self) -> float:
+        return float((self.scores - self.mean) ** 2 @ self.probabilities)
+
+
+def score_distribution(
+    hand: Sequence[PlayingCard], board_state: BoardState, blind_state: BlindState
+) -> ScoreDistribution:
+    """The exact distribution of `score_hand` over the random effects of the played cards, e.g. `LuckyCard` mult.
+
+    Each trigger of a random card is an independent draw, and the distribution is built by enumerating them rather than
+    sampling. Cards and jokers that destroy themselves only do so after the hand is scored, so they don't change the
+    score and are left in place. Nothing is changed and no random number is drawn.
+    """
+
+    def card_mult(card: PlayingCard) -> _MultDistribution:
+        return _MultDistribution.of(card.get_mult_outcomes()) + _MultDistribution.of(card.edition.get_mult_outcomes())
+
+    _, _, chips_sum, mult_sum = _score_steps(hand, board_state, blind_state, card_mult)
+    if not isinstance(mult_sum, _MultDistribution):
+        mult_sum = _MultDistribution({mult_sum: 1.0})
+    scores = np.array([chips_sum * mult for mult in mult_sum.probabilities], dtype=np.float64)
+    probabilities = np.array(list(mult_sum.probabilities.values()), dtype=np.float64)
+    order = np.argsort(scores)
+    return ScoreDistribution(scores[order], probabilities[order])
+
+
+def expected_score(hand: Sequence[PlayingCard], board_state: BoardState, blind_state: BlindState) -> float:
+    """The mean of `score_distribution`, without enumerating the outcomes.
+
+    The mult is a sum of independent random terms each scaled by the multiplications that follow it, so its mean comes
+    from scoring every trigger with its expected mult. Nothing is changed and no random number is drawn.
+    """
+
+    def card_mult(card: PlayingCard) -> float:
+        return card.get_expected_mult() + card.edition.get_expected_mult()
+
+    _, _, chips_sum, mult_sum = _score_steps(hand, board_state, blind_state, card_mult)
     return chips_sum * mult_sum
 
 
+def _held_multiplications(held_cards: Sequence[PlayingCard], effects: JokerEffects) -> list[float]:
+    """The multiplication each held card applies to the mult, with its retriggers."""
+    num_retriggers = 1 if effects.mime else 0
+    return [
+        card.get_multiplication() ** ((2 if isinstance(card.seal, RedSeal) else 1) + num_retriggers)
+        for card in held_cards
+    ]
+
+
+def _apply_hand_steps(
+    plan: ScoringPlan,
+    chips_sum: float,
+    mult_sum: Any,
+    played_cards: Sequence[PlayingCard],
+    board_state: BoardState,
+    blind_state: BlindState,
+    hand_type: PokerHandType,
+) -> tuple[float, Any]:
+    """Applies the hand hooks and the edition of each joker, in joker order."""
+    for step in plan.hand:
+        joker = step.joker
+        if step.chips:
+            chips_sum += joker.get_chips_hand(played_cards, blind_state, board_state, hand_type)
+        if step.mult:
+            mult_sum += joker.get_mult_hand(played_cards, blind_state, board_state, hand_type)
+        if step.multiplication:
+            mult_sum *= joker.get_multiplication(played_cards, blind_state, board_state, hand_type)
+        mult_sum += step.edition_mult
+        chips_sum += step.edition_chips
+        mult_sum *= step.edition_multiplication
+    return chips_sum, mult_sum
+
+
+class SubsetScores(NamedTuple):
+    scores: np.ndarray
+    """The expected score of each subset."""
+    hand_types: np.ndarray
+    """The poker hand of each subset, as an index into `POKER_HAND_TYPES`."""
+
+
+def score_all_subsets(board_state: BoardState, blind_state: BlindState) -> SubsetScores:
+    """Scores every subset of up to `MAX_PLAYED_CARDS` cards of the hand as `score_hand` would, without playing it.
+
+    Row `i` of the result is the subset in row `i` of the table in `actions`, so the result covers the first
+    `NUM_SUBSETS[len(hand)]` rows, the legal plays of `Run.legal_hand_actions`. Nothing is changed and no random number
+    is drawn: random effects count with their expected value, and cards and jokers are not destroyed.
+
+    The contributions of each card, when played and when held, including the per-card joker hooks, are computed once
+    and shared by every subset. Only the classification and the hand-level joker hooks run per subset.
+    """
+    hand = blind_state.hand[:MAX_HAND_SIZE]
+    plan = board_state.scoring_plan
+    has_hack = plan.effects.hack > 0
+
+    slots = {}
+    retriggers, chips, mults, multiplications, joker_chips, joker_mults = [], [], [], [], [], []
+    for slot, card in enumerate(hand):
+        slots[id(card)] = slot
+        num_card_retriggers = 2 if isinstance(card.seal, RedSeal) else 1
+        if has_hack and card.rank in [Rank.TWO, Rank.THREE, Rank.FOUR, Rank.FIVE]:
+            num_card_retriggers += 1
+        retriggers.append(num_card_retriggers)
+        chips.append(card.get_chips() + card.edition.get_chips())
+        mults.append(card.get_expected_mult() + card.edition.get_expected_mult())
+        multiplications.append(card.get_multiplication() * card.edition.get_multiplication())
+        joker_chips.append(sum(joker.get_chips_card(card, blind_state, board_state) for joker in plan.card_chips))
+        joker_mults.append(sum(float(joker.get_mult_card(card, blind_state, board_state)) for joker in plan.card_mult))
+
+    num_subsets = NUM_SUBSETS[len(hand)]
+    # Cards past the last slot can't be played, so they are always held
+    held_multiplications = np.array(_held_multiplications(blind_state.hand, plan.effects), dtype=np.float64)
+    in_subset = (SUBSET_MASKS[:num_subsets, None] >> np.arange(len(hand)) & 1).astype(bool)
+    held_multiplication = np.where(in_subset, 1.0, held_multiplications[: len(hand)]).prod(axis=1)
+    held_multiplication *= held_multiplications[len(hand):].prod()
+
+    scores = np.empty(num_subsets, dtype=np.float64)
+    hand_types = np.empty(num_subsets, dtype=np.int64)
+    for subset in range(num_subsets):
+        played_cards, hand_type = get_poker_hand(subset_cards(hand, subset), board_state)
+        poker_scale = board_state.get_poker_hand(hand_type).score
+        chips_sum: float = poker_scale.chips
+        mult_sum: float = poker_scale.mult
+        for card in played_cards:
+            slot = slots[id(card)]
+            for _ in range(retriggers[slot]):
+                chips_sum += chips[slot]
+                mult_sum += mults[slot]
+                mult_sum *= multiplications[slot]
+            chips_sum += joker_chips[slot]
+            mult_sum += joker_mults[slot]
+        mult_sum *= held_multiplication[subset]
+
+        chips_sum, mult_sum = _apply_hand_steps(
+            plan, chips_sum, mult_sum, played_cards, board_state, blind_state, hand_type
+        )
+        scores[subset] = chips_sum * mult_sum
+        hand_types[subset] = _HAND_TYPE_INDEX[hand_type]
+    return SubsetScores(scores, hand_types)
+
+
 # These are broken out for testability
 
 
@@ -123,53 +401,168 @@ def _extract_largest_set(hand: Sequence[PlayingCard], counts: Sequence[tuple[Ran
     return [card for card in hand if card.rank == mc_rank]
 
 
+_RANK_ORDER: Mapping[Rank, int] = {rank: rank.value.order for rank in Rank}
+_NUM_RANK_SLOTS = 14
+"""Rank orders run from 1 (ace) to 13 (king), slot 0 stays empty."""
+_ROYAL = sum(1 << order for order in (1, 10, 11, 12, 13))
+_FOUR_FINGERS_ROYALS = frozenset(sum(1 << order for order in orders) for orders in ((10, 11, 12, 13), (1, 11, 12, 13)))
+_CONSECUTIVE_RANKS = frozenset(
+    ((1 << length) - 1) << low for length in range(1, _NUM_RANK_SLOTS) for low in range(1, _NUM_RANK_SLOTS - length + 1)
+)
+"""Bitmasks of every window of consecutive rank orders, see `is_consecutive`."""
+
+
+class HandCacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class HandCache:
+    """A bounded cache of `get_poker_hand`, evicting the least recently used hands.
+
+    A hand is keyed by the only things the classification reads: the rank, suit and stone or wild enhancement of each
+    card, packed into one integer per card, along with whether `FourFingers` is in play. The played cards are stored as
+    slots of the hand, so one entry serves every hand of equal cards. A `maxsize` of 0 disables the cache.
+    """
+
+    def __init__(self, maxsize: int = 4096) -> None:
+        self._maxsize = maxsize
+        self._entries: OrderedDict[tuple[int, ...], tuple[tuple[int, ...], PokerHandType]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def maxsize(self) -> int:
+        return self._maxsize
+
+    @maxsize.setter
+    def maxsize(self, maxsize: int) -> None:
+        self._maxsize = maxsize
+        while len(self._entries) > max(maxsize, 0):
+            self._entries.popitem(last=False)
+
+    def info(self) -> HandCacheInfo:
+        return HandCacheInfo(self.hits, self.misses, self._maxsize, len(self._entries))
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def get_poker_hand(
+        self, hand: Sequence[PlayingCard], four_fingers: bool
+    ) -> tuple[Sequence[PlayingCard], PokerHandType]:
+        if self._maxsize <= 0:
+            return _classify_hand(hand, four_fingers)
+        key = (four_fingers, *[_hand_code(card) for card in hand])
+        entry = self._entries.get(key)
+        if entry is not None:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            slots, hand_type = entry
+            return [hand[slot] for slot in slots], hand_type
+
+        self.misses += 1
+        played_cards, hand_type = _classify_hand(hand, four_fingers)
+        slot_of = {id(card): slot for slot, card in enumerate(hand)}
+        self._entries[key] = tuple(slot_of[id(card)] for card in played_cards), hand_type
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+        return played_cards, hand_type
+
+
+HAND_CACHE = HandCache()
+"""The cache used by `get_poker_hand`. Its size can be changed at any time, e.g. `HAND_CACHE.maxsize = 0`."""
+
+# Looked up by exact type, which is much cheaper than `isinstance` against the protocol classes
+_ENHANCEMENT_CODES: Mapping[type, int] = {StoneCard: 1 << 6, WildCard: 2 << 6}
+
+
+def _hand_code(card: PlayingCard) -> int:
+    return _RANK_ORDER[card.rank] | SUIT_INDEX[card.base_suit] << 4 | _ENHANCEMENT_CODES.get(type(card.enhancement), 0)
+
+
 def get_poker_hand(hand: Sequence[PlayingCard], board: BoardState) -> tuple[Sequence[PlayingCard], PokerHandType]:
     """
     Order of poker hand precedence:
         Straight flush, straight, flush, five set, four set, flush house, full house, three set, two set, one set
+
+    Hands are looked up in `HAND_CACHE` first, see `HandCache`.
     """
-    counts = _get_max_rank(hand)
-    flush = len(get_flush(hand, board)) > 0
-    straight = len(get_straight(hand, board)) > 0
-    is_full = _is_full_house(counts)
-    is_two_pair = contains_two_pair(counts)
-    is_royal_res = is_royal(hand, board)
-    max_set = _extract_largest_set(hand, counts)
+    return HAND_CACHE.get_poker_hand(hand, board.joker_effects.four_fingers > 0)
+
+
+def _classify_hand(hand: Sequence[PlayingCard], four_fingers: bool) -> tuple[Sequence[PlayingCard], PokerHandType]:
+    """The uncached `get_poker_hand`.
+
+    The hand is classified in a single pass from a histogram and a bitmask of its ranks and the number of cards of
+    each suit, with the same results as `get_flush`, `get_straight`, `is_royal` and the rank `Counter`.
+    """
+    req_length = 4 if four_fingers else 5
+    orders = []
+    rank_counts = [0] * _NUM_RANK_SLOTS
+    # Distinct ranks in order of their first card, which breaks ties between equal counts as `Counter` does
+    distinct_orders = []
+    rank_bits = 0
+    suit_counts = dict.fromkeys(Suit, 0)
+    num_wild = 0
     # Though not used in hands, stone cards should still be included in a played hand
     base_hand: list[PlayingCard] = []
     for card in hand:
-        if card.enhancement == StoneCard():
+        order = _RANK_ORDER[card.rank]
+        orders.append(order)
+        if rank_counts[order] == 0:
+            distinct_orders.append(order)
+            rank_bits |= 1 << order
+        rank_counts[order] += 1
+        enhancement = card.enhancement
+        if isinstance(enhancement, StoneCard):
             base_hand.append(card)
-    if is_royal_res and flush and straight:
+        elif isinstance(enhancement, WildCard):
+            num_wild += 1
+        else:
+            suit_counts[card.base_suit] += 1
+
+    top = second = 0
+    for order in distinct_orders:
+        if rank_counts[order] > rank_counts[top]:
+            top, second = order, top
+        elif rank_counts[order] > rank_counts[second]:
+            second = order
+    top_count, second_count = rank_counts[top], rank_counts[second]
+
+    flush = len(hand) > 0 and max(suit_counts.values()) + num_wild >= req_length
+    royal = rank_bits == _ROYAL or (four_fingers and rank_bits in _FOUR_FINGERS_ROYALS)
+    consecutive = len(distinct_orders) == len(hand) and rank_bits in _CONSECUTIVE_RANKS
+    straight = (consecutive or royal) and len(hand) >= req_length
+    is_full = top_count == 3 and second_count == 2
+    max_set = [card for card, order in zip(hand, orders) if order == top]
+    if royal and flush and straight:
         return [*base_hand, *hand], PokerHandType.ROYAL_FLUSH
     elif flush and straight:
         return [*base_hand, *hand], PokerHandType.STRAIGHT_FLUSH
     elif flush and is_full:
         return [*base_hand, *hand], PokerHandType.FLUSH_HOUSE
-    elif flush and len(max_set) == 5:
+    elif flush and top_count == 5:
         return [*base_hand, *hand], PokerHandType.FLUSH_FIVE
     elif straight:
         return [*base_hand, *hand], PokerHandType.STRAIGHT
     elif flush:
         return [*base_hand, *hand], PokerHandType.FLUSH
-    elif len(max_set) == 5:
+    elif top_count == 5:
         return max_set, PokerHandType.FIVE_SET
-    elif len(max_set) == 4:
+    elif top_count == 4:
         return [*base_hand, *max_set], PokerHandType.FOUR_SET
     elif is_full:
         return hand, PokerHandType.FULL_HOUSE
-    elif len(max_set) == 3:
+    elif top_count == 3:
         return [*base_hand, *max_set], PokerHandType.THREE_SET
-    elif is_two_pair:
-        if len(counts) == 1:
-            return [*base_hand, *[card for card in hand if card.rank in set([counts[0][0]])]], PokerHandType.TWO_PAIR
-        else:
-            return [
-                *base_hand,
-                *[card for card in hand if card.rank in set([counts[0][0], counts[1][0]])],
-            ], PokerHandType.TWO_PAIR
-
-    elif len(max_set) == 2:
+    elif top_count >= 2 and second_count >= 2:
+        pairs = [card for card, order in zip(hand, orders) if order in (top, second)]
+        return [*base_hand, *pairs], PokerHandType.TWO_PAIR
+    elif top_count == 2:
         return [*base_hand, *max_set], PokerHandType.PAIR
     else:
         # N.B. stone card would already be included here, so don't extend `base_hand`
@@ -1,6 +1,7 @@
 import dataclasses
-import random
-from typing import Sequence
+from typing import Optional, Sequence
+
+import numpy as np
 
 from balatro_gym.cards.booster_packs import (
     BOOSTER_TO_PACK_INFO,
@@ -10,12 +11,13 @@ from balatro_gym.cards.booster_packs import (
     PackType,
 )
 from balatro_gym.cards.interfaces import HasCost
-from balatro_gym.cards.joker.effect_joker import ChaosTheClown, Showman
+from balatro_gym.cards.joker.effect_joker import ChaosTheClown
 from balatro_gym.cards.joker.utils import sample_jokers
 from balatro_gym.cards.planet import PLANET_CARDS
 from balatro_gym.cards.tarot import TAROT_CARDS
 from balatro_gym.cards.voucher import ALL_VOUCHERS
-from balatro_gym.interfaces import Booster, JokerBase, Voucher
+from balatro_gym.interfaces import Booster, JokerBase, JokerEffects, Voucher
+from balatro_gym.rng import choices, resolve_rng, sample
 
 __all__ = ["Shop"]
 
@@ -45,6 +47,7 @@ class Shop:
         num_booster_packs: int = 2,
         reroll_price: int = 5,
         allow_duplicates: bool = False,
+        rng: Optional[np.random.Generator] = None,
     ):
         self.num_buyable_slots = num_buyable_slots
         self.num_vouchers = num_vouchers
@@ -56,6 +59,7 @@ class Shop:
         self.current_state = None
         self.allow_duplicates = allow_duplicates
         self.n_rerolls = 0
+        self._rng = resolve_rng(rng)
 
     def get_reroll_price(self, jokers: Sequence[JokerBase]) -> int:
         if any([isinstance(j, ChaosTheClown) for j in jokers]):
@@ -93,7 +97,7 @@ class Shop:
             check_dependency = voucher.dependency is None or dependency_met
             if check_dependency and voucher not in self.bought_vouchers:
                 valid_vouchers.append(voucher)
-        return random.sample(valid_vouchers, self.num_vouchers)
+        return sample(self._rng, valid_vouchers, self.num_vouchers)
 
     def generate_shop_state(self, round: int, jokers: Sequence[JokerBase]) -> ShopState:
         # Generate new voucher only on the first run of the ante
@@ -120,15 +124,15 @@ class Shop:
         # On the first round, one normal buffoon pack is guaranteed
         if round == 1:
             pack_info = JOKER_SPECTRAL_PACK_INFO[PackType.NORMAL]
-            random_booster = random.choices(potential_packs, weights=probabilities, k=self.num_booster_packs - 1)
+            random_booster = choices(self._rng, potential_packs, k=self.num_booster_packs - 1, weights=probabilities)
             return [BuffoonPack(pack_info.cost, pack_info.n_cards, pack_info.n_choice)] + random_booster
-        return random.choices(potential_packs, weights=probabilities, k=self.num_booster_packs)
+        return choices(self._rng, potential_packs, k=self.num_booster_packs, weights=probabilities)
 
     def generate_buyable_cards(self, jokers: Sequence[JokerBase]) -> Sequence[HasCost]:
         sampled_cards: list[HasCost]
         n_tarots, n_planets, n_jokers = 0, 0, 0
         for _ in range(self.num_buyable_slots):
-            rand = random.random()
+            rand = self._rng.random()
             # The probabilities are based on numbers provided by https://balatrogame.fandom.com/wiki/The_Shop
             if rand < 1 / 7:
                 n_tarots += 1
@@ -137,15 +141,16 @@ class Shop:
             else:
                 n_jokers += 1
 
-        allow_repeat = any([isinstance(j, Showman) for j in jokers])
+        allow_repeat = JokerEffects.from_jokers(jokers).showman > 0
         sampled_tarot_and_planets: Sequence[type[HasCost]]
         if allow_repeat:
-            sampled_tarot_and_planets = (random.choices(PLANET_CARDS, k=n_planets) +
-                                         random.choices(TAROT_CARDS, k=n_tarots))
+            sampled_tarot_and_planets = (choices(self._rng, PLANET_CARDS, k=n_planets) +
+                                         choices(self._rng, TAROT_CARDS, k=n_tarots))
         else:
-            sampled_tarot_and_planets = random.sample(PLANET_CARDS, n_planets) + random.sample(TAROT_CARDS, n_tarots)
+            sampled_tarot_and_planets = (sample(self._rng, PLANET_CARDS, n_planets) +
+                                         sample(self._rng, TAROT_CARDS, n_tarots))
 
-        sampled_jokers: Sequence[HasCost] = sample_jokers(jokers, self.vouchers, n_jokers)
+        sampled_jokers: Sequence[HasCost] = sample_jokers(jokers, self.vouchers, n_jokers, self._rng)
         sampled_cards = [card() for card in list(sampled_tarot_and_planets)] + list(sampled_jokers)
         assert [isinstance(c, HasCost) for c in sampled_cards]
         return sampled_cards
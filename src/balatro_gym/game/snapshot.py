@@ -0,0 +1,186 @@
+"""Snapshots hold references to the run's own objects plus copies of their mutable fields, instead of deep copies.
+
+Cards, jokers and poker hands are restored in place, so the objects seen by the run keep their identity across a
+restore and a snapshot may be restored any number of times. This means a snapshot belongs to the run it was taken
+from: restoring it into another run would make both runs share (and mutate) the same card objects."""
+
+import dataclasses
+from collections.abc import Mapping, Sequence
+from enum import Enum
+from typing import Any, Optional
+
+import numpy as np
+
+from ..cards.interfaces import Deck, PlayingCard
+from ..interfaces import BlindState, BoardState, ConsumableCardBase, JokerBase, Voucher
+from ..journal import get_fields, set_fields
+from .blinds import BlindInfo
+from .shop import Shop, ShopState
+
+__all__ = ["RunSnapshot"]
+
+
+@dataclasses.dataclass(frozen=True)
+class DeckSnapshot:
+    cards: tuple[PlayingCard, ...]
+    order: tuple[int, ...]
+    split: int
+    num_remaining: int
+
+    @staticmethod
+    def capture(deck: Deck) -> "DeckSnapshot":
+        return DeckSnapshot(tuple(deck._cards), tuple(deck._order), deck._split, deck._num_remaining)
+
+    def restore(self, deck: Deck) -> None:
+        deck._set_cards(list(self.cards), list(self.order), self.split, self.num_remaining)
+
+
+@dataclasses.dataclass(frozen=True)
+class BoardSnapshot:
+    money: int
+    jokers: tuple[JokerBase, ...]
+    ante_num: int
+    round_num: int
+    num_hands: int
+    num_discards: int
+    hand_size: int
+    num_joker_slots: int
+    vouchers: tuple[Voucher, ...]
+    poker_hands: tuple[tuple[int, int], ...]
+    """Level and number of times played of each poker hand, in the order of `BoardState.poker_hands`."""
+    completed_blinds: tuple[BlindInfo, ...]
+    round_blinds: tuple[BlindInfo, ...]
+    last_used_consumable: Optional[ConsumableCardBase]
+    num_consumable_slots: int
+    consumables: tuple[ConsumableCardBase, ...]
+    deck: DeckSnapshot
+
+    @staticmethod
+    def capture(board: BoardState) -> "BoardSnapshot":
+        return BoardSnapshot(
+            board.money,
+            tuple(board.jokers),
+            board.ante_num,
+            board.round_num,
+            board.num_hands,
+            board.num_discards,
+            board.hand_size,
+            board.num_joker_slots,
+            tuple(board.vouchers),
+            tuple((hand.level, hand.num_played) for hand in board.poker_hands.values()),
+            tuple(board.completed_blinds),
+            tuple(board.round_blinds),
+            board.last_used_consumable,
+            board.consumable.num_slots,
+            tuple(board.consumable.consumables),
+            DeckSnapshot.capture(board.deck),
+        )
+
+    def restore(self, board: BoardState) -> None:
+        board.money = self.money
+        board.jokers = list(self.jokers)
+        board.ante_num = self.ante_num
+        board.round_num = self.round_num
+        board.num_hands = self.num_hands
+        board.num_discards = self.num_discards
+        board.hand_size = self.hand_size
+        board.num_joker_slots = self.num_joker_slots
+        board.vouchers = list(self.vouchers)
+        for hand, (level, num_played) in zip(board.poker_hands.values(), self.poker_hands):
+            hand.level = level
+            hand.num_played = num_played
+        board.completed_blinds = list(self.completed_blinds)
+        board.round_blinds = list(self.round_blinds)
+        board.last_used_consumable = self.last_used_consumable
+        board.consumable.num_slots = self.num_consumable_slots
+        board.consumable.consumables = list(self.consumables)
+        self.deck.restore(board.deck)
+
+
+def _copy_fields(fields: dict[str, Any]) -> dict[str, Any]:
+    # Containers are copied one level deep, their items are shared
+    return {name: value.copy() if isinstance(value, (list, set, dict)) else value for name, value in fields.items()}
+
+
+@dataclasses.dataclass(frozen=True)
+class RunSnapshot:
+    """The full state of a `Run`, see `Run.snapshot`."""
+
+    game_state: Enum
+    action_counter: int
+    run_blinds: Sequence[BlindInfo]
+    board: BoardSnapshot
+    blind: Optional[BlindState]
+    shop_state: Optional[ShopState]
+    shop: dict[str, Any]
+    cards: tuple[tuple[PlayingCard, dict[str, Any]], ...]
+    """Every card of the deck and hand along with a copy of its fields."""
+    jokers: tuple[tuple[JokerBase, dict[str, Any]], ...]
+    random_state: tuple[Mapping[str, Any], ...]
+    seed_sequence: np.random.SeedSequence
+    """A copy of the run's seed sequence, which seeds the runs started by later resets."""
+
+    @staticmethod
+    def capture(
+        game_state: Enum,
+        action_counter: int,
+        run_blinds: Sequence[BlindInfo],
+        board: BoardState,
+        blind: Optional[BlindState],
+        shop_state: Optional[ShopState],
+        shop: Shop,
+        seed_sequence: np.random.SeedSequence,
+    ) -> "RunSnapshot":
+        cards: dict[int, PlayingCard] = {}
+        for card in (*board.deck.cards, *(blind.hand if blind else ())):
+            cards[id(card)] = card
+        return RunSnapshot(
+            game_state,
+            action_counter,
+            run_blinds,
+            BoardSnapshot.capture(board),
+            _copy_blind(blind),
+            _copy_shop_state(shop_state),
+            _copy_fields(vars(shop)),
+            tuple((card, get_fields(card)) for card in cards.values()),
+            tuple((joker, vars(joker).copy()) for joker in board.jokers),
+            board.rng.get_state(),
+            _copy_seed_sequence(seed_sequence),
+        )
+
+    def restore_objects(self, board: BoardState, shop: Shop) -> tuple[Optional[BlindState], Optional[ShopState]]:
+        """Restores the board and shop in place and returns fresh copies of the blind and shop states.
+
+        The board and shop may be new objects if the run was reset since the snapshot was taken, in which case their
+        random streams are restored rather than the ones the snapshot saw.
+        """
+        for card, fields in self.cards:
+            set_fields(card, fields)
+        for joker, fields in self.jokers:
+            joker.__dict__.update(fields)
+        self.board.restore(board)
+        vars(shop).clear()
+        vars(shop).update(_copy_fields(self.shop))
+        shop._rng = board.rng.shop
+        board.rng.set_state(self.random_state)
+        return _copy_blind(self.blind), _copy_shop_state(self.shop_state)
+
+
+def _copy_seed_sequence(seed_sequence: np.random.SeedSequence) -> np.random.SeedSequence:
+    # Spawning advances the sequence, so every capture and restore needs its own copy
+    return np.random.SeedSequence(
+        seed_sequence.entropy,
+        spawn_key=seed_sequence.spawn_key,
+        pool_size=seed_sequence.pool_size,
+        n_children_spawned=seed_sequence.n_children_spawned,
+    )
+
+
+def _copy_blind(blind: Optional[BlindState]) -> Optional[BlindState]:
+    return None if blind is None else dataclasses.replace(blind, hand=list(blind.hand))
+
+
+def _copy_shop_state(shop_state: Optional[ShopState]) -> Optional[ShopState]:
+    if shop_state is None:
+        return None
+    return ShopState(list(shop_state.buyable_cards), list(shop_state.vouchers), list(shop_state.booster_packs))
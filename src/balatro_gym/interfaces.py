@@ -1,16 +1,22 @@
 from __future__ import annotations
 
+import copy
 import dataclasses
+from collections import Counter
 from collections.abc import Sequence
 from enum import Enum, auto
-from typing import Any, Optional, Protocol, Union, runtime_checkable
+from typing import Any, ClassVar, NamedTuple, Optional, Protocol, Union, runtime_checkable
+
+import numpy as np
 
 from .cards.decks import STANDARD_DECK
 from .cards.interfaces import BaseEdition, Deck, Edition, Foil, HasCost, Holographic, Negative, PlayingCard, Polychrome
 from .cards.voucher import Voucher
 from .constants import DEFAULT_NUM_CONSUMABLE, DEFAULT_NUM_JOKER_SLOTS, DEFAULT_START_MONEY
 from .game.blinds import BlindInfo
+from .journal import Journal
 from .mixins import HasReset
+from .rng import RandomStreams
 
 __all__ = [
     "Tag",
@@ -20,10 +26,13 @@ __all__ = [
     "Rarity",
     "Activation",
     "Type",
+    "JokerEffect",
+    "JokerEffects",
     "PokerScale",
     "PokerHandType",
     "JokerBase",
     "PlanetCard",
+    "ScoringPlan",
     "BoardState",
 ]
 
@@ -46,7 +55,9 @@ class Booster(Protocol):
     n_cards: int
     n_choice: int
 
-    def sample(self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher]) -> Sequence[HasCost]:
+    def sample(
+        self, jokers: Sequence[JokerBase], vouchers: Sequence[Voucher], rng: Optional[np.random.Generator] = None
+    ) -> Sequence[HasCost]:
         raise NotImplementedError
 
 
@@ -72,6 +83,17 @@ class Type(Enum):
     ECONOMY = auto()
 
 
+class JokerEffect(Enum):
+    """Effects of jokers that change the rules rather than the score. Values name the fields of `JokerEffects`."""
+
+    FOUR_FINGERS = "four_fingers"
+    HACK = "hack"
+    MIME = "mime"
+    PAREIDOLIA = "pareidolia"
+    SHOWMAN = "showman"
+    OOPS_ALL_6S = "oops_all_6s"
+
+
 @dataclasses.dataclass(frozen=True)
 class PokerScale:
     mult: float
@@ -174,6 +196,8 @@ class ConsumableState(HasReset):
 @dataclasses.dataclass
 class JokerBase(HasCost):
     _edition: Edition
+    effect: ClassVar[Optional[JokerEffect]] = None
+    """The rule changed by the Joker, if any, see `BoardState.joker_effects`."""
 
     def __init__(self, edition: Edition = BaseEdition()):
         # This isn't strictly necessary, but is useful for testing
@@ -209,6 +233,10 @@ class JokerBase(HasCost):
         """The money earned by the player from selling this Joker."""
         return 0
 
+    def is_destroyed(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> bool:
+        """Whether the Joker destroys itself after a hand is scored."""
+        return False
+
     def get_end_of_round_money(self, blind: BlindState, board: "BoardState") -> int:
         """The money earned from jokers at the end of a round."""
         return 0
@@ -247,6 +275,92 @@ class JokerBase(HasCost):
         return 0
 
 
+def _overrides(joker: JokerBase, hook: str) -> bool:
+    return getattr(type(joker), hook) is not getattr(JokerBase, hook)
+
+
+@dataclasses.dataclass(frozen=True)
+class JokerEffects:
+    """The number of jokers with each `JokerEffect` in a lineup."""
+
+    four_fingers: int = 0
+    hack: int = 0
+    mime: int = 0
+    pareidolia: int = 0
+    showman: int = 0
+    oops_all_6s: int = 0
+
+    @staticmethod
+    def from_jokers(jokers: Sequence[JokerBase]) -> JokerEffects:
+        counts = Counter(joker.effect for joker in jokers if joker.effect is not None)
+        return JokerEffects(**{effect.value: count for effect, count in counts.items()})
+
+
+class HandStep(NamedTuple):
+    """The hand-level effects of one joker: which of its hand hooks to call, then what its edition adds."""
+
+    joker: JokerBase
+    chips: bool
+    mult: bool
+    multiplication: bool
+    edition_chips: int
+    edition_mult: float
+    edition_multiplication: float
+
+
+@dataclasses.dataclass(frozen=True)
+class ScoringPlan:
+    """The jokers `score_hand` has to consult in each phase, compiled from a lineup by `BoardState.scoring_plan`.
+
+    Every phase only lists the jokers that override its hook, in lineup order, so the no-op defaults of `JokerBase`
+    are never called. Hooks are still looked up on the jokers when called, which keeps them patchable (e.g. by
+    `Profiler`).
+    """
+
+    jokers: tuple[JokerBase, ...]
+    card_chips: tuple[JokerBase, ...]
+    """Jokers overriding `get_chips_card`."""
+    card_mult: tuple[JokerBase, ...]
+    """Jokers overriding `get_mult_card`."""
+    hand: tuple[HandStep, ...]
+    """Jokers with a hand hook or an edition that changes the score."""
+    money: tuple[JokerBase, ...]
+    """Jokers overriding `get_money`."""
+    destroyable: tuple[JokerBase, ...]
+    """Jokers overriding `is_destroyed`."""
+    effects: JokerEffects
+
+    @staticmethod
+    def compile(jokers: Sequence[JokerBase]) -> ScoringPlan:
+        hand = []
+        for joker in jokers:
+            edition = joker.edition
+            step = HandStep(
+                joker,
+                _overrides(joker, "get_chips_hand"),
+                _overrides(joker, "get_mult_hand"),
+                _overrides(joker, "get_multiplication"),
+                edition.get_chips(),
+                edition.get_mult(),
+                edition.get_multiplication(),
+            )
+            has_edition = (step.edition_chips, step.edition_mult, step.edition_multiplication) != (0, 0, 1)
+            if step.chips or step.mult or step.multiplication or has_edition:
+                hand.append(step)
+        return ScoringPlan(
+            tuple(jokers),
+            tuple(joker for joker in jokers if _overrides(joker, "get_chips_card")),
+            tuple(joker for joker in jokers if _overrides(joker, "get_mult_card")),
+            tuple(hand),
+            tuple(joker for joker in jokers if _overrides(joker, "get_money")),
+            tuple(joker for joker in jokers if _overrides(joker, "is_destroyed")),
+            JokerEffects.from_jokers(jokers),
+        )
+
+
+_JOKERS_FIELD = "jokers"
+
+
 @dataclasses.dataclass
 class BoardState(HasReset):
     consumable: ConsumableState
@@ -267,13 +381,30 @@ class BoardState(HasReset):
     """Contains the three blinds for the round."""
     last_used_consumable: Optional[ConsumableCardBase]
     """Last tarot or planet card used."""
-
-    def __init__(self) -> None:
+    rng: RandomStreams = dataclasses.field(compare=False, repr=False)
+    """Random streams of the run. The deck shuffles with `rng.deck`, tarots and planets draw from `rng.consumables`
+    and jokers and enhancements from `rng.scoring`."""
+    _journal: Optional[Journal] = dataclasses.field(default=None, compare=False, repr=False)
+    _scoring_plan: Optional[ScoringPlan] = dataclasses.field(default=None, compare=False, repr=False)
+
+    def __init__(self, rng: Optional[RandomStreams] = None) -> None:
+        self.rng = RandomStreams.from_seed() if rng is None else rng
         self.reset()
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == _JOKERS_FIELD:
+            object.__setattr__(self, "_scoring_plan", None)
+        object.__setattr__(self, name, value)
+
+    def set_journal(self, journal: Optional[Journal]) -> None:
+        """Records every following mutation of the board and its deck into `journal`, or stops recording if None."""
+        self._journal = journal
+        self.deck._journal = journal
+
     def reset(self) -> None:
         self.consumable = ConsumableState()
-        self.deck = Deck(STANDARD_DECK)
+        # Cards are changed in place by tarots, so every run gets its own
+        self.deck = Deck([copy.copy(card) for card in STANDARD_DECK], self.rng.deck)
         self.money = DEFAULT_START_MONEY
         self.jokers = []
         self.ante_num = 0
@@ -291,8 +422,37 @@ class BoardState(HasReset):
     def get_poker_hand(self, poker_hand_type: PokerHandType) -> PokerHand:
         return self.poker_hands[poker_hand_type.name]
 
+    @property
+    def scoring_plan(self) -> ScoringPlan:
+        """The scoring plan of the current jokers, compiled again after `jokers_changed`.
+
+        `acquire_joker`, `remove_joker` and assigning `jokers` keep the plan current. Code that changes the list in
+        place or the edition of a joker on the board has to call `jokers_changed` itself.
+        """
+        plan = self._scoring_plan
+        if plan is None:
+            plan = self._scoring_plan = ScoringPlan.compile(self.jokers)
+        return plan
+
+    def jokers_changed(self) -> None:
+        """Drops the scoring plan and the joker effects, which are compiled again when next used."""
+        self._scoring_plan = None
+
+    @property
+    def joker_effects(self) -> JokerEffects:
+        """The effect jokers on the board, kept with the scoring plan so they are only counted when jokers change."""
+        return self.scoring_plan.effects
+
     def use_consumable(self, card: ConsumableCardBase, selected_cards: Sequence[PlayingCard]) -> bool:
         assert isinstance(card, PlanetCard) or isinstance(card, Tarot)
+        if self._journal is not None:
+            # Consumables change the selected cards, joker editions or a poker hand level in place
+            self._journal.record_setattr(self, "last_used_consumable")
+            self._journal.record(self.jokers_changed)
+            for changed in [*selected_cards, *self.jokers]:
+                self._journal.record_fields(changed)
+            if isinstance(card, PlanetCard):
+                self._journal.record_setattr(self.get_poker_hand(card._hand_type), "level")
         if isinstance(card, Tarot) and card.apply(selected_cards, self):
             self.last_used_consumable = card
             # If the object is in the consumables list, we're using a consumable from the board and we need to remove it
@@ -311,16 +471,36 @@ class BoardState(HasReset):
     def remove_consumable(self, card: ConsumableCardBase) -> None:
         # Needed to consume or sell a consumable
         assert card in self.consumable.consumables
+        if self._journal is not None:
+            self._journal.record_list(self.consumable.consumables)
         self.consumable.consumables.remove(card)
 
     def acquire_consumable(self, card: ConsumableCardBase) -> None:
         # Needed to buy or acquire a consumable
         assert self.consumable.num_slots > len(self.consumable.consumables)
+        if self._journal is not None:
+            self._journal.record_list(self.consumable.consumables)
         self.consumable.consumables.append(card)
 
     def acquire_joker(self, joker: JokerBase) -> None:
         assert self.num_joker_slots > len(self.jokers)
+        self._record_jokers()
         self.jokers.append(joker)
+        self.jokers_changed()
+
+    def remove_joker(self, joker: JokerBase) -> None:
+        # Needed to destroy or sell a joker, which is matched by identity
+        self._record_jokers()
+        self.jokers[:] = [j for j in self.jokers if j is not joker]
+        self.jokers_changed()
+
+    def _record_jokers(self) -> None:
+        if self._journal is not None:
+            # Undo restores the list in place, then drops the plan compiled from the changed list
+            self._journal.record(self.jokers_changed)
+            self._journal.record_list(self.jokers)
 
     def set_money(self, amount: int) -> None:
+        if self._journal is not None:
+            self._journal.record_setattr(self, "money")
         self.money = amount
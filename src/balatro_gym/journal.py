@@ -0,0 +1,71 @@
+from collections.abc import Callable
+from functools import partial
+from typing import Any
+
+__all__ = ["Journal", "get_fields", "set_fields"]
+
+_SLOTS: dict[type, tuple[str, ...]] = {}
+
+
+def _slots(cls: type) -> tuple[str, ...]:
+    slots = _SLOTS.get(cls)
+    if slots is None:
+        names = (klass.__dict__.get("__slots__", ()) for klass in cls.__mro__)
+        slots = _SLOTS[cls] = tuple(name for group in names for name in ((group,) if isinstance(group, str) else group))
+    return slots
+
+
+def get_fields(obj: Any) -> dict[str, Any]:
+    """A shallow copy of the fields of an object, whether they are stored in its `__dict__` or in slots."""
+    if hasattr(obj, "__dict__"):
+        return vars(obj).copy()
+    return {name: getattr(obj, name) for name in _slots(type(obj))}
+
+
+def set_fields(obj: Any, fields: dict[str, Any]) -> None:
+    for name, value in fields.items():
+        setattr(obj, name, value)
+
+
+class Journal:
+    """An undo log of inverse operations.
+
+    Mutations record how to revert themselves before they are applied. `mark` returns the current position in the
+    log and `undo` reverts every mutation recorded since a mark, most recent first. Only a few entries are recorded per
+    engine step, so undoing a step is much cheaper than restoring a full snapshot.
+    """
+
+    def __init__(self) -> None:
+        self._entries: list[Callable[[], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def mark(self) -> int:
+        return len(self._entries)
+
+    def record(self, inverse: Callable[[], Any]) -> None:
+        self._entries.append(inverse)
+
+    def record_setattr(self, obj: Any, *names: str) -> None:
+        """Records the current values of the given attributes, to be set back on undo."""
+        for name in names:
+            self._entries.append(partial(setattr, obj, name, getattr(obj, name)))
+
+    def record_fields(self, obj: Any) -> None:
+        """Records a shallow copy of all fields of an object, e.g. a card about to be changed by a tarot."""
+        self._entries.append(partial(set_fields, obj, get_fields(obj)))
+
+    def record_list(self, items: list) -> None:
+        """Records the contents of a list that is about to be changed in place."""
+        self._entries.append(partial(items.__setitem__, slice(None), list(items)))
+
+    def undo(self, mark: int) -> None:
+        if not 0 <= mark <= len(self._entries):
+            raise ValueError(f"Mark {mark} is not in the journal, which has {len(self._entries)} entries.")
+        entries = self._entries
+        while len(entries) > mark:
+            entries.pop()()
+
+    def clear(self) -> None:
+        self._entries.clear()
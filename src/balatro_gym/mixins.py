@@ -1,24 +1,37 @@
-from typing import Protocol, TypeVar, runtime_checkable
+from collections.abc import Sequence
+from typing import Optional, Protocol, TypeVar, runtime_checkable
+
+import numpy as np
 
 
 @runtime_checkable
 class HasChips(Protocol):
+    __slots__ = ()
+
     def get_chips(self) -> int:
         return 0
 
 
 @runtime_checkable
 class HasIsDestroyed(Protocol):
-    def is_destroyed(self, probability_modifier: int = 1) -> bool:
+    def is_destroyed(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> bool:
         return False
 
 
 @runtime_checkable
 class HasMult(Protocol):
-    def get_mult(self, probability_modifier: int = 1) -> float:
+    def get_mult(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> float:
         # This is expected to be actively added. Thus we return 0 in the base case.
         return 0.0
 
+    def get_expected_mult(self, probability_modifier: int = 1) -> float:
+        # The mean of `get_mult`, which only needs to be overridden by random effects
+        return self.get_mult(probability_modifier)
+
+    def get_mult_outcomes(self, probability_modifier: int = 1) -> Sequence[tuple[float, float]]:
+        # The values `get_mult` can return along with their probabilities
+        return ((self.get_mult(probability_modifier), 1.0),)
+
 
 @runtime_checkable
 class HasMultiplier(Protocol):
@@ -29,7 +42,7 @@ class HasMultiplier(Protocol):
 
 @runtime_checkable
 class HasMoney(Protocol):
-    def get_scored_money(self, probability_modifier: int = 1) -> int:
+    def get_scored_money(self, probability_modifier: int = 1, rng: Optional[np.random.Generator] = None) -> int:
         return 0
 
     def get_end_money(self) -> int:
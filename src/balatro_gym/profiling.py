@@ -0,0 +1,81 @@
+import functools
+import json
+import time
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Any, ClassVar, Optional, Union
+
+__all__ = ["Profiler"]
+
+# The object holding a profiled function, the attribute it is stored under and the name it is reported as
+Target = tuple[Any, str, str]
+
+
+class Profiler:
+    """Call counts and cumulative wall time of profiled functions.
+
+    Enabling the profiler replaces each target, a function of a module or a method of a class, with a timing wrapper
+    and disabling it puts the originals back, so the targets run at full speed whenever no profiler is enabled. The
+    wrappers apply to the whole process, which is why only one profiler can be enabled at a time. Times include the
+    time spent in nested calls, e.g. `score_hand` includes `get_poker_hand`.
+    """
+
+    _active: ClassVar[Optional["Profiler"]] = None
+
+    def __init__(self) -> None:
+        self._calls: dict[str, int] = {}
+        self._seconds: dict[str, float] = {}
+        self._originals: list[tuple[Any, str, Any]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return Profiler._active is self
+
+    def enable(self, targets: Iterable[Target]) -> None:
+        if Profiler._active is not None:
+            raise RuntimeError("Another profiler is already enabled.")
+        Profiler._active = self
+        for owner, attr, name in targets:
+            original = vars(owner)[attr]
+            self._originals.append((owner, attr, original))
+            setattr(owner, attr, self._wrap(name, original))
+
+    def disable(self) -> None:
+        if not self.enabled:
+            return
+        for owner, attr, original in reversed(self._originals):
+            setattr(owner, attr, original)
+        self._originals.clear()
+        Profiler._active = None
+
+    def stats(self) -> dict[str, dict[str, float]]:
+        """Returns the number of calls and the cumulative seconds of each target called so far."""
+        return {
+            name: {"calls": calls, "seconds": self._seconds[name]} for name, calls in self._calls.items() if calls
+        }
+
+    def dump(self, path: Union[str, Path]) -> None:
+        """Writes `stats` to a JSON file."""
+        with open(path, "w") as f:
+            json.dump(self.stats(), f, indent=2)
+
+    def reset(self) -> None:
+        for name in self._calls:
+            self._calls[name] = 0
+            self._seconds[name] = 0.0
+
+    def _wrap(self, name: str, function: Callable) -> Callable:
+        calls, seconds = self._calls, self._seconds
+        calls.setdefault(name, 0)
+        seconds.setdefault(name, 0.0)
+
+        @functools.wraps(function)
+        def timed(*args: Any, **kwargs: Any) -> Any:
+            start = time.perf_counter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                seconds[name] += time.perf_counter() - start
+                calls[name] += 1
+
+        return timed
@@ -0,0 +1,69 @@
+import dataclasses
+from collections.abc import Mapping, Sequence
+from typing import Any, Optional, TypeVar, Union
+
+import numpy as np
+
+__all__ = ["RandomStreams"]
+
+_T = TypeVar("_T")
+
+SeedType = Union[None, int, np.random.SeedSequence]
+
+_fallback_rng = np.random.default_rng()
+
+
+@dataclasses.dataclass
+class RandomStreams:
+    """Independent random streams of a run, all derived from a single seed.
+
+    Each stochastic part of the game draws from its own stream, so that e.g. buying from the shop does not change
+    the order in which cards are dealt. This keeps runs reproducible and makes common random numbers possible when
+    comparing policies.
+    """
+
+    deck: np.random.Generator
+    shop: np.random.Generator
+    scoring: np.random.Generator
+    consumables: np.random.Generator
+
+    @staticmethod
+    def from_seed(seed: SeedType = None) -> "RandomStreams":
+        seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        return RandomStreams(*(np.random.default_rng(child) for child in seed_sequence.spawn(4)))
+
+    def get_state(self) -> tuple[Mapping[str, Any], ...]:
+        return tuple(rng.bit_generator.state for rng in self._generators())
+
+    def set_state(self, state: tuple[Mapping[str, Any], ...]) -> None:
+        for rng, rng_state in zip(self._generators(), state):
+            rng.bit_generator.state = dict(rng_state)
+
+    def _generators(self) -> tuple[np.random.Generator, ...]:
+        return self.deck, self.shop, self.scoring, self.consumables
+
+
+def resolve_rng(rng: Optional[np.random.Generator]) -> np.random.Generator:
+    """Returns `rng`, or a shared unseeded generator for code used outside of a seeded `Run`."""
+    return _fallback_rng if rng is None else rng
+
+
+def sample(rng: np.random.Generator, population: Sequence[_T], k: int) -> list[_T]:
+    """Draws `k` distinct items, as `random.sample`."""
+    return [population[i] for i in rng.choice(len(population), size=k, replace=False)]
+
+
+def choices(
+    rng: np.random.Generator, population: Sequence[_T], k: int, weights: Optional[Sequence[float]] = None
+) -> list[_T]:
+    """Draws `k` items with replacement, as `random.choices`."""
+    p = None
+    if weights is not None:
+        p = np.asarray(weights, dtype=np.float64)
+        p = p / p.sum()
+    return [population[i] for i in rng.choice(len(population), size=k, p=p)]
+
+
+def choice(rng: np.random.Generator, population: Sequence[_T]) -> _T:
+    """Draws a single item, as `random.choice`."""
+    return population[int(rng.integers(len(population)))]
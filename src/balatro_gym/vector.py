@@ -0,0 +1,239 @@
+import multiprocessing as mp
+import os
+import sys
+import traceback
+from collections.abc import Sequence
+from multiprocessing import resource_tracker
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Optional, SupportsFloat, Union
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from .env import BalatroEnv, ObsType
+
+__all__ = ["SharedMemoryVectorEnv"]
+
+# (name, shape, dtype) of each array stored in the shared memory block
+_ArraySpec = tuple[str, tuple[int, ...], np.dtype]
+
+_OBS_PREFIX = "obs/"
+_ALIGNMENT = 64
+
+
+def _array_specs(num_envs: int, env: BalatroEnv) -> list[_ArraySpec]:
+    observation_space, action_space = env.observation_space, env.action_space
+    assert isinstance(observation_space, spaces.Dict) and isinstance(action_space, spaces.Dict)
+    specs: list[_ArraySpec] = [
+        (_OBS_PREFIX + key, (num_envs, *space.shape), np.dtype(space.dtype))  # type: ignore[arg-type]
+        for key, space in observation_space.spaces.items()
+    ]
+    specs.extend(
+        [
+            ("action_type", (num_envs,), np.dtype(np.int64)),
+            ("selected", (num_envs, *action_space["selected"].shape), np.dtype(np.int8)),  # type: ignore[misc]
+            ("rewards", (num_envs,), np.dtype(np.float64)),
+            ("terminations", (num_envs,), np.dtype(np.bool_)),
+            ("truncations", (num_envs,), np.dtype(np.bool_)),
+        ]
+    )
+    return specs
+
+
+def _layout(specs: Sequence[_ArraySpec]) -> tuple[dict[str, int], int]:
+    offsets = {}
+    size = 0
+    for name, shape, dtype in specs:
+        offsets[name] = size
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        size += -(-nbytes // _ALIGNMENT) * _ALIGNMENT
+    return offsets, max(size, 1)
+
+
+def _views(shm: SharedMemory, specs: Sequence[_ArraySpec]) -> dict[str, np.ndarray]:
+    offsets, _ = _layout(specs)
+    return {
+        name: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=offsets[name]) for name, shape, dtype in specs
+    }
+
+
+def _attach(name: str) -> SharedMemory:
+    shm = SharedMemory(name=name)
+    if sys.version_info < (3, 13):
+        # Attaching registers the block with the resource tracker, which would then unlink it (or warn about a leak)
+        # on its own. The parent owns the block, so only it should be tracked.
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+def _worker(
+    pipe: Connection,
+    shm_name: str,
+    specs: Sequence[_ArraySpec],
+    env_indices: Sequence[int],
+    env_kwargs: dict[str, Any],
+) -> None:
+    shm = _attach(shm_name)
+    arrays = _views(shm, specs)
+    envs = []
+    for i in env_indices:
+        buffers = {name[len(_OBS_PREFIX):]: array[i] for name, array in arrays.items() if name.startswith(_OBS_PREFIX)}
+        envs.append(BalatroEnv(buffers=buffers, **env_kwargs))
+    autoreset = np.zeros(len(envs), dtype=bool)
+    rewards, terminations, truncations = arrays["rewards"], arrays["terminations"], arrays["truncations"]
+
+    try:
+        while True:
+            command, data = pipe.recv()
+            try:
+                if command == "reset":
+                    for i, env in zip(env_indices, envs):
+                        env.reset(seed=data[i])
+                    rewards[env_indices] = 0
+                    terminations[env_indices] = False
+                    truncations[env_indices] = False
+                    autoreset[:] = False
+                elif command == "step":
+                    for j, (i, env) in enumerate(zip(env_indices, envs)):
+                        if autoreset[j]:
+                            env.reset()
+                            reward: SupportsFloat = 0.0
+                            terminated, truncated = False, False
+                        else:
+                            action = {"action_type": arrays["action_type"][i], "selected": arrays["selected"][i]}
+                            _, reward, terminated, truncated, _ = env.step(action)
+                        rewards[i] = reward
+                        terminations[i] = terminated
+                        truncations[i] = truncated
+                        autoreset[j] = terminated or truncated
+                elif command == "close":
+                    pipe.send((True, None))
+                    break
+                else:
+                    raise RuntimeError(f"Received unknown command `{command}`.")
+                pipe.send((True, None))
+            except Exception:
+                pipe.send((False, traceback.format_exc()))
+    finally:
+        del arrays, rewards, terminations, truncations, envs
+        shm.close()
+        pipe.close()
+
+
+class SharedMemoryVectorEnv(VectorEnv[ObsType, dict[str, np.ndarray], np.ndarray]):
+    """Runs `BalatroEnv` copies sharded across worker processes.
+
+    Observations, actions, rewards and episode flags live in a single `multiprocessing.shared_memory` block. Each
+    worker encodes the observations of its environments straight into that block and reads their actions from it, so
+    only a short command string crosses the pipes per step and nothing of the run state is pickled.
+
+    Finished environments are reset on the following step (`AutoresetMode.NEXT_STEP`), ignoring the action given for
+    them. The arrays returned by `reset` and `step` are views into shared memory unless `copy` is set.
+    """
+
+    metadata: dict[str, Any] = {"render_modes": [], "autoreset_mode": AutoresetMode.NEXT_STEP}
+
+    def __init__(
+        self,
+        num_envs: int,
+        num_workers: Optional[int] = None,
+        copy: bool = True,
+        context: Optional[str] = None,
+        **env_kwargs: Any,
+    ) -> None:
+        env = BalatroEnv(**env_kwargs)
+        self.num_envs = num_envs
+        self.single_observation_space = env.observation_space
+        self.single_action_space = env.action_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self._copy = copy
+
+        self._specs = _array_specs(num_envs, env)
+        _, size = _layout(self._specs)
+        self._shm = SharedMemory(create=True, size=size)
+        self._arrays = _views(self._shm, self._specs)
+        self._observations = {
+            name[len(_OBS_PREFIX):]: array for name, array in self._arrays.items() if name.startswith(_OBS_PREFIX)
+        }
+
+        num_workers = min(num_envs, num_workers or os.cpu_count() or 1)
+        ctx: Any = mp.get_context(context)
+        self._pipes: list[Connection] = []
+        self._processes: list[mp.process.BaseProcess] = []
+        for env_indices in np.array_split(np.arange(num_envs), num_workers):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                args=(child_pipe, self._shm.name, self._specs, env_indices.tolist(), env_kwargs),
+                daemon=True,
+            )
+            process.start()
+            child_pipe.close()
+            self._pipes.append(parent_pipe)
+            self._processes.append(process)
+
+    def reset(
+        self,
+        *,
+        seed: Optional[Union[int, Sequence[Optional[int]]]] = None,
+        options: Optional[dict[str, Any]] = None,
+    ) -> tuple[ObsType, dict[str, Any]]:
+        if seed is None or isinstance(seed, int):
+            seeds = [None if seed is None else seed + i for i in range(self.num_envs)]
+        else:
+            if len(seed) != self.num_envs:
+                raise ValueError(f"Expected {self.num_envs} seeds, got {len(seed)}.")
+            seeds = list(seed)
+        self._send("reset", seeds)
+        return self._observe(), {}
+
+    def step(
+        self, actions: dict[str, np.ndarray]
+    ) -> tuple[ObsType, np.ndarray, np.ndarray, np.ndarray, dict[str, Any]]:
+        np.copyto(self._arrays["action_type"], actions["action_type"], casting="unsafe")
+        np.copyto(self._arrays["selected"], actions["selected"], casting="unsafe")
+        self._send("step", None)
+        rewards, terminations, truncations = (
+            self._arrays["rewards"],
+            self._arrays["terminations"],
+            self._arrays["truncations"],
+        )
+        return self._observe(), rewards.copy(), terminations.copy(), truncations.copy(), {}
+
+    def close_extras(self, **kwargs: Any) -> None:
+        for pipe, process in zip(self._pipes, self._processes):
+            if process.is_alive():
+                pipe.send(("close", None))
+        for pipe, process in zip(self._pipes, self._processes):
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+            pipe.close()
+        self._arrays.clear()
+        self._observations.clear()
+        try:
+            self._shm.close()
+        except BufferError:
+            # Observations returned without copying still reference the block; it is freed once they are released.
+            pass
+        self._shm.unlink()
+
+    def _send(self, command: str, data: Any) -> None:
+        for pipe in self._pipes:
+            pipe.send((command, data))
+        errors = []
+        for pipe in self._pipes:
+            success, message = pipe.recv()
+            if not success:
+                errors.append(message)
+        if errors:
+            raise RuntimeError(f"`{command}` failed in {len(errors)} worker(s):\n" + "\n".join(errors))
+
+    def _observe(self) -> ObsType:
+        if self._copy:
+            return {key: value.copy() for key, value in self._observations.items()}
+        return self._observations
@@ -1,11 +1,11 @@
+import copy
 from typing import (
     Sequence,
 )
-from unittest.mock import Mock, patch
+from unittest.mock import Mock
 
 import pytest
 
-import balatro_gym.cards.interfaces
 from balatro_gym.cards.interfaces import (
     BonusCard,
     Deck,
@@ -18,6 +18,7 @@ from balatro_gym.cards.interfaces import (
     MultCard,
     Negative,
     Polychrome,
+    RedSeal,
     SteelCard,
     StoneCard,
     Suit,
@@ -27,7 +28,7 @@ from balatro_gym.cards.joker.joker import GreedyJoker, Joker
 from balatro_gym.cards.planet import Mercury, Pluto
 from balatro_gym.cards.voucher import ClearanceSale, Liquidation, Voucher
 from balatro_gym.game.scoring import get_poker_hand, score_hand
-from balatro_gym.interfaces import BoardState, PokerHand, PokerHandType
+from balatro_gym.interfaces import BoardState, PokerHand, PokerHandType, ScoringPlan
 from test.utils import _make_board, _make_card
 
 
@@ -89,15 +90,14 @@ def test_enhancement_glass_destroy(probability_modifier: int) -> None:
     board_mock = Mock()
     board_mock.get_poker_hand.return_value = PokerHand(PokerHandType.HIGH_CARD, 1, 0)
     board_mock.jokers = []  # TODO See #25. This can influence probabilities and should be tested.
+    board_mock.scoring_plan = ScoringPlan.compile(board_mock.jokers)
+    board_mock.joker_effects = board_mock.scoring_plan.effects
     board_mock.deck = deck
+    board_mock.rng.scoring.random.return_value = 0
     blind_mock = Mock()
     blind_mock.hand = []
-    with patch.object(balatro_gym.cards.interfaces, "np") as mock:
-        random_mock = Mock()
-        mock.random.random = random_mock
-        random_mock.return_value = 0
-        score_hand(submitted_hand, board_mock, blind_mock)
-        assert card not in board_mock.deck.cards_played
+    score_hand(submitted_hand, board_mock, blind_mock)
+    assert card not in board_mock.deck.cards_played
 
 
 @pytest.mark.unit
@@ -170,16 +170,14 @@ def test_enhancement_lucky() -> None:
     enhancement = LuckyCard()
     card = _make_card(enhancement=enhancement)
     assert card.enhancement == enhancement
-    with patch.object(balatro_gym.cards.interfaces, "np") as mock:
-        random_mock = Mock()
-        mock.random.random = random_mock
-        # Test degenerate cases
-        random_mock.return_value = 1
-        assert enhancement.get_mult() == 0
-        assert enhancement.get_scored_money() == 0
-        random_mock.return_value = 0
-        assert enhancement.get_mult() == 20
-        assert enhancement.get_scored_money() == 20
+    rng = Mock()
+    # Test degenerate cases
+    rng.random.return_value = 1
+    assert enhancement.get_mult(rng=rng) == 0
+    assert enhancement.get_scored_money(rng=rng) == 0
+    rng.random.return_value = 0
+    assert enhancement.get_mult(rng=rng) == 20
+    assert enhancement.get_scored_money(rng=rng) == 20
 
 
 @pytest.mark.unit
@@ -188,15 +186,13 @@ def test_enhancement_lucky_modifiers(probability_modifier: int) -> None:
     enhancement = LuckyCard()
     card = _make_card(enhancement=enhancement)
     assert card.enhancement == enhancement
-    with patch.object(balatro_gym.cards.interfaces, "np") as mock:
-        random_mock = Mock()
-        mock.random.random = random_mock
+    rng = Mock()
 
-        # Verify that the base probabilities are correct
-        random_mock.return_value = min(probability_modifier / 5, 1)
-        assert enhancement.get_mult(probability_modifier) == 20
-        random_mock.return_value = min(probability_modifier / 15, 1)
-        assert enhancement.get_scored_money(probability_modifier) == 20
+    # Verify that the base probabilities are correct
+    rng.random.return_value = min(probability_modifier / 5, 1)
+    assert enhancement.get_mult(probability_modifier, rng) == 20
+    rng.random.return_value = min(probability_modifier / 15, 1)
+    assert enhancement.get_scored_money(probability_modifier, rng) == 20
 
 
 @pytest.mark.unit
@@ -262,3 +258,14 @@ def test_sell_and_cost_joker_with_edition(edition: Edition, edition_cost: int) -
     assert joker.sell_value([]) == (base_cost + edition_cost) // 2
     assert joker.cost([Liquidation()]) == (base_cost + edition_cost) // 2
     assert joker.sell_value([Liquidation()]) == min(1, (base_cost + edition_cost) // 4)
+
+
+@pytest.mark.unit
+def test_modifier_singletons() -> None:
+    assert LuckyCard() is LuckyCard() and Foil() is Foil() and RedSeal() is RedSeal()
+    card = _make_card(enhancement=LuckyCard(), edition=Foil(), seal=RedSeal())
+    copied = copy.deepcopy(card)
+    assert copied is not card and copied.enhancement is card.enhancement and copied.seal is card.seal
+    assert copied == card and hash(copied) == hash(card)
+    assert _make_card(enhancement=GlassCard()) != _make_card(enhancement=LuckyCard())
+    assert not hasattr(card, "__dict__")
@@ -1,7 +1,11 @@
+import copy
+
 import pytest
 
-from balatro_gym.cards.decks import STANDARD_DECK
+from balatro_gym.cards.decks import STANDARD_DECK, discard
 from balatro_gym.cards.interfaces import Deck, PlayingCard, Rank, Suit
+from balatro_gym.interfaces import BoardState
+from balatro_gym.journal import Journal
 
 ACE_HEART = PlayingCard(Rank.ACE, Suit.HEARTS)
 
@@ -54,6 +58,17 @@ def test_destroy() -> None:
     assert len(initial_cards) == len(deck.cards_remaining) + len(destroy_cards)
 
 
+@pytest.mark.unit
+def test_destroy_missing_card(caplog: pytest.LogCaptureFixture) -> None:
+    deck = Deck(STANDARD_DECK[:3])
+    destroyed = deck.deal(1)
+    deck.destroy(destroyed)
+    with caplog.at_level("WARNING", logger="balatro_gym.cards.interfaces"):
+        deck.destroy([*destroyed, ACE_HEART])
+    assert len(caplog.records) == 2
+    assert deck.cards_remaining == STANDARD_DECK[:2]
+
+
 @pytest.mark.unit
 def test_eq_ordering() -> None:
     initial_cards = STANDARD_DECK
@@ -70,9 +85,9 @@ def test_eq_card_action() -> None:
     deck1 = Deck(initial_cards)
     deck2 = Deck(initial_cards)
     assert deck1 == deck2
-    deck1._cards_remaining.append(ACE_HEART)
+    deck1.deal(1)
     assert deck1 != deck2
-    deck2._cards_remaining.append(ACE_HEART)
+    deck2.deal(1)
     assert deck1 == deck2
 
 
@@ -81,8 +96,115 @@ def test_reset() -> None:
     initial_cards = STANDARD_DECK
     deck = Deck(initial_cards)
     assert deck.cards_remaining == initial_cards
-    assert len(deck._cards_played) == 0
+    assert len(deck.cards_played) == 0
     deck.deal(1)
     assert deck.cards_remaining != initial_cards
     deck.reset()
     assert all(x in deck.cards_remaining for x in initial_cards)
+
+
+@pytest.mark.unit
+def test_deal_order() -> None:
+    cards = list(STANDARD_DECK[:4])
+    deck = Deck(cards)
+    # The top of the deck is the end of the list
+    assert deck.deal(2) == cards[:1:-1]
+    assert deck.deal(1) == [cards[1]]
+    assert deck.cards_played == [cards[3], cards[2], cards[1]]
+    assert deck.cards_remaining == [cards[0]]
+    with pytest.raises(IndexError):
+        deck.deal(2)
+    deck.destroy([cards[2]])
+    assert deck.cards_played == [cards[3], cards[1]]
+    deck.add([ACE_HEART])
+    assert len(deck.cards_remaining) == 2 and deck.cards_played == [cards[3], cards[1]]
+
+
+@pytest.mark.unit
+def test_shuffle_keeps_cards() -> None:
+    deck = Deck(STANDARD_DECK)
+    deck.deal(5)
+    remaining = deck.cards_remaining
+    deck.shuffle()
+    # The same card objects, only in another order
+    assert sorted(map(id, deck.cards_remaining)) == sorted(map(id, remaining))
+    assert deck.cards_played == STANDARD_DECK[:-6:-1]
+
+
+@pytest.mark.unit
+def test_run_deck_owns_cards() -> None:
+    # Tarots change cards in place, which must not reach the shared standard deck
+    deck = BoardState().deck
+    assert deck.cards_remaining == STANDARD_DECK
+    assert all(card is not standard for card, standard in zip(deck.cards_remaining, STANDARD_DECK))
+
+
+@pytest.mark.unit
+def test_destroy_exact_card() -> None:
+    first, second = PlayingCard(Rank.ACE, Suit.HEARTS), PlayingCard(Rank.ACE, Suit.HEARTS)
+    deck = Deck([*STANDARD_DECK[:3], first, second])
+    dealt = deck.deal(2)
+    assert dealt[0] is second and dealt[1] is first
+    # Destroys the given card rather than the first equal one
+    deck.destroy([first])
+    assert len(deck.cards_played) == 1 and deck.cards_played[0] is second
+    deck.destroy([STANDARD_DECK[1]])
+    assert deck.cards_remaining == [STANDARD_DECK[0], STANDARD_DECK[2]]
+    assert deck.get_num_remaining() == 2
+    assert deck.deal(2) == [STANDARD_DECK[2], STANDARD_DECK[0]]
+
+
+@pytest.mark.unit
+def test_destroy_after_shuffle() -> None:
+    deck = Deck([copy.copy(card) for card in STANDARD_DECK])
+    played = deck.deal(5)
+    deck.destroy([deck.cards_remaining[7]])
+    # Shuffling drops the gap from the draw pile and moves the played pile down
+    deck.add([ACE_HEART])
+    assert deck.get_num_remaining() == len(deck.cards_remaining) == len(STANDARD_DECK) - 5
+    remaining = deck.cards_remaining
+    deck.destroy([remaining[3], played[1]])
+    assert deck.cards_remaining == [*remaining[:3], *remaining[4:]]
+    assert list(deck.iter_remaining()) == deck.cards_remaining
+    assert deck.cards_played == [played[0], *played[2:]]
+
+
+@pytest.mark.unit
+def test_card_ids() -> None:
+    deck = Deck([copy.copy(card) for card in STANDARD_DECK])
+    ids = {deck.card_id(card): card for card in deck.cards}
+    deck.deal(10)
+    deck.destroy([deck.cards_played[3]])
+    deck.add([ACE_HEART])
+    deck.reset()
+    assert all(ids[deck.card_id(card)] is card for card in deck.cards if card is not ACE_HEART)
+    assert deck.card_id(ACE_HEART) == len(STANDARD_DECK)
+    assert len(deck.cards_remaining) == len(STANDARD_DECK)
+
+
+@pytest.mark.unit
+def test_journal_undo() -> None:
+    deck = Deck([copy.copy(card) for card in STANDARD_DECK])
+    deck.deal(8)
+    remaining, played = deck.cards_remaining, deck.cards_played
+    journal = Journal()
+    deck._journal = journal
+    mark = journal.mark()
+    deck.destroy(played[:2])
+    deck.deal(3)
+    deck.destroy([deck.cards_remaining[0]])
+    deck.add([ACE_HEART])
+    journal.undo(mark)
+    assert deck.cards_remaining == remaining and deck.cards_played == played
+    assert deck.get_num_remaining() == len(remaining)
+
+
+@pytest.mark.unit
+def test_discard_exact_card() -> None:
+    first, second = PlayingCard(Rank.ACE, Suit.HEARTS), PlayingCard(Rank.ACE, Suit.HEARTS)
+    hand = discard([first, STANDARD_DECK[0], second], [second], [STANDARD_DECK[1]])
+    assert hand[0] is first and hand[1:] == [STANDARD_DECK[0], STANDARD_DECK[1]]
+    # A copy removes the first equal card
+    assert discard([first, second], [copy.copy(second)], [])[0] is second
+    with pytest.raises(ValueError):
+        discard([first], [STANDARD_DECK[0]], [])
@@ -3,8 +3,8 @@ from unittest.mock import Mock
 
 import pytest
 
-from balatro_gym.cards.interfaces import PlayingCard, Rank, SteelCard, Suit
-from balatro_gym.cards.joker.effect_joker import ChaosTheClown, FourFingers, Pareidolia
+from balatro_gym.cards.interfaces import Foil, PlayingCard, Rank, SteelCard, Suit
+from balatro_gym.cards.joker.effect_joker import ChaosTheClown, FourFingers, Mime, OopsAll6s, Pareidolia
 from balatro_gym.cards.joker.joker import (
     AbstractJoker,
     CleverJoker,
@@ -35,8 +35,9 @@ from balatro_gym.cards.joker.joker import (
 from balatro_gym.cards.joker.utils import sample_jokers
 from balatro_gym.cards.utils import get_flush, get_straight, is_royal
 from balatro_gym.constants import DEFAULT_NUM_JOKER_SLOTS
+from balatro_gym.game.scoring import score_hand
 from balatro_gym.game.shop import Shop
-from balatro_gym.interfaces import JokerBase, PokerHandType, Rarity, Type
+from balatro_gym.interfaces import BlindState, JokerBase, JokerEffects, PokerHandType, Rarity, Type
 from test.utils import _make_board, _make_card
 
 
@@ -447,8 +448,7 @@ def test_four_fingers(hand: Sequence[PlayingCard], expected_hand: PokerHandType)
     j = FourFingers()
     assert j.joker_type == Type.EFFECT
 
-    board = Mock()
-    board.jokers = [j]
+    board = _make_board([j])
     flush = get_flush(hand, board)
     straight = get_straight(hand, board)
     royal = is_royal(hand, board)
@@ -464,6 +464,26 @@ def test_four_fingers(hand: Sequence[PlayingCard], expected_hand: PokerHandType)
     assert expected_hand == poker_hand
 
 
+@pytest.mark.unit
+def test_joker_effects() -> None:
+    board = _make_board([Joker(), OopsAll6s(), OopsAll6s()])
+    assert board.joker_effects == JokerEffects(oops_all_6s=2)
+    board.acquire_joker(FourFingers())
+    assert board.joker_effects.four_fingers == 1
+    board.remove_joker(board.jokers[1])
+    assert board.joker_effects == JokerEffects(four_fingers=1, oops_all_6s=1)
+    board.jokers = []
+    assert board.joker_effects == JokerEffects()
+
+    # Effects don't depend on the edition of the joker
+    steel = _make_card(enhancement=SteelCard())
+    blind = BlindState([steel], 300, 0, 4, 3, 3)
+    board.acquire_joker(Mime(Foil()))
+    assert board.joker_effects.mime == 1
+    # High card with an ace and the foil's chips, times the held steel card retriggered
+    assert score_hand([_make_card()], board, blind) == (5 + 11 + 50) * 1.5**2
+
+
 @pytest.mark.unit
 def test_chaos_the_clown() -> None:
     j = ChaosTheClown()
@@ -504,9 +524,9 @@ def test_scary_face() -> None:
     trigger_ranks = [Rank.KING, Rank.QUEEN, Rank.JACK]
     for rank in range(1, 14):
         if Rank.from_int(rank) in trigger_ranks:
-            assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), Mock(jokers=[])) == 30
+            assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), _make_board()) == 30
         else:
-            assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), Mock(jokers=[])) == 0
+            assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), _make_board()) == 0
 
 
 @pytest.mark.unit
@@ -537,16 +557,23 @@ def test_delayed_gratification(num_discards: int, discards_left: int, expected_c
 def test_pareidolia() -> None:
     j = ScaryFace()
     for rank in range(1, 14):
-        assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), Mock(jokers=[Pareidolia()])) == 30
+        assert j.get_chips_card(_make_card(rank=Rank.from_int(rank)), Mock(), _make_board([Pareidolia()])) == 30
 
 
 @pytest.mark.unit
 def test_gros_michel() -> None:
     j = GrosMichel()
-    board = Mock(jokers=[j])
+    board = _make_board([j])
+    assert j.get_mult_hand(Mock(), Mock(), board, Mock()) == 15
+    rng = Mock()
+    rng.random.return_value = 0.1
+    assert j.is_destroyed(rng=rng)
+    rng.random.return_value = 0.5
+    assert not j.is_destroyed(rng=rng)
+
+    # Scoring removes it once it is destroyed
     while len(board.jokers):
-        assert j.get_mult_hand(Mock(), Mock(), board, Mock()) == 15
-    assert len(board.jokers) == 0
+        score_hand([_make_card()], board, BlindState([], 300, 0, 4, 3, 3))
 
 
 @pytest.mark.unit
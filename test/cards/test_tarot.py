@@ -1,3 +1,6 @@
+import copy
+from typing import Union
+
 import pytest
 
 from balatro_gym.cards.interfaces import (
@@ -45,6 +48,7 @@ from balatro_gym.cards.tarot import (
     World,
 )
 from balatro_gym.interfaces import BoardState, PlanetCard, Tarot
+from balatro_gym.journal import Journal
 from test.utils import _make_card
 
 
@@ -259,3 +263,23 @@ def test_judgement() -> None:
         assert board_state.use_consumable(tarot, [])
         assert len(board_state.jokers) == i + 1
     assert not board_state.use_consumable(tarot, [])
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("consumable", [Death(), HangedMan(), Hermit(), Judgement(), Mercury()])
+def test_consumable_journal_undo(consumable: Union[Tarot, PlanetCard]) -> None:
+    board_state = BoardState()
+    board_state.deck.shuffle()
+    board_state.acquire_joker(Joker())
+    cards = board_state.deck.deal(2)
+    expected = copy.deepcopy(board_state)
+    journal = Journal()
+    board_state.set_journal(journal)
+
+    mark = journal.mark()
+    board_state.acquire_consumable(consumable)
+    assert board_state.use_consumable(consumable, cards)
+    assert board_state != expected
+    journal.undo(mark)
+    assert board_state == expected
+    assert list(board_state.deck.cards_played) == cards
@@ -0,0 +1,28 @@
+import itertools
+from math import comb
+
+import pytest
+
+from balatro_gym.constants import MAX_PLAYED_CARDS
+from balatro_gym.game.actions import NUM_SUBSETS, SUBSET_INDICES, SUBSET_MASKS, SUBSET_SIZES, subset_cards
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("hand_size", [1, 5, 8, 10])
+def test_subset_table_prefix(hand_size: int) -> None:
+    expected = {
+        subset
+        for size in range(1, MAX_PLAYED_CARDS + 1)
+        for subset in itertools.combinations(range(hand_size), size)
+    }
+    num_subsets = NUM_SUBSETS[hand_size]
+    assert num_subsets == sum(comb(hand_size, size) for size in range(1, MAX_PLAYED_CARDS + 1))
+    assert {tuple(subset_cards(range(hand_size), i)) for i in range(num_subsets)} == expected
+
+
+@pytest.mark.unit
+def test_subset_table_consistent() -> None:
+    assert NUM_SUBSETS[8] == 218
+    for mask, size, slots in zip(SUBSET_MASKS, SUBSET_SIZES, SUBSET_INDICES):
+        assert sum(1 << int(slot) for slot in slots[:size]) == mask
+        assert (slots[size:] == -1).all()
@@ -0,0 +1,248 @@
+import random
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+
+from balatro_gym.cards.decks import STANDARD_DECK
+from balatro_gym.cards.encoding import EDITIONS, encode_card
+from balatro_gym.cards.interfaces import (
+    BaseEnhancement,
+    BonusCard,
+    Foil,
+    MultCard,
+    Polychrome,
+    Rank,
+    RedSeal,
+    StoneCard,
+    Suit,
+    WildCard,
+)
+from balatro_gym.cards.joker import effect_joker as ejoker
+from balatro_gym.cards.joker import joker
+from balatro_gym.cards.joker.constants import ALL_JOKERS, JOKER_IDS
+from balatro_gym.constants import DEFAULT_START_MONEY
+from balatro_gym.game.batched import POKER_HAND_TYPES, BatchedRun, _score_hands, classify_hands, score_hands
+from balatro_gym.game.engine import BoardAction, GameAction, GameState, HandAction, Run
+from balatro_gym.game.scoring import get_poker_hand, score_hand
+from balatro_gym.interfaces import BlindState
+from test.utils import _make_board, _make_card
+
+
+def _score(hand: list, jokers: list) -> tuple[np.ndarray, np.ndarray]:
+    codes = np.array([[encode_card(card) for card in hand]])
+    played = np.ones_like(codes, dtype=bool)
+    joker_ids = np.array([[JOKER_IDS[type(j)] for j in jokers] + [0] * (5 - len(jokers))])
+    levels = np.ones((1, len(POKER_HAND_TYPES)), dtype=np.int64)
+    scores = _score_hands(codes, played, joker_ids, levels, 5, np.random.default_rng(0))
+    return scores.hand_type, scores.score
+
+
+@pytest.mark.unit
+def test_score_hands_matches_engine() -> None:
+    rng = random.Random(0)
+    for _ in range(500):
+        hand = rng.sample(list(STANDARD_DECK), rng.randint(1, 5))
+        jokers = [j() for j in rng.sample(ALL_JOKERS, rng.randint(0, 5))]
+        board = _make_board(jokers)
+        blind = BlindState([], 300, 0, 4, 3, 3)
+        _, expected_type = get_poker_hand(hand, board)
+
+        hand_type, score = _score(hand, jokers)
+        assert POKER_HAND_TYPES[hand_type[0]] is expected_type
+        assert score[0] == pytest.approx(score_hand(hand, board, blind))
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize("ranks", [[1, 10, 11, 12, 13], [10, 11, 12, 13], [2, 3, 4, 5]])
+def test_score_hands_four_fingers(ranks: list[int]) -> None:
+    hand = [_make_card(Rank.from_int(rank)) for rank in ranks]
+    jokers = [ejoker.FourFingers(), joker.CrazyJoker()]
+    board = _make_board(jokers)
+    _, expected_type = get_poker_hand(hand, board)
+
+    hand_type, score = _score(hand, jokers)
+    assert POKER_HAND_TYPES[hand_type[0]] is expected_type
+    assert score[0] == pytest.approx(score_hand(hand, board, BlindState([], 300, 0, 4, 3, 3)))
+
+
+@pytest.mark.unit
+def test_classify_hands() -> None:
+    rng = random.Random(0)
+    enhancements = [BaseEnhancement, BaseEnhancement, BaseEnhancement, StoneCard, WildCard, BonusCard]
+    hands, four_fingers = [], []
+    for _ in range(2000):
+        # Few ranks and suits, so that sets, straights and flushes all come up
+        hand = [
+            _make_card(
+                Rank.from_int(rng.choice([1, 2, 3, 4, 5, 10, 11, 12, 13])),
+                rng.choice([Suit.HEARTS, Suit.SPADES]),
+                rng.choice(enhancements)(),
+            )
+            for _ in range(rng.randint(1, 5))
+        ]
+        hands.append(hand)
+        four_fingers.append(rng.random() < 0.5)
+    codes = np.zeros((len(hands), 5), dtype=np.int64)
+    for row, hand in enumerate(hands):
+        codes[row, : len(hand)] = [encode_card(card) for card in hand]
+
+    classes = classify_hands(codes, np.array(four_fingers))
+    for row, hand in enumerate(hands):
+        board = _make_board([ejoker.FourFingers()] if four_fingers[row] else [])
+        played, expected_type = get_poker_hand(hand, board)
+        assert POKER_HAND_TYPES[classes.hand_type[row]] is expected_type
+        expected_scored = [any(card is played_card for played_card in played) for card in hand]
+        assert classes.scored[row, : len(hand)].tolist() == expected_scored
+        assert not classes.scored[row, len(hand) :].any()
+    assert len(set(classes.hand_type.tolist())) >= 10
+
+    with pytest.raises(ValueError):
+        classify_hands(np.zeros((1, 6), dtype=np.int64))
+
+
+def _expected_scores(hands: list, jokers: list, levels: np.ndarray) -> tuple[list, list]:
+    hand_types, scores = [], []
+    for hand in hands:
+        board = _make_board(list(jokers))
+        for hand_type, level in zip(POKER_HAND_TYPES, levels.tolist()):
+            board.get_poker_hand(hand_type).level = level
+        hand_types.append(POKER_HAND_TYPES.index(get_poker_hand(hand, board)[1]))
+        scores.append(score_hand(hand, board, BlindState([], 300, 0, 4, 3, 3)))
+    return hand_types, scores
+
+
+@pytest.mark.unit
+def test_score_hands_batch() -> None:
+    rng = random.Random(0)
+    for _ in range(50):
+        jokers = [j(rng.choice(EDITIONS)()) for j in rng.sample(ALL_JOKERS, rng.randint(0, 5))]
+        hands = [rng.sample(list(STANDARD_DECK), rng.randint(1, 5)) for _ in range(8)]
+        levels = np.array([rng.randint(1, 3) for _ in POKER_HAND_TYPES])
+        codes = np.zeros((len(hands), 5), dtype=np.int64)
+        for row, hand in enumerate(hands):
+            codes[row, : len(hand)] = [encode_card(card) for card in hand]
+
+        scores = score_hands(codes, jokers, levels)
+        hand_types, expected = _expected_scores(hands, jokers, levels)
+        assert scores.hand_type.tolist() == hand_types
+        np.testing.assert_allclose(scores.score, expected)
+        assert not scores.destroyed_jokers.any()
+
+
+@pytest.mark.unit
+def test_score_hands_scalar_fallback() -> None:
+    hands = [
+        [_make_card(Rank.KING, enhancement=BonusCard()), _make_card(Rank.KING, Suit.SPADES, edition=Foil())],
+        [_make_card(Rank.TWO, enhancement=MultCard(), seal=RedSeal()), _make_card(Rank.NINE, edition=Polychrome())],
+        [_make_card(Rank.FIVE), _make_card(Rank.FIVE, Suit.CLUBS)],
+    ]
+    codes = np.zeros((len(hands), 5), dtype=np.int64)
+    for row, hand in enumerate(hands):
+        codes[row, : len(hand)] = [encode_card(card) for card in hand]
+    levels = np.ones(len(POKER_HAND_TYPES), dtype=np.int64)
+
+    # Enhanced cards fall back row by row, a joker that reads the deck falls back for every row
+    for jokers in ([joker.JollyJoker(), ejoker.Hack()], [joker.SteelJoker(), joker.Joker()]):
+        scores = score_hands(codes, jokers)
+        hand_types, expected = _expected_scores(hands, jokers, levels)
+        assert scores.hand_type.tolist() == hand_types
+        np.testing.assert_allclose(scores.score, expected)
+
+
+@pytest.mark.unit
+def test_batched_run_reset() -> None:
+    runs = BatchedRun(3, jokers=[joker.Joker], seed=0)
+    assert (runs.round_num == 1).all()
+    assert (runs.ante_num == 1).all()
+    assert (runs.required_score == 300).all()
+    assert (runs.hand != 0).all()
+    assert (runs.joker_ids[:, 0] == JOKER_IDS[joker.Joker]).all()
+    for row in runs.hand:
+        assert len(set(row)) == runs.hand_size
+
+
+@pytest.mark.unit
+def test_batched_run_discard() -> None:
+    runs = BatchedRun(2, seed=0)
+    hand = runs.hand.copy()
+    actions = np.array([[HandAction.DISCARD, 0b11], [HandAction.DISCARD, 0]])
+    scores, done = runs.step(actions)
+
+    assert not done.any()
+    assert (scores == 0).all()
+    np.testing.assert_array_equal(runs.hand[0, :6], hand[0, 2:])
+    assert not np.isin(runs.hand[0, 6:], hand[0]).any()
+    assert runs.num_discards_remaining.tolist() == [2, 3]
+    # An empty selection is ignored, as with `Run.step`
+    np.testing.assert_array_equal(runs.hand[1], hand[1])
+
+
+@pytest.mark.unit
+def test_batched_run_no_discards_remaining() -> None:
+    runs = BatchedRun(1, num_discards=0, seed=0)
+    hand = runs.hand.copy()
+    runs.step(np.array([[HandAction.DISCARD, 0b1]]))
+    np.testing.assert_array_equal(runs.hand, hand)
+
+
+@pytest.mark.unit
+def test_batched_run_win_and_loss() -> None:
+    runs = BatchedRun(2, seed=0)
+    reward = runs.reward[0]
+    deck = runs.deck[0].copy()
+    runs.current_score[0] = runs.required_score[0]
+    runs.num_hands_remaining[1] = 0
+    scores, done = runs.step(np.array([[HandAction.SCORE_HAND, 0b1]] * 2))
+
+    assert (scores > 0).all()
+    assert done.tolist() == [True, True]
+    assert runs.round_num[0] == 2
+    # As with `Run`, the won hand is not refilled and the next round is dealt a fresh hand
+    assert runs.deck_position[0] == 2 * runs.hand_size
+    np.testing.assert_array_equal(runs.hand[0], deck[runs.hand_size : 2 * runs.hand_size])
+    assert runs.money[0] == DEFAULT_START_MONEY + reward
+    assert runs.current_score[0] == 0
+    assert runs.lost.tolist() == [False, True]
+    assert runs.done.tolist() == [False, True]
+
+    # Finished runs ignore actions until they are reset
+    scores, done = runs.step(np.array([[HandAction.SCORE_HAND, 0b1]] * 2))
+    assert scores[1] == 0 and not done[1]
+    runs.reset(np.array([False, True]))
+    assert not runs.done.any()
+    assert runs.round_num.tolist() == [2, 1]
+
+
+@pytest.mark.unit
+def test_batched_run_deck_exhaustion() -> None:
+    # Plays the strategy of `test_deck_exhaustion` in test_engine on both engines: discard as many cards as possible,
+    # then play until the last hand, which wins the blind
+    run, runs = Run(seed=0), BatchedRun(1, seed=0)
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    done = False
+    with patch("balatro_gym.game.engine.score_hand", lambda x, y, z: z.required_score * (z.num_hands_remaining == 0)):
+        while not runs.done[0]:
+            blind = run.blind_state
+            assert blind is not None and not done
+            action = HandAction.DISCARD if blind.num_discards_remaining > 0 else HandAction.SCORE_HAND
+            mask = (1 << min(5, len(blind.hand))) - 1
+            runs.required_score[0] = np.inf
+            if action == HandAction.SCORE_HAND and runs.num_hands_remaining[0] == 0:
+                runs.current_score[0] = runs.required_score[0] = 1
+            done = run.step(GameAction(action, selected_mask=mask)).done
+            _, round_over = runs.step(np.array([[action, mask]]))
+            assert round_over[0] == done
+            if run.game_state is GameState.GENERATE_SHOP:
+                run.step(GameAction(BoardAction.VIEW_SHOP, []))
+                run.step(GameAction(BoardAction.NEXT_ROUND, []))
+                done = run.step(GameAction(BoardAction.START_ROUND, [])).done
+            assert run.blind_state is not None
+            assert np.count_nonzero(runs.hand[0]) == len(run.blind_state.hand)
+            assert runs.deck_position[0] == len(STANDARD_DECK) - run.board_state.deck.get_num_remaining()
+            assert runs.round_num[0] == run.board_state.round_num
+
+    # A later blind of the ante runs out of cards and is lost
+    assert done and run.game_state is GameState.IN_ANTE
+    assert runs.lost[0] and runs.round_num[0] == 2
+    assert not runs.hand[0].any()
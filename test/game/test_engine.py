@@ -3,8 +3,13 @@ from unittest.mock import patch
 
 import pytest
 
-from balatro_gym.game.engine import BoardAction, GameAction, GameState, HandAction, Run
-from balatro_gym.interfaces import BoardState
+from balatro_gym.cards.interfaces import GlassCard
+from balatro_gym.cards.joker import joker
+from balatro_gym.game import engine, scoring
+from balatro_gym.game.actions import SUBSET_MASKS, subset_cards
+from balatro_gym.game.engine import HAND_ACTIONS, BoardAction, GameAction, GameState, HandAction, Run
+from balatro_gym.game.observation import ObservationEncoder
+from balatro_gym.interfaces import BoardState, PokerHandType
 
 
 @pytest.mark.unit
@@ -73,6 +78,32 @@ def test_process_hand_action_discard() -> None:
     assert old_blind_state == run.blind_state
 
 
+@pytest.mark.unit
+def test_deck_exhaustion() -> None:
+    run = Run(seed=0)
+    deck = run.board_state.deck
+    # Scores nothing until the last hand, which wins the blind, so every blind uses as many cards as it can
+    with patch("balatro_gym.game.engine.score_hand", lambda x, y, z: z.required_score * (z.num_hands_remaining == 0)):
+        while run.game_state is GameState.IN_BLIND_SELECT:
+            assert run.board_state.round_num < 3
+            done = run.step(GameAction(BoardAction.START_ROUND, [])).done
+            while not done:
+                assert run.blind_state is not None
+                action = HandAction.DISCARD if run.blind_state.num_discards_remaining > 0 else HandAction.SCORE_HAND
+                mask = run.legal_hand_actions()
+                subset = int(mask[HAND_ACTIONS.index(action)].nonzero()[0][-1])
+                done = run.step(GameAction.from_subset(action, subset)).done
+            if run.game_state is GameState.GENERATE_SHOP:
+                run.step(GameAction(BoardAction.VIEW_SHOP, []))
+                run.step(GameAction(BoardAction.NEXT_ROUND, []))
+
+    # A later blind of the ante runs out of cards and is lost
+    assert run.board_state.round_num == 2 and run.game_state is GameState.IN_ANTE
+    assert run.blind_state is not None and run.blind_state.hand == []
+    assert deck.get_num_remaining() == 0
+    assert not run.legal_hand_actions().any()
+
+
 @pytest.mark.unit
 def test_setup_ante() -> None:
     run = Run()
@@ -89,3 +120,246 @@ def test_setup_round() -> None:
     run._setup_round()
     assert run.board_state.round_num == 1
     assert run.blind_state is not None
+
+
+def _play_blind(run: Run) -> None:
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    while run.blind_state is not None:
+        run.step(GameAction(HandAction.SCORE_HAND, run.blind_state.hand[:5]))
+        if run.game_state is not GameState.IN_ANTE:
+            break
+    run.step(GameAction(BoardAction.VIEW_SHOP, []))
+    run.step(GameAction(BoardAction.NEXT_ROUND, []))
+
+
+@pytest.mark.unit
+def test_snapshot_restore() -> None:
+    run = Run()
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    assert run.blind_state
+    run.step(GameAction(HandAction.DISCARD, run.blind_state.hand[:2]))
+    snapshot = run.snapshot()
+    expected = copy.deepcopy(run)
+    card = run.blind_state.hand[0]
+    enhancement = card.enhancement
+
+    card.set_enhancement(GlassCard())
+    run.board_state.money += 10
+    run.board_state.get_poker_hand(PokerHandType.PAIR).level += 1
+    for _ in range(3):
+        _play_blind(run)
+    branch = copy.deepcopy(run)
+
+    run.restore(snapshot)
+    assert run.game_state == expected.game_state
+    assert run.action_counter == expected.action_counter
+    assert run.board_state == expected.board_state
+    assert run.blind_state == expected.blind_state
+    assert run.shop_state == expected.shop_state
+    assert run.blind_state is not None and run.blind_state.hand[0] is card
+    assert card.enhancement is enhancement
+
+    # The random state is restored too, so replaying the same actions gives the same run
+    card.set_enhancement(GlassCard())
+    run.board_state.money += 10
+    run.board_state.get_poker_hand(PokerHandType.PAIR).level += 1
+    for _ in range(3):
+        _play_blind(run)
+    assert run.board_state == branch.board_state
+    assert run.shop_state is not None and branch.shop_state is not None
+    assert [type(c) for c in run.shop_state.buyable_cards] == [type(c) for c in branch.shop_state.buyable_cards]
+
+    # A snapshot can be restored more than once
+    run.restore(snapshot)
+    assert run.board_state == expected.board_state
+
+
+def _shop_types(run: Run) -> list[list[type]]:
+    assert run.shop_state is not None
+    return [[type(c) for c in cards] for cards in (run.shop_state.buyable_cards, run.shop_state.booster_packs)]
+
+
+@pytest.mark.unit
+def test_snapshot_restore_after_reset() -> None:
+    run = Run(seed=0)
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    snapshot = run.snapshot()
+    branch = copy.deepcopy(run)
+    for r in (run, branch):
+        for _ in range(3):
+            _play_blind(r)
+    shops = _shop_types(branch)
+
+    # Resetting replaces the board and the shop along with their random streams
+    run.game_reset()
+    run.restore(snapshot)
+    assert run._shop._rng is run.board_state.rng.shop
+    for _ in range(3):
+        _play_blind(run)
+    assert run.board_state == branch.board_state
+    assert _shop_types(run) == shops
+
+    # The seed sequence is restored too, so later resets start the same runs
+    run.game_reset()
+    branch.game_reset()
+    assert run.board_state.rng.get_state() == branch.board_state.rng.get_state()
+
+
+@pytest.mark.unit
+def test_journal_undo() -> None:
+    run = Run()
+    with pytest.raises(RuntimeError):
+        run.mark()
+    run.enable_journal()
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    expected = copy.deepcopy(run)
+    mark = run.mark()
+
+    assert run.blind_state
+    run.step(GameAction(HandAction.DISCARD, run.blind_state.hand[:3]))
+    inner_mark = run.mark()
+    for _ in range(4):
+        _play_blind(run)
+    assert run.board_state.round_num == 4
+
+    run.undo(inner_mark)
+    assert run.board_state.round_num == 1
+    assert run.blind_state is not None and run.blind_state.num_discards_remaining == 2
+
+    run.undo(mark)
+    assert run.game_state == expected.game_state
+    assert run.action_counter == expected.action_counter
+    assert run.board_state == expected.board_state
+    assert run.blind_state == expected.blind_state
+    assert run.shop_state is None
+
+    run.game_reset()
+    run.undo(mark)
+    assert run.board_state == expected.board_state
+
+
+@pytest.mark.unit
+def test_seeded_runs_are_reproducible() -> None:
+    runs = [Run(seed=1), Run(seed=1), Run()]
+    runs[2].game_reset(seed=1)
+    for run in runs:
+        run.board_state.deck.reset()
+        _play_blind(run)
+    for run in runs[1:]:
+        assert run.board_state == runs[0].board_state
+        assert run.board_state.deck.cards_remaining == runs[0].board_state.deck.cards_remaining
+        assert run.shop_state is not None and runs[0].shop_state is not None
+        assert [type(c) for c in run.shop_state.buyable_cards] == [type(c) for c in runs[0].shop_state.buyable_cards]
+
+
+@pytest.mark.unit
+def test_random_streams_are_independent() -> None:
+    run, other = Run(seed=2), Run(seed=2)
+    # Drawing from the shop stream does not change the deck order
+    other.rng.shop.random(10)
+    run.board_state.deck.shuffle()
+    other.board_state.deck.shuffle()
+    assert run.board_state.deck.cards_remaining == other.board_state.deck.cards_remaining
+
+
+@pytest.mark.unit
+def test_legal_hand_actions() -> None:
+    run = Run()
+    discard_row, score_row = HAND_ACTIONS.index(HandAction.DISCARD), HAND_ACTIONS.index(HandAction.SCORE_HAND)
+    assert not run.legal_hand_actions().any()
+
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    assert run.blind_state is not None
+    mask = run.legal_hand_actions()
+    assert mask.shape == (len(HAND_ACTIONS), len(SUBSET_MASKS))
+    assert mask.sum(axis=1).tolist() == [218, 218]
+    assert not mask[:, 218:].any()
+
+    # A smaller hand only allows the subsets of its cards
+    run.blind_state.hand = run.blind_state.hand[:3]
+    run.blind_state.num_discards_remaining = 0
+    run.legal_hand_actions(out=mask)
+    assert not mask[discard_row].any()
+    assert mask[score_row].nonzero()[0].tolist() == list(range(7))
+    assert {card for i in range(7) for card in subset_cards(run.blind_state.hand, i)} == set(run.blind_state.hand)
+
+    run.blind_state.num_hands_remaining = -1
+    assert not run.legal_hand_actions().any()
+
+
+@pytest.mark.unit
+def test_hand_action_by_mask() -> None:
+    run = Run()
+    run.step(GameAction(BoardAction.START_ROUND, []))
+    assert run.blind_state is not None
+    hand = list(run.blind_state.hand)
+    # Equal cards are told apart by their slot
+    hand[2] = copy.copy(hand[0])
+    run.blind_state.hand = hand
+    run.step(GameAction(HandAction.DISCARD, selected_mask=0b101))
+    assert run.blind_state.hand[:6] == [hand[1], *hand[3:]]
+    assert run.blind_state.hand[0] is hand[1]
+    assert len(run.blind_state.hand) == 8
+    assert run.blind_state.num_discards_remaining == 2
+
+    # An empty selection is ignored
+    run.step(GameAction(HandAction.DISCARD, selected_mask=0))
+    assert run.blind_state.num_discards_remaining == 2
+
+    hand = list(run.blind_state.hand)
+    run.step(GameAction.from_subset(HandAction.SCORE_HAND, 2))
+    assert run.blind_state.current_score > 0
+    assert run.blind_state.hand[:6] == hand[2:]
+
+
+@pytest.mark.unit
+def test_step_into() -> None:
+    run = Run(seed=0)
+    encoder = ObservationEncoder()
+    buffers = dict(encoder.buffers)
+    done, score = run.step_into(GameAction(BoardAction.START_ROUND, []), encoder)
+    assert not done and score == 0
+    blind = run.blind_state
+    assert blind is not None
+    hand = encoder.buffers["hand"].copy()
+    assert encoder.buffers["hand_mask"].sum() == len(blind.hand)
+
+    blind.required_score = 10**9
+    done, score = run.step_into(GameAction(HandAction.SCORE_HAND, selected_mask=0b11111), encoder)
+    assert score > 0 and score == blind.current_score
+    assert encoder.buffers["blind"][1] == score
+    assert not (encoder.buffers["hand"] == hand).all()
+    # The buffers are filled in place
+    assert all(encoder.buffers[key] is buffer for key, buffer in buffers.items())
+
+
+@pytest.mark.unit
+def test_profiling() -> None:
+    run = Run(seed=0)
+    assert run.profile == {}
+    profiler = run.enable_profiling()
+    with pytest.raises(RuntimeError):
+        Run().enable_profiling()
+    try:
+        run.board_state.jokers = [joker.Joker(), joker.CrazyJoker()]
+        _play_blind(run)
+        profile = run.profile
+    finally:
+        run.disable_profiling()
+
+    num_hands = profile["score_hand"]["calls"]
+    assert num_hands > 0
+    assert profile["Run._process_hand_action"]["calls"] == num_hands
+    assert profile["get_poker_hand"]["calls"] == num_hands
+    assert profile["Joker.get_mult_hand"]["calls"] == num_hands
+    # The scoring plan never calls the no-op defaults
+    assert "JokerBase.get_chips_card" not in profile
+    assert profile["Shop.generate_shop_state"]["calls"] == 1
+    assert profile["score_hand"]["seconds"] >= profile["get_poker_hand"]["seconds"]
+
+    # Disabling puts the original functions back
+    assert engine.score_hand is scoring.score_hand
+    assert run.profile == {}
+    assert profiler.stats() == profile
+    _play_blind(run)
+    assert profiler.stats() == profile
@@ -1,11 +1,19 @@
+import random
 from typing import Sequence
 from unittest.mock import Mock
 
 import pytest
 
+from balatro_gym.cards.decks import STANDARD_DECK
 from balatro_gym.cards.interfaces import (
+    BaseEdition,
+    BaseEnhancement,
+    BonusCard,
+    Deck,
+    Foil,
     GlassCard,
     Holographic,
+    LuckyCard,
     MultCard,
     PlayingCard,
     Polychrome,
@@ -16,10 +24,29 @@ from balatro_gym.cards.interfaces import (
     Suit,
     WildCard,
 )
-from balatro_gym.cards.joker.effect_joker import Hack
-from balatro_gym.cards.joker.joker import Joker, JollyJoker
-from balatro_gym.game.scoring import _extract_largest_set, _get_max_rank, get_poker_hand, score_hand
-from balatro_gym.interfaces import BlindState, JokerBase, PokerHandType
+from balatro_gym.cards.joker.constants import ALL_JOKERS
+from balatro_gym.cards.joker.effect_joker import FourFingers, Hack, Mime
+from balatro_gym.cards.joker.joker import Fibonacci, GrosMichel, Joker, JollyJoker
+from balatro_gym.game.actions import subset_cards
+from balatro_gym.game.scoring import (
+    HAND_CACHE,
+    POKER_HAND_TYPES,
+    DestroyCard,
+    DestroyJoker,
+    HandCache,
+    _extract_largest_set,
+    _get_max_rank,
+    commit_score,
+    expected_score,
+    get_poker_hand,
+    preview_score,
+    score_all_subsets,
+    score_distribution,
+    score_hand,
+)
+from balatro_gym.interfaces import BlindState, BoardState, JokerBase, PokerHandType
+from balatro_gym.journal import Journal
+from balatro_gym.rng import RandomStreams
 from test.utils import _make_board, _make_card
 
 STRAIGHT_FLUSH = [PlayingCard(i, Suit.HEARTS) for i in range(1, 6)]
@@ -111,6 +138,34 @@ def test_hand_types(hand: Sequence[PlayingCard], expected_hand_type: PokerHandTy
     assert hand_type == expected_hand_type
 
 
+@pytest.mark.unit
+@pytest.mark.parametrize(
+    "hand,expected_hand_type",
+    [
+        [STRAIGHT_FLUSH[:4], PokerHandType.STRAIGHT_FLUSH],
+        [ROYAL_FLUSH[:4], PokerHandType.ROYAL_FLUSH],
+        [[*STRAIGHT[:3], STRAIGHT[4]], PokerHandType.HIGH_CARD],
+        [FLUSH[:4], PokerHandType.FLUSH],
+        [[*FLUSH[:3], PlayingCard(2, Suit.HEARTS, WildCard())], PokerHandType.FLUSH],
+        [FLUSH[:3], PokerHandType.HIGH_CARD],
+    ],
+)
+def test_hand_types_four_fingers(hand: Sequence[PlayingCard], expected_hand_type: PokerHandType) -> None:
+    _, hand_type = get_poker_hand(hand, _make_board([FourFingers()]))
+    assert hand_type == expected_hand_type
+
+
+@pytest.mark.unit
+def test_hand_types_stone_card() -> None:
+    stone = PlayingCard(9, Suit.CLUBS, StoneCard())
+    # Stone cards have no suit, but are always scored
+    played, hand_type = get_poker_hand([*PAIR[:2], stone], _make_board())
+    assert hand_type == PokerHandType.PAIR
+    assert played[0] is stone
+    _, hand_type = get_poker_hand([*FLUSH[:4], stone], _make_board())
+    assert hand_type == PokerHandType.HIGH_CARD
+
+
 @pytest.mark.unit
 @pytest.mark.parametrize(
     "hand,expected_val",
@@ -246,3 +301,190 @@ def test_score_hand(
     blind = Mock(BlindState)
     blind.hand = remaining_hand
     assert score_hand(played_hand, board, blind) == expected
+
+
+@pytest.mark.unit
+def test_score_hand_held_cards() -> None:
+    steel = _make_card(enhancement=SteelCard())
+    aces = [_make_card(rank=Rank.ACE), _make_card(rank=Rank.ACE, suit=Suit.SPADES)]
+    # The held steel card triggers once per hand rather than once per played card
+    assert score_hand(aces, _make_board(), BlindState([*aces, steel], 300, 0, 4, 3, 3)) == (10 + 11 + 11) * 2 * 1.5
+    # Played cards are not held, even while they are still part of the hand
+    assert score_hand([steel], _make_board(), BlindState([steel, aces[0]], 300, 0, 4, 3, 3)) == (5 + 11) * 1.5
+
+
+@pytest.mark.unit
+def test_scoring_plan() -> None:
+    joker, fibonacci, mime, gros_michel = Joker(), Fibonacci(), Mime(), GrosMichel()
+    board = _make_board([joker, fibonacci, mime])
+    plan = board.scoring_plan
+    assert plan.card_chips == ()
+    assert plan.card_mult == (fibonacci,)
+    # Mime has no hand hook and a base edition, so the hand phase skips it
+    assert [step.joker for step in plan.hand] == [joker]
+    assert plan.destroyable == ()
+    assert board.scoring_plan is plan
+
+    # Changing an edition in place takes effect once the board is told
+    mime.set_edition(Foil())
+    assert board.scoring_plan is plan
+    board.jokers_changed()
+    plan = board.scoring_plan
+    assert [(step.joker, step.edition_chips) for step in plan.hand] == [(joker, 0), (mime, 50)]
+
+    board.acquire_joker(gros_michel)
+    assert board.scoring_plan.destroyable == (gros_michel,)
+    board.jokers = board.jokers[::-1]
+    assert [step.joker for step in board.scoring_plan.hand] == [gros_michel, mime, joker]
+    journal = Journal()
+    board.set_journal(journal)
+    board.remove_joker(mime)
+    assert [step.joker for step in board.scoring_plan.hand] == [gros_michel, joker]
+    # Undoing restores the lineup and drops the plan compiled without Mime
+    journal.undo(0)
+    assert [step.joker for step in board.scoring_plan.hand] == [gros_michel, mime, joker]
+
+
+@pytest.mark.unit
+def test_score_all_subsets() -> None:
+    rng = random.Random(0)
+    enhancements = [BaseEnhancement(), BaseEnhancement(), MultCard(), SteelCard(), StoneCard(), WildCard(), BonusCard()]
+    editions = [BaseEdition(), BaseEdition(), BaseEdition(), Holographic(), Polychrome(), Foil()]
+    for _ in range(10):
+        hand = [
+            PlayingCard(card.rank, card.base_suit, rng.choice(enhancements), rng.choice(editions))
+            for card in rng.sample(list(STANDARD_DECK), 8)
+        ]
+        jokers = [j() for j in rng.sample(ALL_JOKERS, rng.randint(0, 5))]
+        board = _make_board(list(jokers))
+        blind = BlindState(hand, 300, 0, 4, 3, 3)
+        random_state = board.rng.get_state()
+
+        scores, hand_types = score_all_subsets(board, blind)
+        assert len(scores) == len(hand_types) == 218
+        assert board.jokers == jokers
+        assert board.rng.get_state() == random_state
+        for subset in range(len(scores)):
+            cards = subset_cards(hand, subset)
+            board.jokers = list(jokers)
+            assert POKER_HAND_TYPES[hand_types[subset]] is get_poker_hand(cards, board)[1]
+            assert scores[subset] == pytest.approx(score_hand(cards, board, blind))
+
+
+@pytest.mark.unit
+def test_score_all_subsets_expected_score() -> None:
+    lucky = _make_card(rank=Rank.TWO, enhancement=LuckyCard())
+    blind = BlindState([lucky], 300, 0, 4, 3, 3)
+    scores, _ = score_all_subsets(_make_board(), blind)
+    # High card of 5 chips and 1 mult, plus a 1 in 5 chance of 20 mult
+    assert scores.tolist() == [pytest.approx((5 + 2) * (1 + 20 / 5))]
+
+
+@pytest.mark.unit
+def test_score_distribution() -> None:
+    lucky = _make_card(rank=Rank.TWO, enhancement=LuckyCard())
+    distribution = score_distribution([lucky], _make_board(), BlindState([lucky], 300, 0, 4, 3, 3))
+    assert distribution.scores.tolist() == [7, 7 * 21]
+    assert distribution.probabilities.tolist() == pytest.approx([0.8, 0.2])
+
+    # Each trigger of a red seal draws again
+    lucky = _make_card(rank=Rank.TWO, enhancement=LuckyCard(), seal=RedSeal())
+    distribution = score_distribution([lucky], _make_board(), BlindState([lucky], 300, 0, 4, 3, 3))
+    assert distribution.scores.tolist() == [9, 9 * 21, 9 * 41]
+    assert distribution.probabilities.tolist() == pytest.approx([0.64, 0.32, 0.04])
+    assert distribution.mean == pytest.approx(9 * (1 + 2 * 20 / 5))
+    assert distribution.variance == pytest.approx(81 * 2 * 400 * 0.2 * 0.8)
+
+
+@pytest.mark.unit
+def test_score_distribution_mean() -> None:
+    hand = [
+        _make_card(rank=Rank.KING, enhancement=LuckyCard(), edition=Polychrome()),
+        _make_card(rank=Rank.KING, suit=Suit.SPADES, enhancement=LuckyCard(), seal=RedSeal()),
+        _make_card(rank=Rank.KING, suit=Suit.CLUBS, enhancement=GlassCard()),
+        _make_card(rank=Rank.TWO, enhancement=LuckyCard()),
+    ]
+    board = _make_board([Joker(), GrosMichel(), Fibonacci()])
+    blind = BlindState(list(hand), 300, 0, 4, 3, 3)
+    state = board.rng.get_state()
+    distribution = score_distribution(hand, board, blind)
+    assert distribution.probabilities.sum() == pytest.approx(1)
+    assert distribution.mean == pytest.approx(expected_score(hand, board, blind))
+    scores, _ = score_all_subsets(board, blind)
+    assert distribution.mean == pytest.approx(scores[-1])
+    # Nothing is drawn or destroyed
+    assert board.rng.get_state() == state
+    assert len(board.jokers) == 3
+
+
+def _make_played_board(seed: int) -> tuple[BoardState, list[PlayingCard]]:
+    hand = [
+        _make_card(rank=Rank.KING, enhancement=GlassCard()),
+        _make_card(rank=Rank.KING, suit=Suit.SPADES, enhancement=LuckyCard()),
+    ]
+    board = BoardState(RandomStreams.from_seed(seed))
+    board.jokers = [GrosMichel(), Joker()]
+    board.deck = Deck(hand[::-1])
+    board.deck.deal(len(hand))
+    return board, hand
+
+
+@pytest.mark.unit
+def test_preview_score() -> None:
+    destroyed: set[type] = set()
+    for seed in range(20):
+        board, hand = _make_played_board(seed)
+        blind = BlindState(list(hand), 300, 0, 4, 3, 3)
+        state = board.rng.get_state()
+        preview = preview_score(hand, board, blind)
+        assert board.rng.get_state() == state
+        assert len(board.jokers) == 2
+        assert board.deck.get_num_remaining() == 0 and len(board.deck.cards_played) == 2
+        commit_score(preview, board)
+
+        twin, twin_hand = _make_played_board(seed)
+        assert score_hand(twin_hand, twin, BlindState(list(twin_hand), 300, 0, 4, 3, 3)) == preview.score
+        assert board.rng.get_state() == twin.rng.get_state()
+        assert [type(joker) for joker in board.jokers] == [type(joker) for joker in twin.jokers]
+        assert len(board.deck.cards_played) == len(twin.deck.cards_played)
+        destroyed.update(type(effect) for effect in preview.effects)
+    assert destroyed == {DestroyCard, DestroyJoker}
+
+
+@pytest.mark.unit
+def test_hand_cache() -> None:
+    def make_hand() -> list[PlayingCard]:
+        return [
+            _make_card(rank=Rank.KING),
+            _make_card(rank=Rank.KING, suit=Suit.SPADES, edition=Foil()),
+            _make_card(rank=Rank.TWO, enhancement=StoneCard()),
+        ]
+
+    cache = HandCache(maxsize=2)
+    hand = make_hand()
+    played, hand_type = cache.get_poker_hand(hand, four_fingers=False)
+    assert hand_type == PokerHandType.PAIR and cache.info() == (0, 1, 2, 1)
+    # Equal cards hit the entry, which gives back the cards of the new hand
+    other = make_hand()
+    cached, cached_type = cache.get_poker_hand(other, four_fingers=False)
+    assert cached_type == hand_type and cache.info() == (1, 1, 2, 1)
+    assert [other.index(card) for card in cached] == [hand.index(card) for card in played]
+    assert all(any(card is other_card for other_card in other) for card in cached)
+
+    cache.get_poker_hand(hand, four_fingers=True)
+    cache.get_poker_hand(hand[:2], four_fingers=False)
+    assert cache.info() == (1, 3, 2, 2)
+    # The least recently used entry was evicted
+    cache.get_poker_hand(hand, four_fingers=False)
+    assert cache.info() == (1, 4, 2, 2)
+
+    cache.maxsize = 0
+    assert cache.info() == (1, 4, 0, 0)
+    assert cache.get_poker_hand(hand, four_fingers=False)[1] == hand_type
+    cache.clear()
+    assert cache.info() == (0, 0, 0, 0)
+
+    hits = HAND_CACHE.hits
+    get_poker_hand(hand, _make_board())
+    get_poker_hand(other, _make_board())
+    assert HAND_CACHE.hits > hits
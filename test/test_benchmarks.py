@@ -0,0 +1,35 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from benchmarks.run import BENCHMARKS, compare, main, run_benchmarks
+
+
+@pytest.mark.unit
+def test_benchmarks_run() -> None:
+    results = run_benchmarks(list(BENCHMARKS), repeats=1, scale=0.01)
+    assert results.keys() == BENCHMARKS.keys()
+    assert all(rate > 0 for rate in results.values())
+
+
+@pytest.mark.unit
+def test_compare() -> None:
+    baseline = {"a": 100.0, "b": 100.0}
+    assert compare({"a": 85.0, "b": 75.0, "c": 1.0}, baseline, threshold=0.2) == ["b"]
+
+
+@pytest.mark.unit
+def test_main_baseline(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    args = ["deck_deal", "--baseline", str(baseline), "--repeats", "1", "--scale", "0.01"]
+    assert main([*args, "--update-baseline"]) == 0
+    assert json.loads(baseline.read_text())["results"].keys() == {"deck_deal"}
+    # Updating other benchmarks keeps the baseline of deck_deal
+    assert main(["deck_shuffle", *args[1:], "--update-baseline"]) == 0
+    assert json.loads(baseline.read_text())["results"].keys() == {"deck_deal", "deck_shuffle"}
+
+    data = json.loads(baseline.read_text())
+    data["results"]["deck_deal"] = 1e12
+    baseline.write_text(json.dumps(data))
+    assert main(args) == 1
@@ -0,0 +1,113 @@
+import gymnasium as gym
+import numpy as np
+import pytest
+from gymnasium.utils.env_checker import check_env
+
+from balatro_gym.cards.encoding import SUIT_INDEX
+from balatro_gym.env import ACTION_TYPES, BalatroEnv
+from balatro_gym.game.actions import SUBSET_INDICES, SUBSET_MASKS, SUBSET_SIZES
+from balatro_gym.game.engine import HAND_ACTIONS, BoardAction, GameState, HandAction, Run
+from balatro_gym.game.observation import GAME_STATE_INDEX
+
+
+def _action(action_type: object, selected: list[int] = []) -> dict:
+    mask = np.zeros(10, dtype=np.int8)
+    mask[selected] = 1
+    # HandAction and BoardAction values overlap, so look the action type up by identity
+    action_index = next(i for i, a in enumerate(ACTION_TYPES) if a is action_type)
+    return {"action_type": action_index, "selected": mask}
+
+
+_BOARD_ACTIONS = {GameState.IN_BLIND_SELECT: BoardAction.START_ROUND, GameState.GENERATE_SHOP: BoardAction.VIEW_SHOP}
+
+
+def _random_legal_action(run: Run, rng: np.random.Generator) -> dict:
+    """A hand action picked uniformly from `Run.legal_hand_actions` in a blind, otherwise the next board action."""
+    if run.game_state is not GameState.IN_ANTE:
+        return _action(_BOARD_ACTIONS.get(run.game_state, BoardAction.NEXT_ROUND))
+    row, subset = divmod(int(rng.choice(np.flatnonzero(run.legal_hand_actions()))), len(SUBSET_MASKS))
+    return _action(HAND_ACTIONS[row], SUBSET_INDICES[subset, : SUBSET_SIZES[subset]].tolist())
+
+
+@pytest.mark.unit
+def test_check_env() -> None:
+    check_env(BalatroEnv(max_steps=50, copy_observations=True), skip_render_check=True)
+
+
+@pytest.mark.unit
+def test_make() -> None:
+    env = gym.make("balatro_gym/Balatro-v0")
+    obs, _ = env.reset(seed=0)
+    assert obs in env.observation_space
+
+
+@pytest.mark.unit
+def test_observation_buffers_reused() -> None:
+    env = BalatroEnv()
+    obs, _ = env.reset(seed=0)
+    hand_buffer = obs["hand"]
+    assert obs["game_state"][GAME_STATE_INDEX[GameState.IN_BLIND_SELECT]] == 1
+    assert obs["hand_mask"].sum() == 0
+    assert obs in env.observation_space
+
+    obs, reward, terminated, truncated, _ = env.step(_action(BoardAction.START_ROUND))
+    assert obs["hand"] is hand_buffer
+    assert obs["game_state"][GAME_STATE_INDEX[GameState.IN_ANTE]] == 1
+    assert obs["hand_mask"].sum() == env.run.board_state.hand_size
+    assert obs["deck"].sum() == env.run.board_state.deck.get_num_remaining()
+    assert not terminated and not truncated
+    assert reward == 0
+
+
+@pytest.mark.unit
+def test_encode_cards() -> None:
+    env = BalatroEnv()
+    env.reset(seed=0)
+    env.step(_action(BoardAction.START_ROUND))
+    deck = env.run.board_state.deck
+    # Destroying a card leaves a gap in the draw pile, which is skipped
+    deck.destroy([deck.cards_remaining[5]])
+    obs, _, _, _, _ = env.step(_action(HandAction.DISCARD, [0]))
+    expected = np.zeros_like(obs["deck"])
+    for card in deck.cards_remaining:
+        expected[SUIT_INDEX[card.base_suit], card.rank.value.order - 1] += 1
+    np.testing.assert_array_equal(obs["deck"], expected)
+
+    assert env.run.blind_state is not None
+    hand = env.run.blind_state.hand
+    assert obs["hand"][:, 0].tolist() == [card.rank.value.order for card in hand] + [0] * (10 - len(hand))
+    assert obs["hand"][:, 5].tolist() == [card.rank.value.value for card in hand] + [0] * (10 - len(hand))
+
+
+@pytest.mark.unit
+def test_step_hand_actions() -> None:
+    env = BalatroEnv()
+    env.reset(seed=0)
+    env.step(_action(BoardAction.START_ROUND))
+    assert env.run.blind_state is not None
+    hand = list(env.run.blind_state.hand)
+
+    obs, reward, _, _, _ = env.step(_action(HandAction.DISCARD, [0, 1]))
+    assert reward == 0
+    assert env.run.blind_state.num_discards_remaining == env.run.board_state.num_discards - 1
+    assert list(env.run.blind_state.hand[:-2]) == hand[2:]
+
+    obs, reward, _, _, _ = env.step(_action(HandAction.SCORE_HAND, [0]))
+    assert float(reward) > 0
+    assert obs["blind"][1] == env.run.blind_state.current_score
+
+
+@pytest.mark.unit
+def test_random_legal_actions() -> None:
+    # Random plays and discards often run the deck out before the ante ends, which must not raise
+    env = BalatroEnv()
+    rng = np.random.default_rng(0)
+    num_exhausted = 0
+    for seed in range(8):
+        env.reset(seed=seed)
+        terminated = truncated = False
+        while not terminated and not truncated:
+            obs, _, terminated, truncated, _ = env.step(_random_legal_action(env.run, rng))
+            assert obs in env.observation_space
+        num_exhausted += env.run.board_state.deck.get_num_remaining() == 0
+    assert num_exhausted > 0
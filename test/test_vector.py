@@ -0,0 +1,100 @@
+from typing import SupportsFloat
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+from balatro_gym.env import BalatroEnv
+from balatro_gym.game.engine import BoardAction, GameState
+from balatro_gym.game.observation import GAME_STATE_INDEX
+from balatro_gym.vector import SharedMemoryVectorEnv
+from test.test_env import _action, _random_legal_action
+
+
+def _batch(actions: list[dict]) -> dict:
+    return {key: np.stack([action[key] for action in actions]) for key in actions[0]}
+
+
+@pytest.mark.unit
+def test_matches_single_envs() -> None:
+    envs = SharedMemoryVectorEnv(3, num_workers=2)
+    try:
+        obs, _ = envs.reset(seed=0)
+        assert obs in envs.observation_space
+        obs, rewards, terminations, truncations, _ = envs.step(_batch([_action(BoardAction.START_ROUND)] * 3))
+        assert not terminations.any() and not truncations.any()
+        assert (rewards == 0).all()
+
+        for i in range(3):
+            env = BalatroEnv()
+            env.reset(seed=i)
+            expected, _, _, _, _ = env.step(_action(BoardAction.START_ROUND))
+            for key, value in expected.items():
+                np.testing.assert_array_equal(obs[key][i], value)
+    finally:
+        envs.close()
+
+
+@pytest.mark.unit
+def test_autoreset_next_step() -> None:
+    envs = SharedMemoryVectorEnv(2, num_workers=2, max_steps=1)
+    try:
+        envs.reset(seed=0)
+        actions = _batch([_action(BoardAction.START_ROUND)] * 2)
+        obs, _, _, truncations, _ = envs.step(actions)
+        assert truncations.all()
+        assert (obs["game_state"][:, GAME_STATE_INDEX[GameState.IN_ANTE]] == 1).all()
+
+        obs, rewards, _, truncations, _ = envs.step(actions)
+        assert not truncations.any()
+        assert (rewards == 0).all()
+        assert (obs["game_state"][:, GAME_STATE_INDEX[GameState.IN_BLIND_SELECT]] == 1).all()
+    finally:
+        envs.close()
+
+
+@pytest.mark.unit
+def test_random_legal_actions() -> None:
+    # Drives the vector env with random masked actions taken from local copies of its envs, until every env has
+    # run its deck out at least once
+    envs = SharedMemoryVectorEnv(2, num_workers=2)
+    local_envs = [BalatroEnv() for _ in range(2)]
+    rng = np.random.default_rng(0)
+    try:
+        envs.reset(seed=0)
+        for i, env in enumerate(local_envs):
+            env.reset(seed=i)
+        autoreset = [False, False]
+        exhausted = [False, False]
+        while not all(exhausted):
+            # The action of an env that is being reset is ignored
+            actions = [
+                _action(BoardAction.START_ROUND) if reset else _random_legal_action(env.run, rng)
+                for env, reset in zip(local_envs, autoreset)
+            ]
+            obs, rewards, terminations, truncations, _ = envs.step(_batch(actions))
+            for i, env in enumerate(local_envs):
+                if autoreset[i]:
+                    expected, _ = env.reset()
+                    reward: SupportsFloat = 0.0
+                    terminated, truncated = False, False
+                else:
+                    expected, reward, terminated, truncated, _ = env.step(actions[i])
+                for key, value in expected.items():
+                    np.testing.assert_array_equal(obs[key][i], value)
+                assert (rewards[i], terminations[i], truncations[i]) == (reward, terminated, truncated)
+                autoreset[i] = terminated or truncated
+                exhausted[i] |= env.run.board_state.deck.get_num_remaining() == 0
+    finally:
+        envs.close()
+
+
+@pytest.mark.unit
+def test_make_vec() -> None:
+    envs = gym.make_vec("balatro_gym/Balatro-v0", num_envs=2, num_workers=1)
+    try:
+        assert isinstance(envs.unwrapped, SharedMemoryVectorEnv)
+        obs, _ = envs.reset(seed=0)
+        assert obs in envs.observation_space
+    finally:
+        envs.close()